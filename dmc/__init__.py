@@ -17,8 +17,40 @@ __author__ = 'Rhett Garber'
 __license__ = 'ISC'
 __copyright__ = 'Copyright 2014 Firstname Lastname'
 
+import sys
 
-from .testing import MockNow, set_mock_now, get_mock_now, clear_mock_now
-from .time import Time, TimeInterval, TimeSpan, TimeIterator, TimeSpanIterator
+from .testing import (
+    MockNow, set_mock_now, get_mock_now, clear_mock_now, VirtualClock)
+from .clock import Clock, set_clock, get_clock
+from .time import (
+    Time, TimeInterval, TimeSpan, TimeIterator, TimeSpanIterator, sort_times)
+from .parse import TimeFormat
+from .format import Formatter
 from .date import Date, DateInterval, DateSpan, DateIterator, DateSpanIterator
+from .business import BusinessCalendar
+from .recurrence import Recurrence, DAILY, WEEKLY, MONTHLY, YEARLY
 from .errors import Error
+from .instrument import (
+    stats, reset_stats, enable_stats, disable_stats, collect_stats)
+
+# The numpy backed arrays are only imported when first asked for, where
+# python (3.7 and up) lets us do that.
+_ARRAY_NAMES = ('TimeArray', 'TimeIntervalArray', 'DateArray')
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name in _ARRAY_NAMES:
+            try:
+                from . import array
+            except ImportError:
+                # numpy isn't installed
+                raise AttributeError(name)
+            return getattr(array, name)
+        raise AttributeError(
+            "module {!r} has no attribute {!r}".format(__name__, name))
+else:
+    try:
+        from .array import TimeArray, TimeIntervalArray, DateArray
+    except ImportError:
+        # numpy isn't installed
+        pass
@@ -0,0 +1,675 @@
+# -*- coding: utf-8 -*-
+
+"""
+Columnar, NumPy backed, arrays of dmc values.
+
+A TimeArray is to Time what a NumPy array is to a float: a single int64 buffer
+of microseconds since the epoch (UTC, like everything else in dmc) instead of
+one Python object per value. Arithmetic, comparisons and searching run as
+NumPy operations, and Time objects are only created when an element is pulled
+out.
+
+The int64 buffer has the same layout as NumPy's datetime64[us], so
+converting to and from NumPy is a view rather than a copy, and pandas
+conversions happen without a Python loop.
+
+This module requires numpy, which dmc doesn't otherwise depend on. pandas is
+only imported when converting to or from it.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import datetime
+import itertools
+import operator
+
+import numpy
+
+from .epoch import (
+    MICROSECS_PER_SEC, MICROSECS_PER_DAY, EPOCH_ORDINAL, INTEGER_TYPES)
+from .time import Time, TimeInterval
+from .date import Date, DateInterval, MIN_ORDINAL, MAX_ORDINAL
+from .format import _compile_template
+from .tz import Zone, get_zone, get_local_zone, _LOCALIZE_MARGIN
+
+
+_ZONE_TABLES = {}
+_ZONE_TABLES_MAX = 256
+
+
+def _as_us(values, scale):
+    """Scale an array of some unit into int64 microseconds.
+
+    Like Time.from_timestamp(), integers stay exact and floats are rounded to
+    the nearest microsecond.
+    """
+    values = numpy.asarray(values)
+    if values.dtype.kind in 'iub':
+        return values.astype(numpy.int64) * scale
+    return numpy.rint(values * float(scale)).astype(numpy.int64)
+
+
+def _from_datetime64(values, unit):
+    """View a datetime64 or timedelta64 array as int64 microseconds, only
+    copying if it has some other unit (or isn't contiguous)."""
+    values = numpy.asarray(values)
+    dtype = numpy.dtype(unit)
+    if values.dtype.kind != dtype.kind:
+        raise TypeError(
+            "Expected a {} array, not {}".format(unit, values.dtype))
+
+    if values.dtype != dtype:
+        values = values.astype(unit)
+    if numpy.isnat(values).any():
+        raise ValueError("NaT has no dmc equivalent")
+
+    return numpy.ascontiguousarray(values).view(numpy.int64)
+
+
+def _zone_tables(zone):
+    """A Zone's transitions and offsets as int64 arrays, or None if the zone
+    doesn't have tables."""
+    try:
+        return _ZONE_TABLES[zone]
+    except KeyError:
+        pass
+
+    if isinstance(zone, Zone):
+        tables = (
+            numpy.fromiter(zone._transitions, numpy.int64, len(zone)),
+            numpy.fromiter(zone._offsets, numpy.int64, len(zone)))
+    else:
+        tables = None
+
+    if len(_ZONE_TABLES) >= _ZONE_TABLES_MAX:
+        _ZONE_TABLES.clear()
+    _ZONE_TABLES[zone] = tables
+
+    return tables
+
+
+def _utcoffsets(zone, us):
+    """Vectorized Zone.utcoffset()"""
+    tables = _zone_tables(zone)
+    if tables is None:
+        return numpy.fromiter(
+            (zone.utcoffset(u) for u in us.tolist()), numpy.int64, len(us))
+
+    transitions, offsets = tables
+    i = transitions.searchsorted(us, side='right') - 1
+    return offsets[numpy.maximum(i, 0)]
+
+
+def _localize(zone, wall_us):
+    """Vectorized Zone.localize(), with the default is_dst=False."""
+    tables = _zone_tables(zone)
+    if tables is None:
+        return numpy.fromiter(
+            (zone.localize(w) for w in wall_us.tolist()), numpy.int64,
+            len(wall_us))
+
+    transitions, _ = tables
+    us = wall_us - _utcoffsets(zone, wall_us - _utcoffsets(zone, wall_us))
+
+    # Anywhere near a transition the wall time might be ambiguous or not exist
+    # at all, those few are left to the zone to sort out.
+    check = (
+        (transitions.searchsorted(us - _LOCALIZE_MARGIN, side='right') !=
+         transitions.searchsorted(us + _LOCALIZE_MARGIN, side='right')) |
+        (_utcoffsets(zone, us) != wall_us - us))
+    if check.any():
+        us[check] = [zone.localize(w) for w in wall_us[check].tolist()]
+
+    return us
+
+
+def _get_zone(tz, local):
+    if tz and local:
+        raise ValueError("Either local or a specific timezone")
+
+    if tz:
+        return get_zone(tz)
+    elif local:
+        return get_local_zone()
+    else:
+        return None
+
+
+def _interval_us(other):
+    """Microseconds for anything that can be added to a TimeArray, or None."""
+    if isinstance(other, TimeInterval):
+        return other._us
+    elif isinstance(other, TimeIntervalArray):
+        return other._us
+    elif isinstance(other, INTEGER_TYPES):
+        return other * MICROSECS_PER_SEC
+    elif isinstance(other, float):
+        return int(round(other * MICROSECS_PER_SEC))
+    else:
+        return None
+
+
+class _Int64Array(object):
+    """Shared plumbing for arrays wrapping an int64 microsecond buffer."""
+    __slots__ = ['_us']
+
+    # Comparisons return arrays, so these can't be hashed.
+    __hash__ = None
+
+    _scalar = None
+
+    @classmethod
+    def _from_us(cls, us):
+        a = object.__new__(cls)
+        a._us = us
+        return a
+
+    def __len__(self):
+        return len(self._us)
+
+    def __iter__(self):
+        from_us = self._scalar._from_us
+        for us in self._us.tolist():
+            yield from_us(us)
+
+    def __getitem__(self, key):
+        if isinstance(key, INTEGER_TYPES + (numpy.integer,)):
+            return self._scalar._from_us(int(self._us[key]))
+        return self._from_us(self._us[key])
+
+    def _other_us(self, other):
+        if isinstance(other, (self._scalar, type(self))):
+            return other._us
+        return None
+
+    def _compare(self, other, op):
+        other_us = self._other_us(other)
+        if other_us is None:
+            return NotImplemented
+        return op(self._us, other_us)
+
+    def __eq__(self, other):
+        return self._compare(other, numpy.equal)
+
+    def __ne__(self, other):
+        return self._compare(other, numpy.not_equal)
+
+    def __lt__(self, other):
+        return self._compare(other, numpy.less)
+
+    def __le__(self, other):
+        return self._compare(other, numpy.less_equal)
+
+    def __gt__(self, other):
+        return self._compare(other, numpy.greater)
+
+    def __ge__(self, other):
+        return self._compare(other, numpy.greater_equal)
+
+    def min(self):
+        return self._scalar._from_us(int(self._us.min()))
+
+    def max(self):
+        return self._scalar._from_us(int(self._us.max()))
+
+    def argsort(self, kind='mergesort'):
+        """Indexes that would sort the array. The default sort is stable."""
+        return self._us.argsort(kind=kind)
+
+    def sort(self):
+        """A sorted copy of the array."""
+        return self._from_us(numpy.sort(self._us, kind='mergesort'))
+
+    def searchsorted(self, value, side='left'):
+        """Where `value` (a scalar or another array) would be inserted to keep
+        a sorted array sorted."""
+        us = self._other_us(value)
+        if us is None:
+            raise TypeError("Can't search for {!r}".format(value))
+        return self._us.searchsorted(us, side=side)
+
+    def copy(self):
+        return self._from_us(self._us.copy())
+
+
+class TimeArray(_Int64Array):
+    """An array of Times, stored as int64 microseconds since the epoch."""
+    __slots__ = []
+
+    _scalar = Time
+
+    def __init__(self, times=()):
+        if isinstance(times, TimeArray):
+            self._us = times._us.copy()
+        else:
+            self._us = numpy.fromiter(
+                (t._us for t in times), dtype=numpy.int64)
+
+    @classmethod
+    def from_timestamps(cls, timestamps):
+        """Build from an array of unix timestamps, like
+        Time.from_timestamp()."""
+        return cls._from_us(_as_us(timestamps, MICROSECS_PER_SEC))
+
+    @classmethod
+    def from_numpy(cls, values):
+        """Build from a datetime64 array, taken to be UTC.
+
+        datetime64[us] arrays are shared rather than copied.
+        """
+        return cls._from_us(_from_datetime64(values, 'datetime64[us]'))
+
+    @classmethod
+    def from_pandas(cls, values):
+        """Build from a pandas DatetimeIndex or datetime Series. Naive values
+        are taken to be UTC."""
+        import pandas
+
+        if not isinstance(values, pandas.DatetimeIndex):
+            values = pandas.DatetimeIndex(values)
+        if values.tz is not None:
+            values = values.tz_convert('UTC').tz_localize(None)
+
+        return cls.from_numpy(values.values)
+
+    def to_timestamps(self):
+        return self._us / float(MICROSECS_PER_SEC)
+
+    def to_numpy(self):
+        """A datetime64[us] (UTC) view of the array. No data is copied."""
+        return self._us.view('datetime64[us]')
+
+    def to_pandas(self):
+        """A UTC pandas DatetimeIndex."""
+        import pandas
+
+        return pandas.DatetimeIndex(self.to_numpy()).tz_localize('UTC')
+
+    def to_pandas_series(self, name=None):
+        """A pandas Series of UTC datetimes."""
+        import pandas
+
+        return pandas.Series(self.to_pandas(), name=name)
+
+    def __repr__(self):
+        return "<dmc.TimeArray({})>".format(
+            ', '.join(str(t) for t in self[:3]) +
+            (', ...' if len(self) > 3 else ''))
+
+    def __add__(self, other):
+        us = _interval_us(other)
+        if us is None:
+            return NotImplemented
+        return TimeArray._from_us(self._us + us)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, (Time, TimeArray)):
+            return TimeIntervalArray._from_us(self._us - other._us)
+
+        us = _interval_us(other)
+        if us is None:
+            return NotImplemented
+        return TimeArray._from_us(self._us - us)
+
+    def __rsub__(self, other):
+        if isinstance(other, Time):
+            return TimeIntervalArray._from_us(other._us - self._us)
+        return NotImplemented
+
+
+class TimeIntervalArray(_Int64Array):
+    """An array of TimeIntervals, stored as int64 microseconds."""
+    __slots__ = []
+
+    _scalar = TimeInterval
+
+    def __init__(self, intervals=()):
+        if isinstance(intervals, TimeIntervalArray):
+            self._us = intervals._us.copy()
+        else:
+            self._us = numpy.fromiter(
+                (i._us for i in intervals), dtype=numpy.int64)
+
+    @classmethod
+    def from_seconds(cls, seconds):
+        return cls._from_us(_as_us(seconds, MICROSECS_PER_SEC))
+
+    @classmethod
+    def from_numpy(cls, values):
+        """Build from a timedelta64 array. timedelta64[us] arrays are shared
+        rather than copied."""
+        return cls._from_us(_from_datetime64(values, 'timedelta64[us]'))
+
+    def to_seconds(self):
+        return self._us / float(MICROSECS_PER_SEC)
+
+    def to_numpy(self):
+        """A timedelta64[us] view of the array. No data is copied."""
+        return self._us.view('timedelta64[us]')
+
+    def __repr__(self):
+        return "<dmc.TimeIntervalArray({})>".format(
+            ', '.join(str(i) for i in self[:3]) +
+            (', ...' if len(self) > 3 else ''))
+
+    def __add__(self, other):
+        if isinstance(other, (Time, TimeArray)):
+            return TimeArray._from_us(other._us + self._us)
+
+        us = _interval_us(other)
+        if us is None:
+            return NotImplemented
+        return TimeIntervalArray._from_us(self._us + us)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        us = _interval_us(other)
+        if us is None:
+            return NotImplemented
+        return TimeIntervalArray._from_us(self._us - us)
+
+    def __rsub__(self, other):
+        if isinstance(other, Time):
+            return TimeArray._from_us(other._us - self._us)
+
+        us = _interval_us(other)
+        if us is None:
+            return NotImplemented
+        return TimeIntervalArray._from_us(us - self._us)
+
+    def __mul__(self, other):
+        if isinstance(other, INTEGER_TYPES):
+            return TimeIntervalArray._from_us(self._us * other)
+        elif isinstance(other, float):
+            return TimeIntervalArray._from_us(
+                numpy.rint(self._us * other).astype(numpy.int64))
+        else:
+            return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return TimeIntervalArray._from_us(-self._us)
+
+    def __abs__(self):
+        return TimeIntervalArray._from_us(numpy.abs(self._us))
+
+
+class DateArray(object):
+    """An array of Dates, stored as int32 proleptic Gregorian ordinals (see
+    Date.toordinal())."""
+    __slots__ = ['_ord']
+
+    # Comparisons return arrays, so these can't be hashed.
+    __hash__ = None
+
+    def __init__(self, dates=()):
+        if isinstance(dates, DateArray):
+            self._ord = dates._ord.copy()
+        else:
+            self._ord = numpy.fromiter(
+                (d._ord for d in dates), dtype=numpy.int32)
+
+    @classmethod
+    def _from_ord(cls, ordinals):
+        a = object.__new__(cls)
+        a._ord = ordinals
+        return a
+
+    @classmethod
+    def from_ordinals(cls, ordinals):
+        return cls._from_ord(numpy.asarray(ordinals).astype(numpy.int32))
+
+    @classmethod
+    def from_times(cls, times, tz=None, local=False):
+        """The Date each Time falls on, like Date.from_time().
+
+        `times` can be a TimeArray or an array of int64 microseconds since the
+        epoch.
+        """
+        if isinstance(times, TimeArray):
+            us = times._us
+        else:
+            us = numpy.asarray(times, dtype=numpy.int64)
+
+        zone = _get_zone(tz, local)
+        if zone is not None:
+            us = us + _utcoffsets(zone, us)
+
+        return cls._from_ord(
+            (us // MICROSECS_PER_DAY + EPOCH_ORDINAL).astype(numpy.int32))
+
+    @classmethod
+    def from_numpy(cls, values):
+        """Build from a datetime64 array."""
+        days = _from_datetime64(values, 'datetime64[D]')
+        return cls._from_ord((days + EPOCH_ORDINAL).astype(numpy.int32))
+
+    def to_ordinals(self):
+        return self._ord.copy()
+
+    def to_times(self, tz=None, local=False):
+        """A TimeArray of the start of each date."""
+        days = (self._ord - EPOCH_ORDINAL).astype(numpy.int64)
+        wall_us = days * MICROSECS_PER_DAY
+
+        zone = _get_zone(tz, local)
+        if zone is None:
+            return TimeArray._from_us(wall_us)
+        return TimeArray._from_us(_localize(zone, wall_us))
+
+    def to_numpy(self):
+        """A datetime64[D] array of the dates."""
+        return (self._ord - EPOCH_ORDINAL).astype('datetime64[D]')
+
+    def to_str(self, format=None):
+        """Render every date, like Date.to_str(), into a list of strings."""
+        if format is None:
+            # ISO-8601 is what NumPy renders natively
+            return numpy.datetime_as_string(self.to_numpy()).tolist()
+
+        template, indexes = _compile_template(format)
+        if template is None:
+            fromordinal = datetime.date.fromordinal
+            return [
+                fromordinal(o).strftime(format) for o in self._ord.tolist()]
+
+        if not indexes:
+            return [template % ()] * len(self)
+
+        fields = operator.itemgetter(*indexes)
+        if 8 in indexes:
+            ydays = self.yday.tolist()
+        else:
+            ydays = itertools.repeat(0)
+
+        strings = []
+        append = strings.append
+        for year, month, day, yday in zip(
+                self.year.tolist(), self.month.tolist(), self.day.tolist(),
+                ydays):
+            values = fields(
+                (year, month, day, 0, 0, 0, 0, year % 100, yday, '', ''))
+            if not isinstance(values, tuple):
+                values = (values,)
+            append(template % values)
+
+        return strings
+
+    def __repr__(self):
+        return "<dmc.DateArray({})>".format(
+            ', '.join(self[:3].to_str()) + (', ...' if len(self) > 3 else ''))
+
+    def __len__(self):
+        return len(self._ord)
+
+    def __iter__(self):
+        from_ordinal = Date._from_ordinal
+        for o in self._ord.tolist():
+            yield from_ordinal(o)
+
+    def __getitem__(self, key):
+        if isinstance(key, INTEGER_TYPES + (numpy.integer,)):
+            return Date._from_ordinal(int(self._ord[key]))
+        return self._from_ord(self._ord[key])
+
+    @property
+    def _days(self):
+        return self.to_numpy()
+
+    @property
+    def year(self):
+        return (self._days.astype('datetime64[Y]').astype(numpy.int32) +
+                1970)
+
+    @property
+    def month(self):
+        return (self._days.astype('datetime64[M]').astype(numpy.int32) % 12 +
+                1)
+
+    @property
+    def day(self):
+        days = self._days
+        return (days - days.astype('datetime64[M]')).astype(numpy.int32) + 1
+
+    @property
+    def yday(self):
+        """Day of the year, starting at 1."""
+        days = self._days
+        return (days - days.astype('datetime64[Y]')).astype(numpy.int32) + 1
+
+    @property
+    def weekday(self):
+        """Day of the week, where Monday is 0 and Sunday is 6."""
+        # 0001-01-01 was a Monday
+        return (self._ord + 6) % 7
+
+    def isocalendar(self):
+        """Arrays of ISO year, week number and weekday (Monday is 1)."""
+        weekday = self.weekday
+
+        # The ISO year is whichever year the Thursday of the week falls in.
+        thursdays = DateArray._from_ord(self._ord - weekday + 3)
+        years = thursdays._days.astype('datetime64[Y]')
+        weeks = (thursdays._days - years).astype(numpy.int32) // 7 + 1
+
+        return years.astype(numpy.int32) + 1970, weeks, weekday + 1
+
+    @property
+    def iso_week(self):
+        return self.isocalendar()[1]
+
+    def _other_ord(self, other):
+        if isinstance(other, Date):
+            return other._ord
+        elif isinstance(other, DateArray):
+            return other._ord
+        else:
+            return None
+
+    def _compare(self, other, op):
+        other_ord = self._other_ord(other)
+        if other_ord is None:
+            return NotImplemented
+        return op(self._ord, other_ord)
+
+    def __eq__(self, other):
+        return self._compare(other, numpy.equal)
+
+    def __ne__(self, other):
+        return self._compare(other, numpy.not_equal)
+
+    def __lt__(self, other):
+        return self._compare(other, numpy.less)
+
+    def __le__(self, other):
+        return self._compare(other, numpy.less_equal)
+
+    def __gt__(self, other):
+        return self._compare(other, numpy.greater)
+
+    def __ge__(self, other):
+        return self._compare(other, numpy.greater_equal)
+
+    def _apply(self, interval):
+        """Vectorized DateInterval._apply()"""
+        ordinals = self._ord.astype(numpy.int64)
+
+        months = interval.years * 12 + interval.months
+        if months:
+            days = self._days
+            month_starts = days.astype('datetime64[M]')
+            day = (days - month_starts).astype(numpy.int64)
+
+            month_starts = month_starts + months
+            month_lengths = (
+                (month_starts + 1).astype('datetime64[D]') -
+                month_starts.astype('datetime64[D]')).astype(numpy.int64)
+            ordinals = (
+                month_starts.astype('datetime64[D]').astype(numpy.int64) +
+                numpy.minimum(day, month_lengths - 1) + EPOCH_ORDINAL)
+
+        ordinals += interval.days
+
+        if interval.weekday is not None:
+            weekdays = (ordinals + 6) % 7
+            if interval._direction > 0:
+                ordinals += (interval.weekday - weekdays - 1) % 7 + 1
+            else:
+                ordinals -= (weekdays - interval.weekday - 1) % 7 + 1
+
+        if len(ordinals) and (
+                ordinals.min() < MIN_ORDINAL or ordinals.max() > MAX_ORDINAL):
+            raise OverflowError("date value out of range")
+
+        return self._from_ord(ordinals.astype(numpy.int32))
+
+    def __add__(self, other):
+        """Add a DateInterval, or a number of days (or an array of them)."""
+        if isinstance(other, DateInterval):
+            return self._apply(other)
+        elif isinstance(other, (Date, DateArray)):
+            return NotImplemented
+        return self._from_ord((self._ord + other).astype(numpy.int32))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        """Subtracting dates gives an array of days between them, subtracting
+        a DateInterval or days gives dates."""
+        if isinstance(other, DateInterval):
+            return self._apply(-other)
+
+        other_ord = self._other_ord(other)
+        if other_ord is not None:
+            return self._ord - other_ord
+        return self._from_ord((self._ord - other).astype(numpy.int32))
+
+    def min(self):
+        return Date._from_ordinal(int(self._ord.min()))
+
+    def max(self):
+        return Date._from_ordinal(int(self._ord.max()))
+
+    def argsort(self, kind='mergesort'):
+        """Indexes that would sort the array. The default sort is stable."""
+        return self._ord.argsort(kind=kind)
+
+    def sort(self):
+        """A sorted copy of the array."""
+        return self._from_ord(numpy.sort(self._ord, kind='mergesort'))
+
+    def searchsorted(self, value, side='left'):
+        other_ord = self._other_ord(value)
+        if other_ord is None:
+            raise TypeError("Can't search for {!r}".format(value))
+        return self._ord.searchsorted(other_ord, side=side)
+
+    def copy(self):
+        return self._from_ord(self._ord.copy())
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+"""
+Microbenchmarks for dmc's hot paths.
+
+Run them with:
+
+    python -m dmc.bench                           # everything
+    python -m dmc.bench -k to_str                 # names containing 'to_str'
+    python -m dmc.bench --save before.json
+    python -m dmc.bench --baseline before.json --threshold 0.1
+
+Each benchmark reports operations per second (the best of several runs),
+and, where tracemalloc is available, the memory blocks and bytes each
+operation's result retains. That's what an operation builds, not its
+temporaries or how many allocations it makes along the way. With a
+baseline, anything more than `threshold` slower fails the run.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import gc
+import json
+import platform
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    # python 2
+    tracemalloc = None
+
+try:
+    _timer = time.perf_counter
+except AttributeError:
+    _timer = time.time
+
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    """Register a benchmark. The decorated function does any setup and
+    returns the operation to time, a function taking no arguments."""
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def _best_rate(op, min_time, repeat):
+    # Find a number of calls that takes long enough to time reliably.
+    number = 1
+    while True:
+        elapsed = _time_calls(op, number)
+        if elapsed >= min_time / repeat:
+            break
+        number *= 10 if elapsed < min_time / (repeat * 10) else 2
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, _time_calls(op, number))
+    return number / best
+
+
+def _time_calls(op, number):
+    calls = range(number)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = _timer()
+        for _ in calls:
+            op()
+        return _timer() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _retained(op, number=100):
+    """Memory blocks and bytes per call held by the results, which are kept
+    until measured."""
+    if tracemalloc is None:
+        return None, None
+
+    results = [None] * number
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for i in range(number):
+            results[i] = op()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    # Leave out the snapshots themselves
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    after = after.filter_traces(ignore)
+    before = before.filter_traces(ignore)
+
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+    return float(blocks) / number, float(size) / number
+
+
+def run(pattern=None, min_time=0.2, repeat=3, report=None):
+    """Run every benchmark whose name contains `pattern`.
+
+    Returns a dict of results, ready to be saved as JSON. `report` is called
+    with each benchmark's name and result as they finish.
+    """
+    # Importing the cases registers them
+    from . import cases  # noqa
+
+    results = {}
+    for name, setup in BENCHMARKS:
+        if pattern and pattern not in name:
+            continue
+
+        op = setup()
+        rate = _best_rate(op, min_time, repeat)
+        blocks, size = _retained(op)
+        results[name] = {
+            'ops_per_sec': rate,
+            'retained_blocks_per_op': blocks,
+            'retained_bytes_per_op': size,
+        }
+        if report:
+            report(name, results[name])
+
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'results': results,
+    }
+
+
+def compare(results, baseline, threshold=0.1):
+    """Compare two runs.
+
+    Returns (name, baseline ops/sec, ops/sec, change) for every benchmark in
+    both, where change is the fractional difference in speed, and the names
+    of those more than `threshold` slower than the baseline.
+    """
+    rows = []
+    regressions = []
+    for name in sorted(results['results']):
+        if name not in baseline['results']:
+            continue
+        old = baseline['results'][name]['ops_per_sec']
+        new = results['results'][name]['ops_per_sec']
+        change = new / old - 1
+        rows.append((name, old, new, change))
+        if change < -threshold:
+            regressions.append(name)
+    return rows, regressions
+
+
+def save(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
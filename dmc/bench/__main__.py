@@ -0,0 +1,59 @@
+from __future__ import absolute_import, print_function
+
+import argparse
+import sys
+
+from . import run, compare, save, load
+
+
+def _format_result(name, result):
+    line = '{:<36} {:>14,.0f} ops/sec'.format(name, result['ops_per_sec'])
+    if result['retained_blocks_per_op'] is not None:
+        line += '  {:>8.1f} blocks/op  {:>10,.0f} bytes/op retained'.format(
+            result['retained_blocks_per_op'], result['retained_bytes_per_op'])
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m dmc.bench', description='Benchmark dmc hot paths.')
+    parser.add_argument(
+        '-k', dest='pattern',
+        help='only run benchmarks with names containing this')
+    parser.add_argument(
+        '--min-time', type=float, default=0.2,
+        help='seconds to spend timing each benchmark (default 0.2)')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument(
+        '--baseline', help='compare against results saved with --save')
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='fail if anything is this much slower than the baseline '
+             '(default 0.1, 10%%)')
+    args = parser.parse_args(argv)
+
+    results = run(
+        args.pattern, min_time=args.min_time,
+        report=lambda name, result: print(_format_result(name, result)))
+
+    if args.save:
+        save(results, args.save)
+
+    if args.baseline:
+        rows, regressions = compare(
+            results, load(args.baseline), threshold=args.threshold)
+        print()
+        for name, old, new, change in rows:
+            print('{:<36} {:>14,.0f} -> {:>14,.0f}  {:>+7.1%}{}'.format(
+                name, old, new, change,
+                '  REGRESSION' if name in regressions else ''))
+        if regressions:
+            print('\n{} benchmark(s) regressed more than {:.0%}'.format(
+                len(regressions), args.threshold))
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
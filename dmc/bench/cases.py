@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+"""
+The benchmarks run by `python -m dmc.bench`.
+
+Names are grouped by prefix, so `-k time_` or `-k interval_` picks out a
+family. Operations return what they build, so the retained memory numbers
+cover it.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import pickle
+
+import dmc
+from dmc import codec
+from . import benchmark
+
+
+T = dmc.Time(2014, 4, 18, 17, 50, 21, 36391)
+TS = 1397843421.036391
+ISO = '2014-04-18T17:50:21.036391+00:00'
+MINUTE = dmc.TimeInterval(minutes=1)
+
+
+@benchmark('time_init')
+def time_init():
+    Time = dmc.Time
+    return lambda: Time(2014, 4, 18, 17, 50, 21)
+
+
+@benchmark('time_init_tz')
+def time_init_tz():
+    Time = dmc.Time
+    return lambda: Time(2014, 4, 18, 17, 50, 21, tz='US/Pacific')
+
+
+@benchmark('time_from_timestamp')
+def time_from_timestamp():
+    from_timestamp = dmc.Time.from_timestamp
+    return lambda: from_timestamp(TS)
+
+
+@benchmark('time_from_str')
+def time_from_str():
+    from_str = dmc.Time.from_str
+    return lambda: from_str(ISO)
+
+
+@benchmark('time_from_str_format')
+def time_from_str_format():
+    from_str = dmc.Time.from_str
+    return lambda: from_str('04/18/2014 17:50', format='%m/%d/%Y %H:%M')
+
+
+@benchmark('time_to_str')
+def time_to_str():
+    return T.to_str
+
+
+@benchmark('time_to_str_tz')
+def time_to_str_tz():
+    return lambda: T.to_str(tz='US/Pacific')
+
+
+@benchmark('time_to_str_format')
+def time_to_str_format():
+    return lambda: T.to_str(format='%Y-%m-%d %H:%M')
+
+
+@benchmark('time_to_timestamp')
+def time_to_timestamp():
+    return T.to_timestamp
+
+
+@benchmark('time_to_human')
+def time_to_human():
+    return T.to_human
+
+
+@benchmark('time_now')
+def time_now():
+    dmc.set_clock(None)
+    return dmc.Time.now
+
+
+@benchmark('time_now_coarse')
+def time_now_coarse():
+    return dmc.Clock(resolution=0.001).now
+
+
+@benchmark('time_add_interval')
+def time_add_interval():
+    return lambda: T + MINUTE
+
+
+@benchmark('time_sub_interval')
+def time_sub_interval():
+    return lambda: T - MINUTE
+
+
+@benchmark('time_compare')
+def time_compare():
+    other = T + MINUTE
+    return lambda: T < other
+
+
+@benchmark('interval_add')
+def interval_add():
+    other = dmc.TimeInterval(2.5)
+    return lambda: MINUTE + other
+
+
+@benchmark('interval_mul')
+def interval_mul():
+    return lambda: MINUTE * 3
+
+
+@benchmark('interval_div')
+def interval_div():
+    return lambda: MINUTE / 7
+
+
+@benchmark('interval_floordiv')
+def interval_floordiv():
+    other = dmc.TimeInterval(7)
+    return lambda: MINUTE // other
+
+
+@benchmark('time_iterator_day_by_minute')
+def time_iterator():
+    span = dmc.TimeSpan(T, T + dmc.TimeInterval(days=1))
+    return lambda: list(dmc.TimeIterator(span, MINUTE))
+
+
+@benchmark('time_span_iterator_day_by_minute')
+def time_span_iterator():
+    span = dmc.TimeSpan(T, T + dmc.TimeInterval(days=1))
+    return lambda: list(dmc.TimeSpanIterator(span, MINUTE))
+
+
+@benchmark('date_add_month')
+def date_add_month():
+    d = dmc.Date(2014, 1, 31)
+    month = dmc.DateInterval(months=1)
+    return lambda: d + month
+
+
+@benchmark('sort_times_1000')
+def sort_times():
+    times = [T + dmc.TimeInterval((i * 7919) % 1000) for i in range(1000)]
+    return lambda: dmc.sort_times(times)
+
+
+@benchmark('pickle_1000_times')
+def pickle_times():
+    times = [T + dmc.TimeInterval(i) for i in range(1000)]
+    return lambda: pickle.loads(pickle.dumps(times, 2))
+
+
+@benchmark('codec_1000_times')
+def codec_times():
+    times = [T + dmc.TimeInterval(i) for i in range(1000)]
+    return lambda: codec.unpack_many(dmc.Time, codec.pack_many(times))
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Converting large batches of times across several processes.
+
+Each function splits its input into chunks of `chunksize` and, with
+`workers` above 1, converts them in a pool of that many processes. Times
+travel between processes as packed microseconds (the dmc.codec encoding,
+8 bytes each) rather than pickled objects, and the results come back in
+input order:
+
+    data = bulk.parse(lines, workers=32)
+    data = bulk.from_timestamps(floats, workers=32)
+    strings = bulk.format(data, workers=32)
+
+parse() and from_timestamps() return that packed encoding, so the results
+can be decoded into Times with codec.unpack_many(Time, data), or read as
+ints without making any Times at all, e.g. numpy.frombuffer(data, '<i8').
+format() takes the same encoding, or any iterable of Times.
+
+With one worker (the default) everything runs in the calling process.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import itertools
+import multiprocessing
+
+from . import codec
+from .epoch import MICROSECS_PER_SEC
+from .format import Formatter
+from .time import Time, _to_us
+
+CHUNKSIZE = 100000
+
+
+def _chunks(values, size):
+    values = iter(values)
+    while True:
+        chunk = list(itertools.islice(values, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _buffer_chunks(data, size):
+    """Slices of a packed buffer holding `size` values each."""
+    view = memoryview(data)
+    nbytes = len(view) * view.itemsize
+    if nbytes % codec.TIME_SIZE:
+        raise ValueError(
+            "Buffer isn't a whole number of {} byte values".format(
+                codec.TIME_SIZE))
+    if view.itemsize != 1:
+        view = view.cast('B')
+
+    step = size * codec.TIME_SIZE
+    for start in range(0, nbytes, step):
+        yield view[start:start + step].tobytes()
+
+
+def _parse_chunk(args):
+    strings, format, tz, local = args
+    times = Time.parse_many(strings, format=format, tz=tz, local=local)
+    return codec._pack_ints(t._us for t in times)
+
+
+def _timestamps_chunk(timestamps):
+    return codec._pack_ints(
+        _to_us(ts, MICROSECS_PER_SEC) for ts in timestamps)
+
+
+def _format_chunk(args):
+    data, format, tz, local = args
+    formatter = Formatter(format, tz=tz, local=local)
+    render = formatter._render
+    zone = formatter._get_zone()
+    ints = codec._unpack_ints(data, 0, len(data) // codec.TIME_SIZE)
+    return [render(us, zone) for us in ints]
+
+
+def _run(func, tasks, workers):
+    """func() of each task, in order, across `workers` processes."""
+    if workers is None or workers <= 1:
+        return list(map(func, tasks))
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        # imap keeps the results in order, and only pulls tasks as the
+        # workers need them, so a generator's input is never all in memory.
+        results = list(pool.imap(func, tasks))
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+    return results
+
+
+def parse(strings, format=None, tz=None, local=False, workers=1,
+          chunksize=CHUNKSIZE):
+    """Parse strings as Time.from_str() would, returning packed
+    microseconds."""
+    if tz and local:
+        raise ValueError("Either local or a specific timezone")
+
+    tasks = (
+        (chunk, format, tz, local) for chunk in _chunks(strings, chunksize))
+    return b''.join(_run(_parse_chunk, tasks, workers))
+
+
+def from_timestamps(timestamps, workers=1, chunksize=CHUNKSIZE):
+    """Convert unix timestamps as Time.from_timestamp() would, returning
+    packed microseconds."""
+    tasks = _chunks(timestamps, chunksize)
+    return b''.join(_run(_timestamps_chunk, tasks, workers))
+
+
+def format(times, format=None, tz=None, local=False, workers=1,
+           chunksize=CHUNKSIZE):
+    """Render packed microseconds, or an iterable of Times, as
+    Time.to_str() would. Returns a list of strings."""
+    if tz and local:
+        raise ValueError("Either local or a specific timezone")
+
+    if isinstance(times, (bytes, bytearray, memoryview)):
+        chunks = _buffer_chunks(times, chunksize)
+    else:
+        chunks = (
+            codec.pack_many(chunk) for chunk in _chunks(times, chunksize))
+
+    tasks = ((chunk, format or None, tz, local) for chunk in chunks)
+    strings = []
+    for chunk in _run(_format_chunk, tasks, workers):
+        strings.extend(chunk)
+    return strings
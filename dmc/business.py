@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+
+"""
+Business day calendars.
+
+A BusinessCalendar knows which Dates are working days: everything but the
+weekend and a set of holidays. For each year it covers it builds a bitmap of
+working days, and from those a table of how many business days come before
+each day, plus the date of every business day. With those tables adding
+business days, counting them, or checking a single date are lookups instead of
+walking the calendar a day at a time.
+
+Calendars can be loaded from a simple text file:
+
+    # US bank holidays, 2014
+    weekend sat sun
+    2014-01-01 New Year's Day
+    2014-01-20 Martin Luther King Jr. Day
+    ...
+
+Blank lines and lines starting with # are ignored. The optional `weekend` line
+names the non-working days of the week (the default is Saturday and Sunday),
+every other line is a YYYY-MM-DD holiday, optionally followed by its name.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import array
+import datetime
+import io
+
+from .date import Date, MIN_ORDINAL, MAX_ORDINAL, _year_bounds
+
+
+_WEEKDAY_NAMES = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+
+_fromordinal = datetime.date.fromordinal
+
+
+class BusinessCalendar(object):
+    """Working days, given the days of the `weekend` (Monday is 0) and a
+    collection of holiday Dates.
+
+    Tables are built a year at a time, as dates in new years are asked about.
+    """
+
+    def __init__(self, holidays=(), weekend=(5, 6)):
+        self.weekend = frozenset(weekend)
+        if len(self.weekend) >= 7:
+            raise ValueError("There must be at least one working day a week")
+
+        # Holidays can be given as Dates, or as a mapping of Dates to names.
+        if hasattr(holidays, 'items'):
+            self._holidays = dict(
+                (d._ord, name) for d, name in holidays.items())
+        else:
+            self._holidays = dict((d._ord, None) for d in holidays)
+
+        self._bitmaps = {}
+        self._first_year = None
+        self._last_year = None
+
+        # Covering ordinals _start until _end:
+        self._start = self._end = 0
+        # Business days before each day, ending with the total.
+        self._ranks = array.array('i')
+        # Ordinal of every business day.
+        self._days = array.array('i')
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a calendar from a holiday file, see the module docs for the
+        format."""
+        weekend = (5, 6)
+        holidays = {}
+        with io.open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+
+                fields = line.split(None, 1)
+                try:
+                    if fields[0].lower() == 'weekend':
+                        weekend = [
+                            _WEEKDAY_NAMES.index(name[:3].lower())
+                            for name in fields[1].split()]
+                    else:
+                        year, month, day = fields[0].split('-')
+                        d = Date(int(year), int(month), int(day))
+                        holidays[d] = fields[1] if len(fields) > 1 else None
+                except (ValueError, IndexError):
+                    raise ValueError("{}:{}: can't parse {!r}".format(
+                        path, line_number, line))
+
+        return cls(holidays, weekend=weekend)
+
+    def __repr__(self):
+        return "<dmc.BusinessCalendar({} holidays)>".format(
+            len(self._holidays))
+
+    @property
+    def holidays(self):
+        """Holiday Dates, in order."""
+        return [Date._from_ordinal(o) for o in sorted(self._holidays)]
+
+    def holiday_name(self, d):
+        """Name of the holiday on `d`, if it is one and it has a name."""
+        return self._holidays.get(d._ord)
+
+    def _bitmap(self, year):
+        """Which days of `year` are working days, one byte per day."""
+        bitmap = self._bitmaps.get(year)
+        if bitmap is None:
+            start, end = _year_bounds(year)
+            weekend = self.weekend
+            holidays = self._holidays
+            bitmap = bytearray(
+                0 if (o + 6) % 7 in weekend or o in holidays else 1
+                for o in range(start, end))
+            self._bitmaps[year] = bitmap
+        return bitmap
+
+    def _build(self, first_year, last_year):
+        ranks = array.array('i')
+        days = array.array('i')
+        rank = 0
+        for year in range(first_year, last_year + 1):
+            ordinal, _ = _year_bounds(year)
+            for working in self._bitmap(year):
+                ranks.append(rank)
+                if working:
+                    days.append(ordinal)
+                    rank += 1
+                ordinal += 1
+        ranks.append(rank)
+
+        self._first_year = first_year
+        self._last_year = last_year
+        self._start = _year_bounds(first_year)[0]
+        self._end = _year_bounds(last_year)[1]
+        self._ranks = ranks
+        self._days = days
+
+    def _extend(self, first_year, last_year):
+        if self._first_year is not None:
+            first_year = min(first_year, self._first_year)
+            last_year = max(last_year, self._last_year)
+        if first_year < 1 or last_year > 9999:
+            raise OverflowError("date value out of range")
+
+        self._build(first_year, last_year)
+
+    def _cover(self, ordinal):
+        """Make sure the tables cover `ordinal`."""
+        if not self._start <= ordinal < self._end:
+            if not MIN_ORDINAL <= ordinal <= MAX_ORDINAL:
+                raise OverflowError("date value out of range")
+            year = _fromordinal(ordinal).year
+            self._extend(year, year)
+
+    def _is_business(self, ordinal):
+        i = ordinal - self._start
+        return self._ranks[i + 1] != self._ranks[i]
+
+    def _is_business_ordinal(self, ordinal):
+        self._cover(ordinal)
+        return self._is_business(ordinal)
+
+    def is_business_day(self, d):
+        return self._is_business_ordinal(d._ord)
+
+    def add(self, d, n):
+        """The date `n` business days after `d` (or before, if `n` is
+        negative).
+
+        `d` itself doesn't count, so adding 1 to a Friday gives the next
+        Monday, and so does adding 1 to a Saturday.
+        """
+        if n == 0:
+            return d
+
+        ordinal = d._ord
+        self._cover(ordinal)
+
+        rank = self._ranks[ordinal - self._start] + n
+        if n > 0 and not self._is_business(ordinal):
+            # The next business day is already the first step
+            rank -= 1
+
+        # Roughly 250 business days a year, going further than we need to
+        # is cheaper than extending one year at a time.
+        while rank < 0:
+            start = self._start
+            self._extend(self._first_year - 1 - -rank // 200, self._last_year)
+            rank += self._ranks[start - self._start]
+        while rank >= len(self._days):
+            self._extend(
+                self._first_year,
+                self._last_year + 1 + (rank - len(self._days)) // 200)
+
+        return Date._from_ordinal(self._days[rank])
+
+    def diff(self, start, end):
+        """Number of business days from `start` up until, but not including,
+        `end`. Negative if `end` comes first."""
+        self._cover(start._ord)
+        self._cover(end._ord)
+        return (
+            self._ranks[end._ord - self._start] -
+            self._ranks[start._ord - self._start])
+
+    def next_business_day(self, d):
+        """The first business day on or after `d`."""
+        if self.is_business_day(d):
+            return d
+        return self.add(d, 1)
+
+    def previous_business_day(self, d):
+        """The last business day on or before `d`."""
+        if self.is_business_day(d):
+            return d
+        return self.add(d, -1)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+"""
+Clocks for Time.now()
+
+By default Time.now() reads the system clock on every call. Code that asks
+for the time many times over (stamping log lines, request middleware) can
+install a coarse Clock instead, which hands back the same cached Time until
+`resolution` has passed:
+
+    dmc.set_clock(dmc.Clock(resolution=0.001))
+
+The cached value is kept fresh from the monotonic clock, which is cheaper
+than the wall clock on most platforms and never runs backwards. The wall
+clock is only read every `anchor` seconds, to follow adjustments like NTP
+steps. Times handed out by a coarse clock never go backwards either.
+
+Mocked times (see dmc.testing) always win over any clock.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import threading
+import time
+
+from . import epoch
+from .testing import get_mock_now
+
+try:
+    _monotonic = time.monotonic
+except AttributeError:
+    # python 2 has no monotonic clock in the standard library
+    _monotonic = time.time
+
+
+# The clock Time.now() uses, if not the precise system clock.
+_CLOCK = None
+
+
+def _as_seconds(value):
+    if hasattr(value, '_us'):
+        # A TimeInterval
+        return float(value._us) / epoch.MICROSECS_PER_SEC
+    return float(value)
+
+
+class Clock(object):
+    """A source of the current Time, accurate to within `resolution` seconds
+    (a number, or a TimeInterval)."""
+
+    def __init__(self, resolution=0.001, anchor=1.0):
+        from .time import Time
+
+        self.resolution = _as_seconds(resolution)
+        self.anchor = _as_seconds(anchor)
+        if self.resolution < 0 or self.anchor < 0:
+            raise ValueError("resolution and anchor can't be negative")
+
+        self._from_us = Time._from_us
+        self._lock = threading.Lock()
+        self._last = None
+        self._last_us = None
+        self._expires = None
+        self._anchor_us = None
+        self._anchor_mono = None
+        self._anchor_expires = None
+
+    def __repr__(self):
+        return '<dmc.Clock(resolution={})>'.format(self.resolution)
+
+    def now(self):
+        mock = get_mock_now()
+        if mock is not None:
+            return mock
+        return self._now()
+
+    def _now(self):
+        mono = _monotonic()
+        expires = self._expires
+        if expires is not None and mono < expires:
+            return self._last
+
+        with self._lock:
+            if self._anchor_expires is None or mono >= self._anchor_expires:
+                self._anchor_us = epoch.now_us()
+                self._anchor_mono = mono
+                self._anchor_expires = mono + self.anchor
+
+            us = self._anchor_us + int(round(
+                (mono - self._anchor_mono) * epoch.MICROSECS_PER_SEC))
+            if self._last_us is not None and us < self._last_us:
+                # The wall clock stepped back, hold still until it catches up
+                us = self._last_us
+
+            t = self._from_us(us)
+            self._last = t
+            self._last_us = us
+            self._expires = mono + self.resolution
+
+        return t
+
+
+def set_clock(clock):
+    """Install `clock` for Time.now(), or go back to reading the system clock
+    on every call if `clock` is None."""
+    global _CLOCK
+    _CLOCK = clock
+
+
+def get_clock():
+    """The installed Clock, or None if Time.now() reads the system clock."""
+    return _CLOCK
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fixed width binary encoding for dmc values.
+
+Time and TimeInterval are packed as their microseconds, a little endian
+signed 64 bit integer (8 bytes). A TimeSpan is its start followed by its end
+(16 bytes). The encoding doesn't say what type it holds, so the reader
+passes the type back in:
+
+    data = codec.pack_many(times)
+    times = codec.unpack_many(Time, data)
+
+Since every value is the same width, a buffer of them can be indexed into
+directly, and the bytes are laid out just like a numpy '<i8' array.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import array
+import itertools
+import struct
+import sys
+
+from .time import Time, TimeInterval, TimeSpan
+
+
+TIME_SIZE = 8
+INTERVAL_SIZE = 8
+SPAN_SIZE = 16
+
+_ONE = struct.Struct('<q')
+_TWO = struct.Struct('<qq')
+
+# array.array only has a 64 bit typecode from python 3.3
+_HAVE_INT64_ARRAY = 'q' in getattr(array, 'typecodes', '')
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def _size(cls):
+    if issubclass(cls, TimeSpan):
+        return SPAN_SIZE
+    elif issubclass(cls, (Time, TimeInterval)):
+        return TIME_SIZE
+    raise TypeError("Can't encode {}".format(cls.__name__))
+
+
+def pack(value):
+    """Encode a single Time, TimeInterval or TimeSpan."""
+    if isinstance(value, TimeSpan):
+        return _TWO.pack(value.start._us, value.end._us)
+    elif isinstance(value, (Time, TimeInterval)):
+        return _ONE.pack(value._us)
+    raise TypeError("Can't encode {!r}".format(value))
+
+
+def unpack(cls, data, offset=0):
+    """Decode a single value of type `cls` from `data`, starting at
+    `offset`."""
+    if issubclass(cls, TimeSpan):
+        start, end = _TWO.unpack_from(data, offset)
+        return cls(Time._from_us(start), Time._from_us(end))
+    _size(cls)
+    return cls._from_us(_ONE.unpack_from(data, offset)[0])
+
+
+def _ints(values):
+    """Every microsecond value to be packed, in order."""
+    values = iter(values)
+    for first in values:
+        values = itertools.chain((first,), values)
+        if isinstance(first, TimeSpan):
+            return itertools.chain.from_iterable(
+                (span.start._us, span.end._us) for span in values)
+        return (value._us for value in values)
+    return iter(())
+
+
+if _HAVE_INT64_ARRAY:
+    def _pack_ints(ints):
+        ints = array.array('q', ints)
+        if not _NATIVE_LITTLE_ENDIAN:
+            ints.byteswap()
+        return ints.tobytes()
+
+    def _unpack_ints(data, offset, count):
+        view = memoryview(data).cast('B')[offset:offset + count * 8]
+        if _NATIVE_LITTLE_ENDIAN:
+            return view.cast('q')
+        ints = array.array('q', view.tobytes())
+        ints.byteswap()
+        return ints
+else:
+    def _pack_ints(ints):
+        ints = tuple(ints)
+        return struct.pack('<{}q'.format(len(ints)), *ints)
+
+    def _unpack_ints(data, offset, count):
+        return struct.unpack_from('<{}q'.format(count), data, offset)
+
+
+def pack_many(values, out=None, offset=0):
+    """Encode a sequence of values, which must all be Times and
+    TimeIntervals, or all TimeSpans.
+
+    Returns the encoded bytes, or if a writable buffer (a bytearray or
+    memoryview) is given as `out`, writes them there starting at `offset` and
+    returns how many bytes were written.
+    """
+    data = _pack_ints(_ints(values))
+    if out is None:
+        return data
+
+    end = offset + len(data)
+    if end > len(out):
+        raise ValueError("Buffer too small, need {} bytes".format(end))
+    out[offset:end] = data
+    return len(data)
+
+
+def unpack_many(cls, data, offset=0, count=None):
+    """Decode `count` values of type `cls` from `data` (bytes, a bytearray or
+    a memoryview), starting at `offset`. By default decodes everything up to
+    the end of the buffer."""
+    size = _size(cls)
+    view = memoryview(data)
+    available = len(view) * view.itemsize - offset
+    if count is None:
+        count, extra = divmod(available, size)
+        if extra:
+            raise ValueError(
+                "Buffer isn't a whole number of {} byte values".format(size))
+    elif count * size > available:
+        raise ValueError("Buffer too small for {} values".format(count))
+
+    ints = _unpack_ints(data, offset, count * size // 8)
+    from_us = Time._from_us
+    if size == SPAN_SIZE:
+        it = iter(ints)
+        return [
+            cls(from_us(start), from_us(end)) for start, end in zip(it, it)]
+    return list(map(cls._from_us, ints))
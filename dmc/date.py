@@ -3,83 +3,484 @@ from __future__ import absolute_import
 # -*- coding: utf-8 -*-
 
 """
-This module contains the set of dmcs's exceptions
+Calendar dates and date math.
+
+A Date is just a proleptic Gregorian ordinal (0001-01-01 is 1, like
+`datetime.date.toordinal()`), so stepping by days or weeks is an integer add.
+Month and year steps work out the new ordinal from month length tables rather
+than going through `datetime.date`.
 
 :copyright: (c) 2014 by Rhett Garber.
 :license: ISC, see LICENSE for more details.
 
 """
 import datetime
+import operator
 
 from . import human
-from .time import Time
+from .epoch import MICROSECS_PER_DAY, EPOCH_ORDINAL, INTEGER_TYPES
+from .time import Time, _reduce_args
+from .tz import get_zone, get_local_zone
+
+
+MIN_ORDINAL = datetime.date.min.toordinal()
+MAX_ORDINAL = datetime.date.max.toordinal()
+
+_date = datetime.date
+_fromordinal = datetime.date.fromordinal
+
+# Indexed by [is leap year][month]
+_DAYS_IN_MONTH = (
+    (None, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+    (None, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31),
+)
+_DAYS_BEFORE_MONTH = tuple(
+    (None,) + tuple(sum(days[1:month]) for month in range(1, 13))
+    for days in _DAYS_IN_MONTH)
+
+
+def _is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _ymd_to_ord(year, month, day):
+    """Ordinal for a date we already know is valid."""
+    y = year - 1
+    return (
+        y * 365 + y // 4 - y // 100 + y // 400 +
+        _DAYS_BEFORE_MONTH[_is_leap(year)][month] + day)
+
+
+def _year_bounds(year):
+    """First ordinal of `year`, and of the year after."""
+    start = _ymd_to_ord(year, 1, 1)
+    end = _ymd_to_ord(year + 1, 1, 1) if year < 9999 else MAX_ORDINAL + 1
+    return start, end
+
+
+def _check_ordinal(ordinal):
+    if not MIN_ORDINAL <= ordinal <= MAX_ORDINAL:
+        raise OverflowError("date value out of range")
+    return ordinal
+
+
+def _unpickle_date(ordinal, cls=None):
+    return (cls or Date)._from_ordinal(ordinal)
+
+
+def _unpickle_date_interval(years, months, days, weekday, direction):
+    return DateInterval._from_fields(years, months, days, weekday, direction)
 
 
 class Date(object):
+    __slots__ = ['_ord', '_ymd']
+
     def __init__(self, year, month, day):
-        self._d = datetime.date(year, month, day)
+        # Building the date is the cheapest way to get the fields validated.
+        self._ord = _date(year, month, day).toordinal()
+        self._ymd = (year, month, day)
+
+    @classmethod
+    def _from_ordinal(cls, ordinal):
+        d = cls.__new__(cls)
+        d._ord = ordinal
+        d._ymd = None
+        return d
+
+    def __reduce__(self):
+        return (_unpickle_date, _reduce_args(self, Date, self._ord))
+
+    @classmethod
+    def fromordinal(cls, ordinal):
+        """Date for a proleptic Gregorian ordinal, where 0001-01-01 is 1."""
+        return cls._from_ordinal(_check_ordinal(ordinal))
 
     @classmethod
     def from_datetime_date(cls, d):
-        return Date(d.year, d.month, d.day)
+        return cls._from_ordinal(d.toordinal())
 
     @classmethod
     def from_time(cls, t, tz=None, local=False):
-        dt = t.to_datetime(tz=tz, local=local)
-        return Date(dt.year, dt.month, dt.day)
+        if tz and local:
+            raise ValueError("Either local or a specific timezone")
+
+        us = t._us
+        if tz:
+            us += get_zone(tz).utcoffset(us)
+        elif local:
+            us += get_local_zone().utcoffset(us)
+
+        return cls._from_ordinal(us // MICROSECS_PER_DAY + EPOCH_ORDINAL)
 
     @classmethod
     def now(cls, t, tz=None, local=False):
         t = Time.now()
         return cls.from_time(t, tz=tz, local=local)
 
+    def _fields(self):
+        ymd = self._ymd
+        if ymd is None:
+            d = _fromordinal(self._ord)
+            ymd = self._ymd = (d.year, d.month, d.day)
+        return ymd
+
     @property
     def year(self):
-        return self._d.year
+        return self._fields()[0]
 
     @property
     def month(self):
-        return self._d.month
+        return self._fields()[1]
 
     @property
     def day(self):
-        return self._d.day
+        return self._fields()[2]
+
+    @property
+    def weekday(self):
+        """Day of the week, where Monday is 0 and Sunday is 6."""
+        # 0001-01-01 was a Monday
+        return (self._ord + 6) % 7
+
+    def toordinal(self):
+        return self._ord
 
     def to_str(self, format=None, tz=None, local=False):
         if format:
-            return self._d.strftime(format)
+            return self.to_datetime_date().strftime(format)
         else:
-            return self._d.isoformat()
+            return '%04d-%02d-%02d' % self._fields()
 
     def to_human(self, tz=None, local=False):
         # We need to allow for timezone here because things like 'yesterday'
         # are highly dependent on what time it is locally.
-        return human.naturaldate(self._d, tz=tz, local=local)
+        return human.HumanFormatter(tz=tz, local=local).naturaldate(self)
 
     def to_datetime_date(self):
-        return self._d
+        return _fromordinal(self._ord)
+
+    def __str__(self):
+        return self.to_str()
+
+    def __repr__(self):
+        return '<dmc.Date({}, {}, {})>'.format(*self._fields())
+
+    key = operator.attrgetter('_ord')
+
+    # Equal only to other Dates, so equal values always hash the same.
+    def __hash__(self):
+        return hash(self._ord)
+
+    def __eq__(self, other):
+        if isinstance(other, Date):
+            return self._ord == other._ord
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, Date):
+            return self._ord != other._ord
+        return NotImplemented
 
-    def __cmp__(self, other):
-        raise NotImplemented
+    def __lt__(self, other):
+        other_ord = _date_ord(other)
+        if other_ord is None:
+            return NotImplemented
+        return self._ord < other_ord
+
+    def __le__(self, other):
+        other_ord = _date_ord(other)
+        if other_ord is None:
+            return NotImplemented
+        return self._ord <= other_ord
+
+    def __gt__(self, other):
+        other_ord = _date_ord(other)
+        if other_ord is None:
+            return NotImplemented
+        return self._ord > other_ord
+
+    def __ge__(self, other):
+        other_ord = _date_ord(other)
+        if other_ord is None:
+            return NotImplemented
+        return self._ord >= other_ord
 
     def __add__(self, other):
-        raise NotImplemented
+        if isinstance(other, DateInterval):
+            return other._apply(self)
+        else:
+            return NotImplemented
 
     def __sub__(self, other):
-        raise NotImplemented
+        if isinstance(other, DateInterval):
+            return (-other)._apply(self)
+        elif isinstance(other, Date):
+            return DateInterval(days=self._ord - other._ord)
+        else:
+            return NotImplemented
+
+
+def _date_ord(other):
+    """Ordinal of something a Date orders against, or None."""
+    if isinstance(other, Date):
+        return other._ord
+    elif isinstance(other, datetime.date) and not isinstance(
+            other, datetime.datetime):
+        return other.toordinal()
+    return None
 
 
 class DateInterval(object):
-    pass
+    """A change in calendar date, like '2 days', '1 month' or 'next monday'.
+
+    Years and months are applied first, clamping the day to the end of the
+    month (Jan 31 + 1 month is Feb 28 or 29), then days and weeks. If a
+    `weekday` (Monday is 0) is given, the date then moves forward to the next
+    such day, or, when the interval is subtracted, back to the previous one.
+    """
+    __slots__ = ['years', 'months', 'days', 'weekday', '_direction']
+
+    def __init__(
+            self,
+            days=0,
+            weeks=0,
+            months=0,
+            years=0,
+            weekday=None):
+        if weekday is not None and not 0 <= weekday <= 6:
+            raise ValueError("weekday must be in 0..6")
+
+        self.years = years
+        self.months = months
+        self.days = days + weeks * 7
+        self.weekday = weekday
+        self._direction = 1
+
+    @classmethod
+    def _from_fields(cls, years, months, days, weekday, direction=1):
+        i = cls.__new__(cls)
+        i.years = years
+        i.months = months
+        i.days = days
+        i.weekday = weekday
+        i._direction = direction
+        return i
+
+    def __reduce__(self):
+        return (_unpickle_date_interval, (
+            self.years, self.months, self.days, self.weekday,
+            self._direction))
+
+    def _apply(self, d):
+        ordinal = d._ord
+
+        months = self.years * 12 + self.months
+        if months:
+            year, month, day = d._fields()
+            year, month = divmod(year * 12 + month - 1 + months, 12)
+            month += 1
+            if not 1 <= year <= 9999:
+                raise OverflowError("date value out of range")
+
+            day = min(day, _DAYS_IN_MONTH[_is_leap(year)][month])
+            ordinal = _ymd_to_ord(year, month, day)
+
+        ordinal += self.days
+
+        if self.weekday is not None:
+            weekday = (ordinal + 6) % 7
+            if self._direction > 0:
+                ordinal += (self.weekday - weekday - 1) % 7 + 1
+            else:
+                ordinal -= (weekday - self.weekday - 1) % 7 + 1
+
+        return Date._from_ordinal(_check_ordinal(ordinal))
+
+    def __repr__(self):
+        parts = []
+        for name in ('years', 'months', 'days'):
+            if getattr(self, name):
+                parts.append('{}={}'.format(name, getattr(self, name)))
+        if self.weekday is not None:
+            parts.append('weekday={}'.format(self.weekday))
+        return '<dmc.DateInterval({})>'.format(', '.join(parts))
+
+    def _key(self):
+        return (
+            self.years * 12 + self.months, self.days, self.weekday,
+            self._direction if self.weekday is not None else 1)
+
+    def __eq__(self, other):
+        if isinstance(other, DateInterval):
+            return self._key() == other._key()
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, DateInterval):
+            return self._key() != other._key()
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __add__(self, other):
+        if isinstance(other, Date):
+            return self._apply(other)
+        elif not isinstance(other, DateInterval):
+            return NotImplemented
+
+        if self.weekday is not None and other.weekday is not None:
+            raise ValueError("Can't combine two weekday intervals")
+        elif self.weekday is not None:
+            weekday, direction = self.weekday, self._direction
+        else:
+            weekday, direction = other.weekday, other._direction
+
+        return DateInterval._from_fields(
+            self.years + other.years,
+            self.months + other.months,
+            self.days + other.days,
+            weekday,
+            direction)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if isinstance(other, DateInterval):
+            return self + -other
+        return NotImplemented
+
+    def __neg__(self):
+        return DateInterval._from_fields(
+            -self.years, -self.months, -self.days, self.weekday,
+            -self._direction)
+
+    def __mul__(self, other):
+        if not isinstance(other, INTEGER_TYPES):
+            return NotImplemented
+        if self.weekday is not None and other != 1:
+            raise ValueError("Can't multiply a weekday interval")
+
+        return DateInterval._from_fields(
+            self.years * other, self.months * other, self.days * other,
+            self.weekday, self._direction)
+
+    __rmul__ = __mul__
 
 
 class DateSpan(object):
-    pass
+    __slots__ = ['start', 'end']
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+    def __iter__(self):
+        yield self.start
+        yield self.end
+
+    def __getitem__(self, key):
+        if key == 0:
+            return self.start
+        elif key == 1:
+            return self.end
+        else:
+            raise KeyError
+
+    def __len__(self):
+        return 2
+
+    def __reduce__(self):
+        return (self.__class__, (self.start, self.end))
+
+    def __repr__(self):
+        return "<dmc.DateSpan({}, {})>".format(self.start, self.end)
+
+    def __str__(self):
+        return "{} to {}".format(self.start, self.end)
+
+
+def _iter_ordinals(start, interval):
+    """Generate ordinals from `start`, stepping by `interval`, forever (or
+    until they fall off the end of the calendar)."""
+    if interval.weekday is None and not interval.years and not interval.months:
+        # Plain day steps
+        step = interval.days
+        if step <= 0:
+            raise ValueError("DateInterval must move dates forward")
+
+        ordinal = start._ord
+        while ordinal <= MAX_ORDINAL:
+            yield ordinal
+            ordinal += step
+
+    elif interval.weekday is None:
+        # Month steps are always taken from the start, so the 31st of the
+        # month stays the 31st wherever it can, rather than getting stuck on
+        # the 28th after February.
+        if (interval + start)._ord <= start._ord:
+            raise ValueError("DateInterval must move dates forward")
+
+        yield start._ord
+        n = 1
+        while True:
+            try:
+                yield (interval * n)._apply(start)._ord
+            except OverflowError:
+                return
+            n += 1
+
+    else:
+        d = start
+        while True:
+            yield d._ord
+            try:
+                next_d = interval._apply(d)
+            except OverflowError:
+                return
+            if next_d._ord <= d._ord:
+                raise ValueError("DateInterval must move dates forward")
+            d = next_d
 
 
 class DateIterator(object):
-    pass
+    __slots__ = ['span', 'interval']
+
+    def __init__(self, span, interval):
+        self.span = span
+        self.interval = interval
+
+    def __iter__(self):
+        start, end = self.span
+        end_ord = end._ord
+        from_ordinal = Date._from_ordinal
+
+        for ordinal in _iter_ordinals(start, self.interval):
+            if ordinal > end_ord:
+                break
+            yield from_ordinal(ordinal)
 
 
 class DateSpanIterator(object):
-    pass
+    __slots__ = ['span', 'interval']
+
+    def __init__(self, span, interval):
+        self.span = span
+        self.interval = interval
+
+    def __iter__(self):
+        start, end = self.span
+        end_ord = end._ord
+        from_ordinal = Date._from_ordinal
+
+        ordinals = _iter_ordinals(start, self.interval)
+        ordinal = next(ordinals)
+        while ordinal < end_ord:
+            try:
+                next_ordinal = next(ordinals)
+            except StopIteration:
+                next_ordinal = end_ord
+            yield DateSpan(
+                from_ordinal(ordinal),
+                from_ordinal(min(next_ordinal, end_ord)))
+            ordinal = next_ordinal
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+Helpers for working with integer microseconds since the Unix epoch.
+
+This is the representation every dmc.Time carries internally. Keeping these
+conversions in one place lets the rest of the package do plain integer math
+and only reach for `datetime` when a caller actually asks for one.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import datetime
+import time
+
+
+try:
+    INTEGER_TYPES = (int, long)
+except NameError:
+    INTEGER_TYPES = (int,)
+
+MICROSECS_PER_SEC = 1000000
+MICROSECS_PER_MINUTE = 60 * MICROSECS_PER_SEC
+MICROSECS_PER_HOUR = 60 * MICROSECS_PER_MINUTE
+MICROSECS_PER_DAY = 24 * MICROSECS_PER_HOUR
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+EPOCH_DATETIME = datetime.datetime(1970, 1, 1)
+
+_timedelta = datetime.timedelta
+_datetime = datetime.datetime
+_fromordinal = datetime.date.fromordinal
+_utcnow = datetime.datetime.utcnow
+
+
+def fields_to_us(year, month, day, hour, minute, second, microsecond):
+    """Convert broken out UTC fields into microseconds since the epoch."""
+    # Building the datetime is the cheapest way to get the fields validated.
+    days = _datetime(
+        year, month, day, hour, minute, second, microsecond
+    ).toordinal() - EPOCH_ORDINAL
+    return (
+        (((days * 24 + hour) * 60 + minute) * 60 + second) *
+        MICROSECS_PER_SEC + microsecond)
+
+
+def timedelta_to_us(td):
+    return (td.days * 86400 + td.seconds) * MICROSECS_PER_SEC + td.microseconds
+
+
+def datetime_to_us(dt):
+    """Convert a datetime into microseconds since the epoch.
+
+    Naive datetimes are assumed to already be in UTC.
+    """
+    offset = dt.utcoffset()
+    us = timedelta_to_us(dt.replace(tzinfo=None) - EPOCH_DATETIME)
+    if offset:
+        us -= timedelta_to_us(offset)
+    return us
+
+
+if hasattr(time, 'time_ns'):
+    def now_us():
+        """Current UTC time in microseconds since the epoch."""
+        return time.time_ns() // 1000
+else:
+    def now_us():
+        """Current UTC time in microseconds since the epoch."""
+        return timedelta_to_us(_utcnow() - EPOCH_DATETIME)
+
+
+def us_to_datetime(us):
+    """Build a naive datetime (in UTC) from microseconds since the epoch."""
+    return EPOCH_DATETIME + _timedelta(microseconds=us)
+
+
+def us_to_date(us):
+    return _fromordinal(us // MICROSECS_PER_DAY + EPOCH_ORDINAL)
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+"""
+Rendering Times into strings.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import datetime
+import operator
+
+from . import epoch
+from .epoch import MICROSECS_PER_SEC, MICROSECS_PER_DAY, EPOCH_ORDINAL
+from .tz import get_zone, get_local_zone
+
+
+# Directive -> (printf style conversion, index into the field tuple built by
+# Formatter._render())
+_FIELDS = {
+    'Y': ('%d', 0),
+    'm': ('%02d', 1),
+    'd': ('%02d', 2),
+    'H': ('%02d', 3),
+    'M': ('%02d', 4),
+    'S': ('%02d', 5),
+    'f': ('%06d', 6),
+    'y': ('%02d', 7),
+    'j': ('%03d', 8),
+    'z': ('%s', 9),
+    'Z': ('%s', 10),
+}
+
+_ISO_TEMPLATE = '%04d-%02d-%02dT%02d:%02d:%02d%s'
+_ISO_TEMPLATE_MICRO = '%04d-%02d-%02dT%02d:%02d:%02d.%06d%s'
+
+_FORMATTER_CACHE = {}
+_FORMATTER_CACHE_MAX = 256
+
+_date = datetime.date
+_fromordinal = datetime.date.fromordinal
+
+
+def _compile_template(format):
+    """Translate a strftime format into a printf style template and the
+    indexes of the fields it needs.
+
+    Returns (None, None) if the format uses directives (generally the locale
+    dependent ones) we leave to strftime.
+    """
+    parts = []
+    indexes = []
+    i = 0
+    while i < len(format):
+        c = format[i]
+        if c == '%':
+            directive = format[i + 1:i + 2]
+            if directive == '%':
+                parts.append('%%')
+            elif directive in _FIELDS:
+                conversion, index = _FIELDS[directive]
+                parts.append(conversion)
+                indexes.append(index)
+            else:
+                return None, None
+            i += 2
+        else:
+            parts.append(c)
+            i += 1
+
+    return ''.join(parts), tuple(indexes)
+
+
+def _format_offset(offset, separator):
+    sign = '-' if offset < 0 else '+'
+    minutes, seconds = divmod(abs(offset) // MICROSECS_PER_SEC, 60)
+    hours, minutes = divmod(minutes, 60)
+
+    s = '%s%02d%s%02d' % (sign, hours, separator, minutes)
+    if seconds:
+        s += '%s%02d' % (separator, seconds)
+    return s
+
+
+class Formatter(object):
+    """Renders Times as strings for a fixed format and timezone.
+
+    The timezone is resolved and the format broken into fields once, when the
+    Formatter is created. Formatters are cached by their arguments, so
+    `Time.to_str()` shares them too.
+    """
+    __slots__ = [
+        'format', 'tz', 'local', '_zone', '_template', '_fields', '_yday',
+        '_offset']
+
+    def __new__(cls, format=None, tz=None, local=False):
+        if tz and local:
+            raise ValueError("Either local or a specific timezone")
+
+        key = (format, tz, bool(local))
+        try:
+            return _FORMATTER_CACHE[key]
+        except KeyError:
+            pass
+
+        f = object.__new__(cls)
+        f.format = format
+        f.tz = tz
+        f.local = bool(local)
+
+        # The local zone can be refreshed, so it's looked up on each use.
+        f._zone = get_zone(tz) if tz else None
+
+        f._template = f._fields = None
+        f._yday = f._offset = False
+        if format is not None:
+            f._template, indexes = _compile_template(format)
+            if indexes is not None:
+                f._fields = operator.itemgetter(*indexes) if indexes else None
+                f._yday = 8 in indexes
+                f._offset = 9 in indexes
+
+        if len(_FORMATTER_CACHE) >= _FORMATTER_CACHE_MAX:
+            _FORMATTER_CACHE.clear()
+        _FORMATTER_CACHE[key] = f
+
+        return f
+
+    def __repr__(self):
+        return "<dmc.Formatter({!r}, tz={!r}, local={!r})>".format(
+            self.format, self.tz, self.local)
+
+    def __call__(self, t):
+        return self._render(t._us, self._get_zone())
+
+    def format_many(self, times):
+        render = self._render
+        zone = self._get_zone()
+        return [render(t._us, zone) for t in times]
+
+    def _get_zone(self):
+        if self.local:
+            return get_local_zone()
+        return self._zone
+
+    def _render(self, us, zone=False):
+        if zone is False:
+            zone = self._get_zone()
+
+        if self._template is None and self.format is not None:
+            if zone is None:
+                import pytz
+                dt = epoch.us_to_datetime(us).replace(tzinfo=pytz.UTC)
+            else:
+                dt = zone.to_datetime(us)
+            return dt.strftime(self.format)
+
+        if zone is None:
+            offset = 0
+            tzname = 'UTC'
+        else:
+            offset = zone.utcoffset(us)
+            tzname = zone.tzname(us)
+
+        days, us = divmod(us + offset, MICROSECS_PER_DAY)
+        date = _fromordinal(days + EPOCH_ORDINAL)
+        seconds, microsecond = divmod(us, MICROSECS_PER_SEC)
+        minutes, second = divmod(seconds, 60)
+        hour, minute = divmod(minutes, 60)
+
+        if self.format is None:
+            # ISO-8601, matching datetime.isoformat()
+            if offset == 0:
+                iso_offset = '+00:00'
+            else:
+                iso_offset = _format_offset(offset, ':')
+
+            if microsecond:
+                return _ISO_TEMPLATE_MICRO % (
+                    date.year, date.month, date.day, hour, minute, second,
+                    microsecond, iso_offset)
+            else:
+                return _ISO_TEMPLATE % (
+                    date.year, date.month, date.day, hour, minute, second,
+                    iso_offset)
+
+        if self._fields is None:
+            # Nothing but literals
+            return self._template % ()
+
+        yday = 0
+        if self._yday:
+            jan1 = _date(date.year, 1, 1).toordinal()
+            yday = days + EPOCH_ORDINAL - jan1 + 1
+
+        z = ''
+        if self._offset:
+            z = _format_offset(offset, '')
+
+        values = self._fields((
+            date.year, date.month, date.day, hour, minute, second,
+            microsecond, date.year % 100, yday, z, tzname))
+        if not isinstance(values, tuple):
+            values = (values,)
+
+        return self._template % values
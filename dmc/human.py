@@ -6,10 +6,31 @@
 The `humanize` module is great, except it has no understanding of timezone
 issues.  Also it can't respect our test hooks, so we'll just copy it in here.
 """
-from humanize.i18n import ngettext, gettext as _
 import datetime
 
-__all__ = ['naturaldelta', 'naturaltime', 'naturalday', 'naturaldate']
+__all__ = [
+    'naturaldelta', 'naturaltime', 'naturalday', 'naturaldate',
+    'HumanFormatter']
+
+
+# humanize is only imported once something actually gets humanized, then
+# its gettext functions are kept here.
+_gettext = None
+_ngettext = None
+
+
+def _(message):
+    global _gettext
+    if _gettext is None:
+        from humanize.i18n import gettext as _gettext
+    return _gettext(message)
+
+
+def ngettext(message, plural, num):
+    global _ngettext
+    if _ngettext is None:
+        from humanize.i18n import ngettext as _ngettext
+    return _ngettext(message, plural, num)
 
 
 def _now(tz=None, local=False):
@@ -183,3 +204,135 @@ def naturaldate(value, tz=None, local=False):
     if delta.days >= 365:
         return naturalday(value, '%b %d %Y', tz=tz, local=local)
     return naturalday(value, tz=tz, local=local)
+
+
+class HumanFormatter(object):
+    """Renders Times and Dates humanely, relative to a fixed `now`.
+
+    The functions above look up the current time (and today's date) again for
+    every value, often more than once. A HumanFormatter captures them once,
+    along with any translated strings it uses, so rendering a whole page of
+    values is cheap:
+
+        >> humane = HumanFormatter(tz='US/Pacific')
+        >> humane.times(t for t in events)
+        ['5 minutes ago', 'an hour ago', ...]
+
+    `now` defaults to Time.now(), so it respects set_mock_now(). `tz` and
+    `local` decide what 'today' means for dates.
+    """
+
+    def __init__(self, now=None, tz=None, local=False, months=True):
+        from .time import Time
+        from .date import Date
+
+        if now is None:
+            now = Time.now()
+
+        self.now = now
+        self.tz = tz
+        self.local = local
+        self.months = months
+
+        self._now_us = now._us
+        self._today = Date.from_time(now, tz=tz, local=local).toordinal()
+        self._strings = {}
+
+    def _(self, message):
+        try:
+            return self._strings[message]
+        except KeyError:
+            translated = self._strings[message] = _(message)
+            return translated
+
+    def _n(self, singular, plural, n):
+        key = (singular, plural, n)
+        try:
+            return self._strings[key]
+        except KeyError:
+            translated = self._strings[key] = ngettext(singular, plural, n) % n
+            return translated
+
+    def naturaldelta(self, us):
+        """Like naturaldelta(), for a number of microseconds."""
+        days, us = divmod(abs(us), 86400 * 1000000)
+        seconds = us // 1000000
+        years = days // 365
+        days = days % 365
+        months = int(days // 30.5)
+        _, _n = self._, self._n
+
+        if not years and days < 1:
+            if seconds == 0:
+                return _("a moment")
+            elif seconds == 1:
+                return _("a second")
+            elif seconds < 60:
+                return _n("%d second", "%d seconds", seconds)
+            elif 60 <= seconds < 120:
+                return _("a minute")
+            elif 120 <= seconds < 3600:
+                return _n("%d minute", "%d minutes", seconds // 60)
+            elif 3600 <= seconds < 3600 * 2:
+                return _("an hour")
+            else:
+                return _n("%d hour", "%d hours", seconds // 3600)
+        elif years == 0:
+            if days == 1:
+                return _("a day")
+            if not self.months or not months:
+                return _n("%d day", "%d days", days)
+            elif months == 1:
+                return _("a month")
+            else:
+                return _n("%d month", "%d months", months)
+        elif years == 1:
+            if not months and not days:
+                return _("a year")
+            elif not months or not self.months:
+                return _n("1 year, %d day", "1 year, %d days", days)
+            elif months == 1:
+                return _("1 year, 1 month")
+            else:
+                return _n("1 year, %d month", "1 year, %d months", months)
+        else:
+            return _n("%d year", "%d years", years)
+
+    def naturaltime(self, t):
+        """Like naturaltime(), for a Time."""
+        us = self._now_us - t._us
+        delta = self.naturaldelta(us)
+        if delta == self._("a moment"):
+            return self._("now")
+
+        if us < 0:
+            return self._('%s from now') % delta
+        else:
+            return self._('%s ago') % delta
+
+    def naturalday(self, d, format='%b %d'):
+        """Like naturalday(), for a Date."""
+        delta = d.toordinal() - self._today
+        if delta == 0:
+            return self._('today')
+        elif delta == 1:
+            return self._('tomorrow')
+        elif delta == -1:
+            return self._('yesterday')
+        return d.to_str(format)
+
+    def naturaldate(self, d):
+        """Like naturaldate(), for a Date."""
+        if abs(d.toordinal() - self._today) >= 365:
+            return self.naturalday(d, '%b %d %Y')
+        return self.naturalday(d)
+
+    def times(self, times):
+        """naturaltime() for each of `times`, as a list."""
+        naturaltime = self.naturaltime
+        return [naturaltime(t) for t in times]
+
+    def dates(self, dates):
+        """naturaldate() for each of `dates`, as a list."""
+        naturaldate = self.naturaldate
+        return [naturaldate(d) for d in dates]
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+"""
+Opt-in instrumentation of dmc's hot paths.
+
+Nothing is measured until stats are enabled, and until then the hot paths
+are untouched: enabling swaps counting wrappers in for the instrumented
+functions and methods, and disabling puts the originals back. So it can be
+left available in production and switched on in a live process:
+
+    dmc.enable_stats()
+    ...
+    dmc.stats()
+    {'timers': {'Time.to_str': {'calls': 1200, 'seconds': 0.0081}, ...},
+     'caches': {'zone': {'hits': 1198, 'misses': 2}, ...}}
+
+or just around a block of code:
+
+    with dmc.collect_stats() as stats:
+        handle_request()
+    print(stats['timers']['Time.from_str'])
+
+Timers count calls and the total time spent inside them, including any
+instrumented calls they make. Caches count lookups that found an existing
+entry and ones that had to build it. Counts are kept without locking, so
+with several threads they're close rather than exact.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import contextlib
+import functools
+import sys
+import time
+
+from . import format as format_module
+from . import human
+from . import parse
+from . import tz
+from .time import Time, TimeInterval, _INTERNED_INTERVALS
+
+try:
+    _timer = time.perf_counter
+except AttributeError:
+    _timer = time.time
+
+
+# name -> [calls, seconds]
+_TIMERS = {}
+# name -> [hits, misses]
+_CACHES = {}
+
+# (owner, attribute, original) for everything currently wrapped
+_PATCHES = []
+# (replacement, original) for module level functions currently wrapped
+_FUNCTION_PATCHES = []
+
+
+def _timed(name, func):
+    counter = _TIMERS.setdefault(name, [0, 0.0])
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = _timer()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            counter[0] += 1
+            counter[1] += _timer() - start
+    return wrapper
+
+
+def _cached(name, func, is_hit):
+    counter = _CACHES.setdefault(name, [0, 0])
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if is_hit(*args, **kwargs):
+            counter[0] += 1
+        else:
+            counter[1] += 1
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def _patch_attribute(owner, attr, wrap):
+    original = owner.__dict__[attr]
+    if isinstance(original, (classmethod, staticmethod)):
+        replacement = type(original)(wrap(original.__func__))
+    else:
+        replacement = wrap(original)
+    setattr(owner, attr, replacement)
+    _PATCHES.append((owner, attr, original))
+
+
+def _dmc_modules():
+    for module_name, module in list(sys.modules.items()):
+        if module is not None and (
+                module_name == 'dmc' or module_name.startswith('dmc.')):
+            yield module
+
+
+def _replace_everywhere(old, new):
+    for module in _dmc_modules():
+        for attr, value in list(vars(module).items()):
+            if value is old:
+                setattr(module, attr, new)
+
+
+def _patch_function(original, wrap):
+    """Replace a module level function everywhere dmc imported it.
+
+    dmc modules imported while stats are enabled pick up the replacement,
+    which is why unpatching searches for it again rather than only undoing
+    what was replaced here.
+    """
+    replacement = wrap(original)
+    _replace_everywhere(original, replacement)
+    _FUNCTION_PATCHES.append((replacement, original))
+
+
+def _formatter_hit(cls, format=None, tz=None, local=False):
+    return (format, tz, bool(local)) in format_module._FORMATTER_CACHE
+
+
+def _time_format_hit(cls, format):
+    return (
+        isinstance(format, parse.TimeFormat) or
+        format in parse._FORMAT_CACHE)
+
+
+def _interval_hit(cls, us):
+    return cls is TimeInterval and us in _INTERNED_INTERVALS
+
+
+def _zone_hit(name):
+    return name in tz._ZONE_CACHE
+
+
+def _instrument():
+    def timer(name):
+        return lambda func: _timed(name, func)
+
+    def cache(name, is_hit):
+        return lambda func: _cached(name, func, is_hit)
+
+    _patch_attribute(Time, '__init__', timer('Time.__init__'))
+    _patch_attribute(Time, 'from_str', timer('Time.from_str'))
+    _patch_attribute(Time, 'from_datetime', timer('Time.from_datetime'))
+    _patch_attribute(Time, 'to_str', timer('Time.to_str'))
+    _patch_attribute(Time, '_localized_dt', timer('Time._localized_dt'))
+    _patch_attribute(
+        human.HumanFormatter, 'naturaltime',
+        timer('HumanFormatter.naturaltime'))
+    _patch_function(human.naturaltime, timer('human.naturaltime'))
+
+    _patch_attribute(
+        format_module.Formatter, '__new__', cache('formatter', _formatter_hit))
+    _patch_attribute(
+        parse.TimeFormat, '__new__', cache('time_format', _time_format_hit))
+    _patch_attribute(
+        TimeInterval, '_from_us', cache('interned_interval', _interval_hit))
+    _patch_function(tz.get_zone, cache('zone', _zone_hit))
+
+
+def enabled():
+    return bool(_PATCHES or _FUNCTION_PATCHES)
+
+
+def enable_stats():
+    """Start counting. Does nothing if already enabled."""
+    if not enabled():
+        _instrument()
+
+
+def disable_stats():
+    """Stop counting, restoring the uninstrumented code. The counts so far
+    are kept."""
+    while _PATCHES:
+        owner, attr, original = _PATCHES.pop()
+        setattr(owner, attr, original)
+    while _FUNCTION_PATCHES:
+        replacement, original = _FUNCTION_PATCHES.pop()
+        _replace_everywhere(replacement, original)
+
+
+def reset_stats():
+    for counter in _TIMERS.values():
+        counter[0] = 0
+        counter[1] = 0.0
+    for counter in _CACHES.values():
+        counter[0] = counter[1] = 0
+
+
+def stats():
+    """The counts so far, as plain dicts."""
+    return {
+        'timers': dict(
+            (name, {'calls': calls, 'seconds': seconds})
+            for name, (calls, seconds) in _TIMERS.items()),
+        'caches': dict(
+            (name, {'hits': hits, 'misses': misses})
+            for name, (hits, misses) in _CACHES.items()),
+    }
+
+
+def _subtract(after, before):
+    return dict(
+        (group, dict(
+            (name, dict(
+                (field, value - before[group].get(name, {}).get(field, 0))
+                for field, value in counts.items()))
+            for name, counts in after[group].items()))
+        for group in after)
+
+
+@contextlib.contextmanager
+def collect_stats():
+    """Count whatever happens inside the block.
+
+    Yields a dict, which is filled in with the counts (as returned by stats())
+    for just the block when it exits. Stats are enabled for the block if they
+    aren't already, and left as they were afterwards.
+    """
+    was_enabled = enabled()
+    enable_stats()
+    before = stats()
+    collected = {}
+    try:
+        yield collected
+    finally:
+        collected.update(_subtract(stats(), before))
+        if not was_enabled:
+            disable_stats()
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+
+"""
+Pulling timestamps out of large log files.
+
+A LogFile memory maps the file and finds the timestamp of each line by
+looking at its bytes in place, so only the timestamp itself is ever copied
+out and decoded. Say where the timestamp is with one of:
+
+  * `column`, an int: the nth field, split on `delimiter` (whitespace by
+    default).
+  * `column`, a (start, end) pair: a fixed range of byte positions.
+  * `pattern`, a bytes regex searched for in each line. Its first group if it
+    has one, otherwise the whole match.
+
+The timestamp is then parsed with `format` (strptime style), or as ISO 8601
+if there's no format. Lines without a parseable timestamp, like the rest of
+a multi-line stack trace, are skipped.
+
+    with LogFile('app.log', column=0) as log:
+        for offset, t in log.times(start=log.seek(incident_start)):
+            ...
+
+For logs in time order, `seek()` binary searches the file for the first
+line at or after a given Time, so jumping into the middle of a huge log
+only parses a few dozen lines.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import mmap
+import re
+
+from . import parse
+from .epoch import MICROSECS_PER_MINUTE
+from .time import Time
+from .tz import get_zone, get_local_zone
+
+
+class LogFile(object):
+    def __init__(
+            self,
+            path,
+            column=None,
+            pattern=None,
+            delimiter=None,
+            format=None,
+            tz=None,
+            local=False):
+        if (column is None) == (pattern is None):
+            raise ValueError("Either a column or a pattern")
+        if tz and local:
+            raise ValueError("Either local or a specific timezone")
+
+        self.path = path
+        if pattern is not None:
+            regex = _pattern_regex(pattern)
+        elif isinstance(column, tuple):
+            regex = _span_regex(*column)
+        else:
+            regex = _field_regex(column, delimiter)
+        # Every line's timestamp is group 1 of a match starting at the line.
+        self._finditer = regex.finditer
+
+        if format is None:
+            self._parse_str = parse.parse_iso
+            self._parse = self._parse_iso
+        else:
+            self._parse_str = parse.TimeFormat(format).parse
+
+        # The whole seconds part of the last ISO timestamp, and its value
+        self._seconds = None
+        self._seconds_us = None
+
+        if tz:
+            self._zone = get_zone(tz)
+        elif local:
+            self._zone = get_local_zone()
+        else:
+            self._zone = None
+
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped.
+            self._map = b''
+
+    def __repr__(self):
+        return '<dmc.io.LogFile({!r})>'.format(self.path)
+
+    def close(self):
+        if not isinstance(self._map, bytes):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        """Size of the file in bytes."""
+        return len(self._map)
+
+    def __iter__(self):
+        return self.times()
+
+    def _parse(self, raw):
+        """Microseconds since the epoch for timestamp bytes, or None."""
+        try:
+            wall_us, offset = self._parse_str(raw.decode('ascii').strip())
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+        if offset is not None:
+            return wall_us - offset
+        elif self._zone is not None:
+            # Ambiguous wall times are taken as standard time.
+            return self._zone.localize(wall_us, is_dst=False)
+        return wall_us
+
+    def _parse_iso(self, raw):
+        """_parse() for ISO 8601 timestamps.
+
+        Consecutive lines almost always fall in the same second, so the
+        date and time are only parsed when they change. For each line only
+        the fraction and offset are parsed.
+        """
+        seconds = raw[:19]
+        if seconds != self._seconds:
+            self._seconds = seconds
+            self._seconds_us = self._parse_seconds(seconds)
+
+        tail = _iso_tail(raw[19:])
+        if self._seconds_us is None or tail is None:
+            # Some other shape, leave it to the general parser.
+            return LogFile._parse(self, raw)
+
+        fraction_us, offset_us = tail
+        if offset_us is not None:
+            return self._seconds_us[0] + fraction_us - offset_us
+        # Zone transitions fall on whole seconds, so the second's offset
+        # holds for the fraction too.
+        return self._seconds_us[1] + fraction_us
+
+    def _parse_seconds(self, seconds):
+        """(wall, UTC) microseconds for a whole seconds ISO timestamp, or None
+        if it isn't one.
+
+        Only extended form 'YYYY-MM-DDTHH:MM:SS' is taken. Shorter forms can
+        fit a fraction or an offset into the first 19 bytes, so those lines
+        go to the general parser.
+        """
+        if seconds[4:5] != b'-' or seconds[16:17] != b':':
+            return None
+        try:
+            wall_us, offset = self._parse_str(seconds.decode('ascii'))
+        except (ValueError, UnicodeDecodeError):
+            return None
+        if offset is not None:
+            return None
+        if self._zone is not None:
+            return wall_us, self._zone.localize(wall_us, is_dst=False)
+        return wall_us, wall_us
+
+    def _entries(self, start=0, stop=None):
+        """(line offset, microseconds) for each line with a timestamp,
+        starting with the line at `start` and stopping before `stop`."""
+        parse = self._parse
+        last_raw = last_us = None
+
+        for match in self._finditer(self._map, start):
+            offset = match.start()
+            if stop is not None and offset >= stop:
+                return
+
+            # Log lines often share a timestamp with the line before.
+            raw = match.group(1)
+            if raw != last_raw:
+                last_raw = raw
+                last_us = parse(raw)
+            if last_us is not None:
+                yield offset, last_us
+
+    def microseconds(self, start=0):
+        """Generate (offset, microseconds since the epoch) for each line with a
+        timestamp, from the line starting at byte `start`."""
+        return self._entries(start)
+
+    def times(self, start=0):
+        """Generate (offset, Time) for each line with a timestamp, from the
+        line starting at byte `start`."""
+        from_us = Time._from_us
+        for offset, us in self._entries(start):
+            yield offset, from_us(us)
+
+    def line(self, offset):
+        """The line starting at `offset`, as bytes without the newline."""
+        end = self._map.find(b'\n', offset)
+        if end < 0:
+            end = len(self._map)
+        return self._map[offset:end]
+
+    def _line_start(self, pos):
+        """Offset of the first line starting at or after `pos`."""
+        if pos == 0:
+            return 0
+        newline = self._map.find(b'\n', pos - 1)
+        if newline < 0:
+            return len(self._map)
+        return newline + 1
+
+    def seek(self, t):
+        """Offset of the first line timestamped at or after `t`, or the size
+        of the file if there isn't one. The log must be in time order."""
+        target = t._us
+
+        # Every timestamp before lo is earlier than t, every one from hi on
+        # is at or after it. Both are always line starts.
+        lo, hi = 0, len(self._map)
+        while lo < hi:
+            start = self._line_start((lo + hi) // 2)
+            if start >= hi:
+                break
+
+            for offset, us in self._entries(start, hi):
+                if us < target:
+                    lo = self._line_start(offset + 1)
+                else:
+                    hi = offset
+                break
+            else:
+                # Nothing with a timestamp in there
+                hi = start
+
+        # Lines from hi on without a timestamp are skipped too.
+        for offset, us in self._entries(lo):
+            if us >= target:
+                return offset
+        return len(self._map)
+
+
+_ISO_TAIL = re.compile(br'(?:[.,](\d+))?(Z|[+-]\d\d:?\d\d)?\s*$').match
+
+# Parsed fraction and offset parts of ISO timestamps, keyed by their bytes.
+# Millisecond timestamps only have a few thousand of them.
+_TAILS = {}
+_TAILS_SIZE = 10000
+
+_OFFSETS = {}
+
+
+def _iso_tail(tail):
+    """(fraction microseconds, offset microseconds or None) for what follows
+    the seconds of an ISO timestamp, or None if it isn't valid."""
+    try:
+        return _TAILS[tail]
+    except KeyError:
+        pass
+
+    match = _ISO_TAIL(tail)
+    if match is None:
+        return None
+
+    fraction, offset = match.groups()
+    if fraction:
+        fraction_us = int((fraction + b'00000')[:6])
+    else:
+        fraction_us = 0
+    if offset is not None:
+        offset = _offset_us(offset)
+
+    if len(_TAILS) >= _TAILS_SIZE:
+        _TAILS.clear()
+    _TAILS[tail] = parsed = (fraction_us, offset)
+    return parsed
+
+
+def _offset_us(offset):
+    """Microseconds for a UTC offset like b'Z', b'-07:00' or b'+0530'."""
+    try:
+        return _OFFSETS[offset]
+    except KeyError:
+        pass
+
+    if offset == b'Z':
+        us = 0
+    else:
+        digits = offset[1:].replace(b':', b'')
+        us = (int(digits[:2]) * 60 + int(digits[2:])) * MICROSECS_PER_MINUTE
+        if offset[:1] == b'-':
+            us = -us
+
+    _OFFSETS[offset] = us
+    return us
+
+
+def _as_bytes(s):
+    if isinstance(s, bytes):
+        return s
+    return s.encode('ascii')
+
+
+def _line_regex(body):
+    """Compile a regex matching a line, from its start, with the timestamp
+    as group 1. Matching the rest of the line too lets finditer() skip
+    straight to the next one."""
+    return re.compile(b'^' + body + br'[^\n]*', re.MULTILINE)
+
+
+def _pattern_regex(pattern):
+    pattern = _as_bytes(pattern)
+    if re.compile(pattern).groups:
+        pattern = b'(?:' + pattern + b')'
+    else:
+        pattern = b'(' + pattern + b')'
+    return _line_regex(br'[^\n]*?' + pattern)
+
+
+def _span_regex(start, end):
+    return _line_regex(
+        '.{{{}}}(.{{1,{}}})'.format(start, end - start).encode('ascii'))
+
+
+def _field_regex(column, delimiter):
+    if delimiter is None:
+        lead, field, separator = br'[ \t]*', br'[^\s]*', br'[ \t]+'
+    else:
+        d = re.escape(_as_bytes(delimiter))
+        lead, field, separator = b'', br'[^\n' + d + b']*', d
+    return _line_regex(
+        lead + b'(?:' + field + separator + b')' +
+        '{{{}}}'.format(column).encode('ascii') + b'(' + field + b')')
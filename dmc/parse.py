@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+
+"""
+Parsing strings into microseconds since the epoch.
+
+Parsers here return ``(wall_us, offset)`` pairs rather than dmc objects.
+``wall_us`` is the wall clock time found in the string, expressed as
+microseconds since the epoch, and ``offset`` is the UTC offset (also in
+microseconds) if the string carried one, or None. Subtracting the offset gives
+the UTC instant, naive values are left for the caller to localize.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import datetime
+import re
+
+from . import epoch
+from .epoch import MICROSECS_PER_SEC, MICROSECS_PER_MINUTE, EPOCH_ORDINAL
+
+
+_fromisoformat = getattr(datetime.datetime, 'fromisoformat', None)
+# Only shapes the `iso8601` module also accepts, so taking the fast path
+# never changes what parses: upper-case T and Z, and at least one digit of
+# fraction.
+_ISO_FAST_MATCH = re.compile(
+    r'[0-9]{4}-[0-9]{2}-[0-9]{2}[T ][0-9]{2}:[0-9]{2}:[0-9]{2}'
+    r'(?:[.,][0-9]+)?(?:Z|[-+][0-9]{2}:?[0-9]{2})?\Z').match
+_SIGNS = {'+': 1, '-': -1}
+
+
+def parse_iso(s):
+    """Parse an ISO-8601 string into ``(wall_us, offset)``.
+
+    The common fixed width shapes, ``YYYY-MM-DDTHH:MM:SS[.ffffff][Z|±HH:MM]``,
+    are handled by slicing. Anything else falls back to the `iso8601` module.
+    """
+    result = _parse_iso_fast(s)
+    if result is None:
+        result = _parse_iso_generic(s)
+    return result
+
+
+def _parse_iso_fast(s):
+    """Returns None if `s` isn't in one of the shapes we know how to handle
+    quickly, rather than raising. The generic parser gets to produce the
+    error.
+    """
+    if _ISO_FAST_MATCH(s) is None:
+        return None
+
+    if _fromisoformat is not None:
+        # Newer pythons ship a C parser for exactly these shapes.
+        try:
+            return split_datetime(_fromisoformat(s))
+        except ValueError:
+            pass
+
+    digits = s[0:4] + s[5:7] + s[8:10] + s[11:13] + s[14:16] + s[17:19]
+    tail = s[19:]
+    offset = None
+    if tail:
+        if tail[-1] == 'Z':
+            offset = 0
+            tail = tail[:-1]
+        elif len(tail) >= 6 and tail[-6] in _SIGNS and tail[-3] == ':':
+            offset = _parse_offset(tail[-6], tail[-5:-3], tail[-2:])
+            tail = tail[:-6]
+        elif len(tail) >= 5 and tail[-5] in _SIGNS:
+            offset = _parse_offset(tail[-5], tail[-4:-2], tail[-2:])
+            tail = tail[:-5]
+
+        if offset is False:
+            return None
+
+    microsecond = 0
+    if tail:
+        fraction = tail[1:]
+        # Anything beyond microseconds is truncated, like iso8601 does.
+        microsecond = int((fraction + '00000')[:6])
+
+    # One int() call for all the fields is much cheaper than six.
+    n = int(digits)
+    n, second = divmod(n, 100)
+    n, minute = divmod(n, 100)
+    n, hour = divmod(n, 100)
+    n, day = divmod(n, 100)
+    year, month = divmod(n, 100)
+
+    try:
+        wall_us = epoch.fields_to_us(
+            year, month, day, hour, minute, second, microsecond)
+    except ValueError:
+        return None
+
+    return wall_us, offset
+
+
+def _parse_offset(sign, hours, minutes):
+    if not (hours + minutes).isdigit():
+        return False
+
+    hours = int(hours)
+    minutes = int(minutes)
+    if hours > 23 or minutes > 59:
+        return False
+
+    return _SIGNS[sign] * (hours * 60 + minutes) * MICROSECS_PER_MINUTE
+
+
+def _parse_iso_generic(s):
+    import iso8601
+    return split_datetime(iso8601.parse_date(s, default_timezone=None))
+
+
+def split_datetime(dt):
+    """Break a (possibly naive) datetime into ``(wall_us, offset)``."""
+    offset = dt.utcoffset()
+    if offset is not None:
+        offset = epoch.timedelta_to_us(offset)
+
+    # Going through the fields is cheaper than datetime subtraction.
+    wall_us = (
+        ((((dt.toordinal() - EPOCH_ORDINAL) * 24 + dt.hour) * 60 +
+          dt.minute) * 60 + dt.second) * MICROSECS_PER_SEC + dt.microsecond)
+
+    return wall_us, offset
+
+
+_MONTH_ABBRS = (
+    'jan', 'feb', 'mar', 'apr', 'may', 'jun',
+    'jul', 'aug', 'sep', 'oct', 'nov', 'dec')
+_MONTH_NAMES = (
+    'january', 'february', 'march', 'april', 'may', 'june', 'july',
+    'august', 'september', 'october', 'november', 'december')
+_WEEKDAY_ABBRS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+_WEEKDAY_NAMES = (
+    'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday',
+    'sunday')
+
+# Same expressions `_strptime` uses, in the C locale. Directives not listed
+# here (the locale dependent ones like %c or %x) fall back to strptime.
+_DIRECTIVES = {
+    'Y': r'(?P<Y>\d\d\d\d)',
+    'y': r'(?P<y>\d\d)',
+    'm': r'(?P<m>1[0-2]|0[1-9]|[1-9])',
+    'd': r'(?P<d>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])',
+    'H': r'(?P<H>2[0-3]|[0-1]\d|\d)',
+    'I': r'(?P<I>1[0-2]|0[1-9]|[1-9])',
+    'M': r'(?P<M>[0-5]\d|\d)',
+    'S': r'(?P<S>6[0-1]|[0-5]\d|\d)',
+    'f': r'(?P<f>[0-9]{1,6})',
+    'p': r'(?P<p>am|pm)',
+    'j': (r'(?P<j>36[0-6]|3[0-5]\d|[12]\d\d|0[1-9]\d|00[1-9]|[1-9]\d|0[1-9]'
+          r'|[1-9])'),
+    'z': r'(?P<z>[+-]\d\d:?[0-5]\d|Z)',
+    'b': r'(?P<b>%s)' % '|'.join(_MONTH_ABBRS),
+    'h': r'(?P<b>%s)' % '|'.join(_MONTH_ABBRS),
+    'B': r'(?P<B>%s)' % '|'.join(_MONTH_NAMES),
+    'a': r'(?:%s)' % '|'.join(_WEEKDAY_ABBRS),
+    'A': r'(?:%s)' % '|'.join(_WEEKDAY_NAMES),
+    '%': '%',
+}
+
+_FORMAT_CACHE = {}
+_FORMAT_CACHE_MAX = 256
+
+
+def _compile_format(format):
+    """Translate a strptime format into a compiled regex, or None if it uses
+    directives we don't handle ourselves."""
+    parts = []
+    seen = set()
+    i = 0
+    while i < len(format):
+        c = format[i]
+        if c == '%':
+            directive = format[i + 1:i + 2]
+            if directive not in _DIRECTIVES or directive in seen:
+                return None
+            if directive != '%':
+                seen.add(directive)
+            parts.append(_DIRECTIVES[directive])
+            i += 2
+        elif c.isspace():
+            while i < len(format) and format[i].isspace():
+                i += 1
+            parts.append(r'\s+')
+        else:
+            parts.append(re.escape(c))
+            i += 1
+
+    if 'b' in seen and 'h' in seen:
+        return None
+
+    return re.compile(''.join(parts) + r'\Z', re.IGNORECASE)
+
+
+class TimeFormat(object):
+    """A strptime style format, compiled once into a parser.
+
+    Instances are cached by their format string, so constructing one is
+    cheap and `Time.from_str(s, format=...)` shares the same compiled parser.
+    The C locale is always assumed for month and weekday names.
+    """
+    __slots__ = ['format', '_match']
+
+    def __new__(cls, format):
+        if isinstance(format, TimeFormat):
+            return format
+
+        try:
+            return _FORMAT_CACHE[format]
+        except KeyError:
+            pass
+
+        tf = object.__new__(cls)
+        tf.format = format
+
+        regex = _compile_format(format)
+        tf._match = regex.match if regex is not None else None
+
+        if len(_FORMAT_CACHE) >= _FORMAT_CACHE_MAX:
+            _FORMAT_CACHE.clear()
+        _FORMAT_CACHE[format] = tf
+
+        return tf
+
+    def __repr__(self):
+        return "<dmc.TimeFormat({!r})>".format(self.format)
+
+    def parse(self, s):
+        """Parse `s` into ``(wall_us, offset)``."""
+        if self._match is None:
+            return split_datetime(datetime.datetime.strptime(s, self.format))
+
+        m = self._match(s)
+        if m is None:
+            raise ValueError(
+                "time data {!r} does not match format {!r}".format(
+                    s, self.format))
+
+        fields = m.groupdict()
+
+        if 'Y' in fields:
+            year = int(fields['Y'])
+        elif 'y' in fields:
+            year = int(fields['y'])
+            year += 1900 if year >= 69 else 2000
+        else:
+            year = 1900
+
+        if 'm' in fields:
+            month = int(fields['m'])
+        elif 'b' in fields:
+            month = _MONTH_ABBRS.index(fields['b'].lower()) + 1
+        elif 'B' in fields:
+            month = _MONTH_NAMES.index(fields['B'].lower()) + 1
+        else:
+            month = None
+
+        day = int(fields['d']) if 'd' in fields else None
+
+        if 'H' in fields:
+            hour = int(fields['H'])
+        elif 'I' in fields:
+            hour = int(fields['I']) % 12
+            if fields.get('p', '').lower() == 'pm':
+                hour += 12
+        else:
+            hour = 0
+
+        minute = int(fields['M']) if 'M' in fields else 0
+        second = int(fields['S']) if 'S' in fields else 0
+        microsecond = int((fields['f'] + '00000')[:6]) if 'f' in fields else 0
+
+        if 'j' in fields and month is None and day is None:
+            date = datetime.date.fromordinal(
+                datetime.date(year, 1, 1).toordinal() + int(fields['j']) - 1)
+            year, month, day = date.year, date.month, date.day
+
+        wall_us = epoch.fields_to_us(
+            year, month or 1, day or 1, hour, minute, second, microsecond)
+
+        offset = None
+        if 'z' in fields:
+            z = fields['z']
+            if z in ('Z', 'z'):
+                offset = 0
+            else:
+                offset = _parse_offset(z[0], z[1:3], z[-2:])
+                if offset is False:
+                    raise ValueError("invalid utc offset {!r}".format(z))
+
+        return wall_us, offset
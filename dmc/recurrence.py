@@ -0,0 +1,505 @@
+# -*- coding: utf-8 -*-
+
+"""
+Recurrence rules.
+
+A Recurrence describes a repeating schedule in the spirit of iCalendar's
+RRULE, for example every 2nd Tuesday of the month at 09:00 New York time:
+
+    >> r = dmc.Recurrence(
+    ..     dmc.MONTHLY, dmc.Date(2014, 1, 1), weekdays=[(1, 2)], at=(9, 0),
+    ..     tz='America/New_York')
+    >> r.next_after(dmc.Time.now())
+
+or the last business day of every month:
+
+    >> dmc.Recurrence(dmc.MONTHLY, start, business_day=-1, calendar=cal)
+
+Occurrences are expanded a calendar year at a time into a sorted block of
+instants, and blocks are cached on the rule. Finding the next occurrence after
+some Time goes straight to the block for that year and bisects, rather than
+stepping forward from the start of the rule.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import bisect
+
+from .date import (
+    Date, _DAYS_IN_MONTH, _is_leap, _ymd_to_ord, _year_bounds)
+from .epoch import MICROSECS_PER_SEC, MICROSECS_PER_DAY, EPOCH_ORDINAL
+from .time import Time, _wall_to_us
+
+
+DAILY = 'daily'
+WEEKLY = 'weekly'
+MONTHLY = 'monthly'
+YEARLY = 'yearly'
+
+FREQUENCIES = (DAILY, WEEKLY, MONTHLY, YEARLY)
+
+_BLOCK_CACHE_MAX = 64
+
+# If this many years go by without an occurrence, there aren't going to be
+# any more. (The Gregorian calendar repeats every 400 years)
+_MAX_EMPTY_YEARS = 400
+
+
+def _weekday(ordinal):
+    return (ordinal + 6) % 7
+
+
+def _nth(days, n):
+    """The `n`th (1 based, negative counts from the end) of `days`, as a
+    list."""
+    if n > 0 and n <= len(days):
+        return [days[n - 1]]
+    elif n < 0 and -n <= len(days):
+        return [days[n]]
+    else:
+        return []
+
+
+class Recurrence(object):
+    """A repeating schedule, starting on the Date `start`.
+
+    `freq` is one of DAILY, WEEKLY, MONTHLY or YEARLY, and the rule fires
+    every `interval` of them. Which days within a period it fires on can be
+    narrowed with:
+
+      * weekdays - days of the week (Monday is 0). For monthly and yearly
+        rules an entry can also be a (weekday, n) tuple, meaning the nth such
+        day of the month (or of the year), counting from the end if n is
+        negative.
+      * month_days - days of the month, negative counting from the end.
+      * months - months of the year.
+      * business_day - the nth business day of each period (negative counts
+        from the end), according to `calendar`.
+
+    With none of those, the rule fires on the same weekday, day of the month
+    or date as `start`. If a `calendar` and `roll` ('next' or 'previous') are
+    given, occurrences that fall on non-business days are moved to the
+    nearest business day in that direction.
+
+    Occurrences happen at the times of day in `at` (an (hour, minute[,
+    second]) tuple or a list of them, midnight by default) on the wall clock
+    of `tz`, or local time, or UTC. The rule stops after `until` (a Date) or
+    after `count` occurrences.
+    """
+
+    def __init__(
+            self,
+            freq,
+            start,
+            interval=1,
+            weekdays=None,
+            month_days=None,
+            months=None,
+            business_day=None,
+            calendar=None,
+            roll=None,
+            at=None,
+            tz=None,
+            local=False,
+            until=None,
+            count=None):
+        if freq not in FREQUENCIES:
+            raise ValueError("Unknown frequency {!r}".format(freq))
+        if interval < 1:
+            raise ValueError("interval must be positive")
+        if tz and local:
+            raise ValueError("Either local or a specific timezone")
+        if (business_day is not None or roll) and calendar is None:
+            raise ValueError("Business days need a calendar")
+        if business_day is not None and freq == DAILY:
+            raise ValueError("business_day doesn't apply to daily rules")
+        if roll not in (None, 'next', 'previous'):
+            raise ValueError("roll must be 'next' or 'previous'")
+
+        self.freq = freq
+        self.start = start
+        self.interval = interval
+        self.months = sorted(set(months)) if months else None
+        self.month_days = sorted(set(month_days)) if month_days else None
+        self.business_day = business_day
+        self.calendar = calendar
+        self.roll = roll
+        self.tz = tz
+        self.local = local
+        self.until = until
+        self.count = count
+
+        # Plain weekdays, and (weekday, n) pairs
+        self.weekdays = None
+        self._nth_weekdays = []
+        if weekdays:
+            self.weekdays = []
+            for weekday in weekdays:
+                if isinstance(weekday, tuple):
+                    self._nth_weekdays.append(weekday)
+                else:
+                    self.weekdays.append(weekday)
+            self.weekdays.sort()
+        if self._nth_weekdays and freq not in (MONTHLY, YEARLY):
+            raise ValueError(
+                "(weekday, n) only applies to monthly and yearly rules")
+
+        if at is None:
+            at = [(0, 0)]
+        elif isinstance(at, tuple):
+            at = [at]
+        self._seconds = sorted(set(
+            (t[0] * 60 + t[1]) * 60 + (t[2] if len(t) > 2 else 0)
+            for t in at))
+
+        self._start_year = start.year
+        self._start_period = self._period(start._ord)
+        self._blocks = {}
+        # For counted rules, occurrences before each year since the start.
+        self._counts = [0]
+
+    def __repr__(self):
+        return "<dmc.Recurrence({}, {})>".format(self.freq, self.start)
+
+    def _period(self, ordinal):
+        if self.freq == DAILY:
+            return ordinal
+        elif self.freq == WEEKLY:
+            # 0001-01-01 was a Monday
+            return (ordinal - 1) // 7
+
+        year, month, _ = Date._from_ordinal(ordinal)._fields()
+        if self.freq == MONTHLY:
+            return year * 12 + month - 1
+        else:
+            return year
+
+    def _fires(self, period):
+        return (
+            period >= self._start_period and
+            (period - self._start_period) % self.interval == 0)
+
+    def _month_range(self, year, month):
+        first = _ymd_to_ord(year, month, 1)
+        return first, first + _DAYS_IN_MONTH[_is_leap(year)][month] - 1
+
+    def _weekdays_in(self, first, last, weekdays):
+        """Ordinals between `first` and `last` (inclusive) falling on
+        `weekdays`."""
+        days = []
+        for weekday in weekdays:
+            days.extend(range(
+                first + (weekday - _weekday(first)) % 7, last + 1, 7))
+        return days
+
+    def _by_day(self, first, last, month_ranges, default):
+        """Days selected by weekdays/month_days within a period, or
+        `default` if neither narrows it down.
+
+        month_days are ignored if `month_ranges` is None.
+        """
+        selected = None
+
+        if self.month_days and month_ranges is not None:
+            selected = set()
+            for month_first, month_last in month_ranges:
+                length = month_last - month_first + 1
+                for day in self.month_days:
+                    if day < 0:
+                        day += length + 1
+                    if 1 <= day <= length:
+                        selected.add(month_first + day - 1)
+
+        if self.weekdays or self._nth_weekdays:
+            by_weekday = set(
+                self._weekdays_in(first, last, self.weekdays or []))
+            for weekday, n in self._nth_weekdays:
+                by_weekday.update(
+                    _nth(self._weekdays_in(first, last, [weekday]), n))
+            if selected is None:
+                selected = by_weekday
+            else:
+                selected &= by_weekday
+
+        if selected is None:
+            return default()
+        return sorted(selected)
+
+    def _expand_period(self, period, first, last):
+        """Occurrence ordinals within one (firing) period covering `first` to
+        `last`."""
+        start = self.start
+
+        if self.freq == DAILY:
+            return [first]
+
+        elif self.freq == WEEKLY:
+            def default():
+                if self.business_day is not None:
+                    return list(range(first, last + 1))
+                return [first + _weekday(start._ord)]
+
+            days = self._by_day(first, last, None, default)
+
+        elif self.freq == MONTHLY:
+            def default():
+                if self.business_day is not None:
+                    return list(range(first, last + 1))
+                day = first + start.day - 1
+                return [day] if day <= last else []
+
+            days = self._by_day(first, last, [(first, last)], default)
+
+        else:
+            year = period
+            if self.months:
+                days = []
+                for month in self.months:
+                    month_first, month_last = self._month_range(year, month)
+
+                    def default():
+                        if self.business_day is not None:
+                            return list(range(month_first, month_last + 1))
+                        day = month_first + start.day - 1
+                        return [day] if day <= month_last else []
+
+                    days.extend(self._by_day(
+                        month_first, month_last,
+                        [(month_first, month_last)], default))
+            else:
+                def default():
+                    if self.business_day is not None:
+                        return list(range(first, last + 1))
+                    month_first, month_last = self._month_range(
+                        year, start.month)
+                    day = month_first + start.day - 1
+                    return [day] if day <= month_last else []
+
+                days = self._by_day(
+                    first, last,
+                    [self._month_range(year, month) for month in range(1, 13)],
+                    default)
+
+        if self.business_day is not None:
+            is_business_day = self.calendar._is_business_ordinal
+            days = _nth(
+                [day for day in days if is_business_day(day)],
+                self.business_day)
+
+        return days
+
+    def _periods(self, year):
+        """(period, first ordinal, last ordinal) for each firing period
+        overlapping `year`."""
+        year_first, year_end = _year_bounds(year)
+        year_last = year_end - 1
+
+        if self.freq == DAILY:
+            first_day = max(year_first, self.start._ord)
+            offset = (first_day - self._start_period) % self.interval
+            if offset:
+                first_day += self.interval - offset
+            return [
+                (day, day, day)
+                for day in range(first_day, year_end, self.interval)]
+
+        elif self.freq == WEEKLY:
+            periods = []
+            for week in range(
+                    (year_first - 1) // 7, (year_last - 1) // 7 + 1):
+                if self._fires(week):
+                    first = week * 7 + 1
+                    periods.append((week, first, first + 6))
+            return periods
+
+        elif self.freq == MONTHLY:
+            periods = []
+            for month in self.months or range(1, 13):
+                period = year * 12 + month - 1
+                if self._fires(period):
+                    first, last = self._month_range(year, month)
+                    periods.append((period, first, last))
+            return periods
+
+        else:
+            if self._fires(year):
+                return [(year, year_first, year_last)]
+            return []
+
+    def _base_days(self, year):
+        """Occurrence ordinals in `year`, before rolling or counting."""
+        year_first, year_end = _year_bounds(year)
+        lowest = max(year_first, self.start._ord)
+        highest = year_end - 1
+        if self.until is not None:
+            highest = min(highest, self.until._ord)
+
+        days = []
+        for period, first, last in self._periods(year):
+            days.extend(
+                day for day in self._expand_period(period, first, last)
+                if lowest <= day <= highest)
+
+        if self.months and self.freq in (DAILY, WEEKLY):
+            months = set(self.months)
+            days = [
+                day for day in days
+                if Date._from_ordinal(day).month in months]
+        if self.month_days and self.freq in (DAILY, WEEKLY):
+            days = self._month_day_filter(days)
+        if self.weekdays and self.freq == DAILY:
+            weekdays = set(self.weekdays)
+            days = [day for day in days if _weekday(day) in weekdays]
+
+        return sorted(set(days))
+
+    def _month_day_filter(self, days):
+        kept = []
+        for day in days:
+            d = Date._from_ordinal(day)
+            length = _DAYS_IN_MONTH[_is_leap(d.year)][d.month]
+            for month_day in self.month_days:
+                if month_day < 0:
+                    month_day += length + 1
+                if month_day == d.day:
+                    kept.append(day)
+                    break
+        return kept
+
+    def _days(self, year):
+        """Occurrence ordinals in `year`, after rolling onto business days."""
+        if not self.roll:
+            return self._base_days(year)
+
+        # Rolling can move occurrences across the new year
+        calendar = self.calendar
+        step = 1 if self.roll == 'next' else -1
+        year_first, year_end = _year_bounds(year)
+
+        days = set()
+        for y in (year - 1, year, year + 1):
+            if not 1 <= y <= 9999:
+                continue
+            for day in self._base_days(y):
+                if not calendar._is_business_ordinal(day):
+                    day = calendar.add(Date._from_ordinal(day), step)._ord
+                if year_first <= day < year_end:
+                    days.add(day)
+        return sorted(days)
+
+    def _count_before(self, year):
+        counts = self._counts
+        while len(counts) <= year - self._start_year:
+            if counts[-1] >= self.count:
+                return counts[-1]
+            counts.append(
+                counts[-1] +
+                len(self._days(self._start_year + len(counts) - 1)) *
+                len(self._seconds))
+        return counts[year - self._start_year]
+
+    def _block(self, year):
+        """Sorted UTC microseconds of every occurrence in (local) `year`,
+        and the occurrence Dates."""
+        block = self._blocks.get(year)
+        if block is not None:
+            return block
+
+        days = self._days(year) if year >= self._start_year else []
+
+        us = []
+        for day in days:
+            wall_us = (day - EPOCH_ORDINAL) * MICROSECS_PER_DAY
+            for seconds in self._seconds:
+                us.append(_wall_to_us(
+                    wall_us + seconds * MICROSECS_PER_SEC, self.tz,
+                    self.local))
+        us.sort()
+
+        if self.count is not None and us:
+            remaining = max(self.count - self._count_before(year), 0)
+            us = us[:remaining]
+            days = days[:-(-remaining // len(self._seconds))]
+
+        if len(self._blocks) >= _BLOCK_CACHE_MAX:
+            self._blocks.clear()
+        block = self._blocks[year] = (us, days)
+
+        return block
+
+    def _last_year(self):
+        if self.until is not None:
+            return min(self.until.year, 9999)
+        return 9999
+
+    def _years(self, year):
+        """Years from `year` on that could hold occurrences."""
+        year = max(year, self._start_year)
+        last_year = self._last_year()
+        empty = 0
+        while year <= last_year and empty < _MAX_EMPTY_YEARS:
+            if (self.count is not None and
+                    self._count_before(year) >= self.count):
+                return
+
+            us, days = self._block(year)
+            if us:
+                empty = 0
+            else:
+                empty += 1
+            yield year, us, days
+
+            year += 1
+
+    def next_after(self, t):
+        """The first occurrence strictly after `t` (a Time), or None."""
+        year = Date.from_time(t, tz=self.tz, local=self.local).year
+
+        for year, us, _ in self._years(year):
+            i = bisect.bisect_right(us, t._us)
+            if i < len(us):
+                return Time._from_us(us[i])
+
+        return None
+
+    def times(self, after=None):
+        """Generate occurrence Times, starting with the first after `after`
+        if it's given."""
+        if after is None:
+            year = self._start_year
+            after_us = None
+        else:
+            year = Date.from_time(after, tz=self.tz, local=self.local).year
+            after_us = after._us
+
+        from_us = Time._from_us
+        for year, us, _ in self._years(year):
+            i = 0
+            if after_us is not None:
+                i = bisect.bisect_right(us, after_us)
+            for occurrence in us[i:]:
+                yield from_us(occurrence)
+
+    def dates(self, after=None):
+        """Generate the Dates the rule fires on, starting with the first after
+        the Date `after` if it's given."""
+        if after is None:
+            year = self._start_year
+            after_ord = None
+        else:
+            year = after.year
+            after_ord = after._ord
+
+        from_ordinal = Date._from_ordinal
+        for year, _, days in self._years(year):
+            i = 0
+            if after_ord is not None:
+                i = bisect.bisect_right(days, after_ord)
+            for day in days[i:]:
+                yield from_ordinal(day)
+
+    def __iter__(self):
+        return self.times()
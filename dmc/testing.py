@@ -1,8 +1,44 @@
 import contextlib
+import math
+import threading
+
+from .epoch import MICROSECS_PER_SEC
+
+try:
+    import contextvars
+except ImportError:
+    # python 2, fall back to keeping virtual clocks per thread
+    contextvars = None
 
 _MOCK_NOW = []
 
 
+if contextvars is not None:
+    _VIRTUAL_CLOCK = contextvars.ContextVar('dmc_virtual_clock', default=None)
+
+    def _get_virtual_clock():
+        return _VIRTUAL_CLOCK.get()
+
+    def _set_virtual_clock(clock):
+        return _VIRTUAL_CLOCK.set(clock)
+
+    def _reset_virtual_clock(token):
+        _VIRTUAL_CLOCK.reset(token)
+else:
+    _VIRTUAL_CLOCKS = threading.local()
+
+    def _get_virtual_clock():
+        return getattr(_VIRTUAL_CLOCKS, 'clock', None)
+
+    def _set_virtual_clock(clock):
+        token = _get_virtual_clock()
+        _VIRTUAL_CLOCKS.clock = clock
+        return token
+
+    def _reset_virtual_clock(token):
+        _VIRTUAL_CLOCKS.clock = token
+
+
 def set_mock_now(now):
     _MOCK_NOW.insert(0, now)
 
@@ -12,14 +48,104 @@ def clear_mock_now():
 
 
 def get_mock_now():
-    try:
+    if _MOCK_NOW:
         return _MOCK_NOW[0]
-    except IndexError:
-        return None
+
+    clock = _get_virtual_clock()
+    if clock is not None:
+        return clock.now()
+
+    return None
 
 
 @contextlib.contextmanager
 def MockNow(now):
     set_mock_now(now)
-    yield
-    clear_mock_now()
+    depth = len(_MOCK_NOW)
+    try:
+        yield
+    finally:
+        # Undo our own mock and anything set on top of it inside the block,
+        # leaving any we're nested in alone.
+        del _MOCK_NOW[:max(len(_MOCK_NOW) - depth + 1, 0)]
+
+
+def _as_us(interval):
+    if hasattr(interval, '_us'):
+        # A TimeInterval
+        return interval._us
+    return int(math.ceil(interval * MICROSECS_PER_SEC))
+
+
+class VirtualClock(object):
+    """A clock that only moves when told to.
+
+    While active (as a context manager, scoped to the current thread or
+    asyncio task) Time.now() reads this clock rather than the system one:
+
+        with VirtualClock(Time(2014, 4, 18)) as clock:
+            schedule_expiry()
+            clock.advance(TimeInterval(hours=6))
+            check_expired()
+
+    `new_event_loop()` and `run()` give an asyncio event loop that runs on
+    virtual time: whenever the loop would wait for a timer, the clock jumps
+    straight to it, so `asyncio.sleep(3600)` returns immediately.
+    """
+
+    def __init__(self, start=None):
+        from .time import Time
+
+        self._from_us = Time._from_us
+        if start is None:
+            start = Time.now()
+        self._start_us = self._us = start._us
+        self._tokens = []
+
+    def __repr__(self):
+        return '<dmc.testing.VirtualClock({})>'.format(self.now())
+
+    def now(self):
+        return self._from_us(self._us)
+
+    def monotonic(self):
+        """Seconds since the clock was created, as a float, like
+        `time.monotonic()`."""
+        return float(self._us - self._start_us) / MICROSECS_PER_SEC
+
+    def advance(self, interval):
+        """Move the clock forward by a TimeInterval or a number of seconds
+        (rounded up to the next microsecond)."""
+        us = _as_us(interval)
+        if us < 0:
+            raise ValueError("VirtualClock can't go backwards")
+        self._us += us
+
+    sleep = advance
+
+    def advance_to(self, t):
+        if t._us < self._us:
+            raise ValueError("VirtualClock can't go backwards")
+        self._us = t._us
+
+    def __enter__(self):
+        self._tokens.append(_set_virtual_clock(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _reset_virtual_clock(self._tokens.pop())
+
+    def new_event_loop(self):
+        """An asyncio event loop whose time() and timers follow this clock."""
+        from .virtual_loop import VirtualEventLoop
+        return VirtualEventLoop(self)
+
+    def run(self, coro):
+        """Run `coro` to completion on a new virtual event loop, with this
+        clock active."""
+        loop = self.new_event_loop()
+        try:
+            with self:
+                return loop.run_until_complete(coro)
+        finally:
+            loop.close()
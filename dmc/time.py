@@ -10,23 +10,47 @@ This module contains the set of dmcs's exceptions
 
 """
 import datetime
-import time
-import math
-import sys
-
-import pytz
-import dateutil.tz
-import iso8601
+import operator
 
+from . import clock
+from . import epoch
 from . import human
+from . import parse
+from .format import Formatter
+from .tz import get_zone, get_local_zone
 from . testing import get_mock_now
+from .epoch import MICROSECS_PER_SEC, INTEGER_TYPES
+
+
+def _wall_to_us(wall_us, tz=None, local=None, is_dst=False):
+    """Convert wall clock microseconds in some timezone into UTC."""
+    if tz:
+        return get_zone(tz).localize(wall_us, is_dst=is_dst)
+    elif local:
+        return get_local_zone().localize(wall_us, is_dst=is_dst)
+    else:
+        return wall_us
+
+
+def _unpickle_time(us, cls=None):
+    t = object.__new__(cls or Time)
+    t._us = us
+    return t
+
 
+def _unpickle_interval(us, cls=None):
+    return (cls or TimeInterval)._from_us(us)
 
-MICROSECS_PER_SEC = 1000000
+
+def _reduce_args(obj, base, value):
+    """Pickle arguments, only naming the class for subclasses."""
+    if obj.__class__ is base:
+        return (value,)
+    return (value, obj.__class__)
 
 
 class Time(object):
-    __slots__ = ['_dt']
+    __slots__ = ['_us']
 
     def __init__(
             self,
@@ -42,47 +66,44 @@ class Time(object):
         if tz and local:
             raise ValueError("Either local or a specific timezone")
 
-        tzinfo = pytz.UTC
-        if tz:
-            tzinfo = pytz.timezone(tz)
-        elif local:
-            tzinfo = dateutil.tz.tzlocal()
+        # Inlined epoch.fields_to_us(), this is the hottest constructor.
+        days = datetime.datetime(
+            year, month, day, hour, minute, second, microsecond
+        ).toordinal() - epoch.EPOCH_ORDINAL
+        us = (
+            (((days * 24 + hour) * 60 + minute) * 60 + second) *
+            MICROSECS_PER_SEC + microsecond)
+
+        if tz or local:
+            us = _wall_to_us(us, tz, local)
 
-        dt = datetime.datetime(
-            year, month, day, hour, minute, second, microsecond, tzinfo=tzinfo)
+        self._us = us
 
-        if tzinfo:
-            try:
-                dt = tzinfo.normalize(dt)
-            except AttributeError:
-                pass
+    @classmethod
+    def _from_us(cls, us):
+        t = cls.__new__(cls)
+        t._us = us
+        return t
 
-        self._dt = dt.astimezone(pytz.UTC)
+    def __reduce__(self):
+        return (_unpickle_time, _reduce_args(self, Time, self._us))
 
     @classmethod
     def now(cls):
-        return get_mock_now() or cls.from_datetime(datetime.datetime.utcnow())
+        mock = get_mock_now()
+        if mock is not None:
+            return mock
+        if clock._CLOCK is not None:
+            return clock._CLOCK._now()
+        return cls._from_us(epoch.now_us())
 
     @classmethod
     def from_timestamp(cls, ts):
-        # fromtimestamp doesn't handle the float part of a timestamp, so if it
-        # exists, we'll need to patch it in.
-        ts_ms = int(round((ts - math.floor(ts)) * MICROSECS_PER_SEC))
-
-        dt = datetime.datetime.utcfromtimestamp(ts)
-        if ts_ms:
-            dt = dt.replace(microsecond=ts_ms)
-
-        return cls.from_datetime(dt)
+        return cls._from_us(_to_us(ts, MICROSECS_PER_SEC))
 
     @classmethod
     def from_datetime(cls, dt):
-        if dt.tzinfo is not None:
-            dt = dt.astimezone(pytz.UTC)
-
-        return cls(
-            dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second,
-            dt.microsecond)
+        return cls._from_us(epoch.datetime_to_us(dt))
 
     @classmethod
     def from_str(cls, s, format=None, tz=None, local=None):
@@ -90,120 +111,192 @@ class Time(object):
             raise ValueError("Either local or a specific timezone")
 
         if format is None:
-            dt = iso8601.parse_date(s, default_timezone=None)
+            wall_us, offset = parse.parse_iso(s)
         else:
-            dt = datetime.strptime(s, format)
+            wall_us, offset = parse.TimeFormat(format).parse(s)
+
+        if offset is not None:
+            if tz or local:
+                raise ValueError("Timezone was in string")
+            return cls._from_us(wall_us - offset)
 
-        if (tz or local) and dt.tzinfo is not None:
-            raise ValueError("Timezone was in string")
+        return cls._from_us(_wall_to_us(wall_us, tz, local, is_dst=None))
 
-        if tz:
-            tzinfo = pytz.timezone(tz)
-            dt = tzinfo.localize(dt, is_dst=None)
-        elif local:
-            dt = dt.replace(tzinfo=dateutil.tz.tzlocal())
-        elif dt.tzinfo is None:
-            dt = pytz.UTC.localize(dt)
+    @classmethod
+    def parse_many(cls, strings, format=None, tz=None, local=None):
+        """Parse an iterable of strings into a list of Times.
 
-        dt = dt.astimezone(pytz.UTC)
+        Equivalent to calling from_str() on each string, without paying for
+        the per-call setup.
+        """
+        if tz and local:
+            raise ValueError("Either local or a specific timezone")
 
-        return cls.from_datetime(dt)
+        if format is None:
+            parse_str = parse.parse_iso
+        else:
+            parse_str = parse.TimeFormat(format).parse
+        from_us = cls._from_us
+        times = []
+        append = times.append
+
+        for s in strings:
+            wall_us, offset = parse_str(s)
+            if offset is not None:
+                if tz or local:
+                    raise ValueError("Timezone was in string")
+                append(from_us(wall_us - offset))
+            elif tz or local:
+                append(from_us(_wall_to_us(wall_us, tz, local, is_dst=None)))
+            else:
+                append(from_us(wall_us))
+
+        return times
 
     @property
     def year(self):
-        return self._dt.year
+        return epoch.us_to_date(self._us).year
 
     @property
     def month(self):
-        return self._dt.month
+        return epoch.us_to_date(self._us).month
 
     @property
     def day(self):
-        return self._dt.day
+        return epoch.us_to_date(self._us).day
 
     @property
     def hour(self):
-        return self._dt.hour
+        return self._us // epoch.MICROSECS_PER_HOUR % 24
 
     @property
     def minute(self):
-        return self._dt.minute
+        return self._us // epoch.MICROSECS_PER_MINUTE % 60
 
     @property
     def second(self):
-        return self._dt.second
+        return self._us // MICROSECS_PER_SEC % 60
 
     @property
     def microsecond(self):
-        return self._dt.microsecond
+        return self._us % MICROSECS_PER_SEC
 
     def __unicode__(self):
         return self.to_str()
 
     def __repr__(self):
+        dt = epoch.us_to_datetime(self._us)
         return '<dmc.Time({}, {}, {}, {}, {}, {}, {}>'.format(
-            self.year, self.month, self.day, self.hour, self.minute,
-            self.second, self.microsecond)
+            dt.year, dt.month, dt.day, dt.hour, dt.minute,
+            dt.second, dt.microsecond)
 
     def _localized_dt(self, tz=None, local=False):
         if local:
-            return self._dt.astimezone(dateutil.tz.tzlocal())
+            return get_local_zone().to_datetime(self._us)
         elif tz:
-            tzinfo = pytz.timezone(tz)
-            return tzinfo.normalize(self._dt.astimezone(tzinfo))
+            return get_zone(tz).to_datetime(self._us)
         else:
-            return self._dt
+            import pytz
+            return epoch.us_to_datetime(self._us).replace(tzinfo=pytz.UTC)
 
     def to_str(self, format=None, tz=None, local=False):
-        dt = self._localized_dt(tz=tz, local=local)
+        return Formatter(format or None, tz=tz, local=local)(self)
 
-        if format:
-            return dt.strftime(format)
-        else:
-            return dt.isoformat()
+    @staticmethod
+    def format_many(times, format=None, tz=None, local=False):
+        """Render an iterable of Times into a list of strings.
+
+        Equivalent to calling to_str() on each Time, with the format and
+        timezone only resolved once.
+        """
+        return Formatter(format or None, tz=tz, local=local).format_many(times)
 
     def to_datetime(self, tz=None, local=None):
         return self._localized_dt(tz=tz, local=local)
 
     def to_timestamp(self):
-        ts = time.mktime(self._dt.utctimetuple())
-        ts += (1.0 * self._dt.microsecond) / MICROSECS_PER_SEC
-        return ts
+        return self._us / float(MICROSECS_PER_SEC)
 
     def to_human(self):
-        return human.naturaltime(self._dt.replace(tzinfo=None))
+        return human.HumanFormatter().naturaltime(self)
 
     def __add__(self, other):
         if isinstance(other, TimeInterval):
-            return Time.from_datetime(
-                self._dt +
-                datetime.timedelta(
-                    seconds=other.seconds, microseconds=other.microseconds))
+            return Time._from_us(self._us + other._us)
         elif isinstance(other, (int, float)):
-            return self + TimeInterval(seconds=other)
+            return Time._from_us(
+                self._us + _to_us(other, MICROSECS_PER_SEC))
         else:
-            raise NotImplemented
+            return NotImplemented
 
     __radd__ = __add__
 
     def __sub__(self, other):
         if isinstance(other, TimeInterval):
-            return Time.from_datetime(
-                self._dt -
-                datetime.timedelta(
-                    seconds=other.seconds, microseconds=other.microseconds))
+            return Time._from_us(self._us - other._us)
         elif isinstance(other, (int, float)):
-            return self - TimeInterval(seconds=other)
+            return Time._from_us(
+                self._us - _to_us(other, MICROSECS_PER_SEC))
         else:
-            raise NotImplemented
+            return NotImplemented
+
+    # Sort key, sorted(times, key=Time.key) never calls back into python.
+    key = operator.attrgetter('_us')
+
+    # Equal only to other Times: a datetime can't hash the same as the Time
+    # it orders level with, since naive and aware datetimes hash differently.
+    def __hash__(self):
+        return hash(self._us)
 
-    def __cmp__(self, other):
+    def __eq__(self, other):
         if isinstance(other, Time):
-            return cmp(self.to_datetime(), other.to_datetime())
-        elif isinstance(other, datetime.datetime):
-            return cmp(self.to_datetime(), other)
-        else:
-            raise NotImplemented
+            return self._us == other._us
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, Time):
+            return self._us != other._us
+        return NotImplemented
+
+    def __lt__(self, other):
+        other_us = _time_us(other)
+        if other_us is None:
+            return NotImplemented
+        return self._us < other_us
+
+    def __le__(self, other):
+        other_us = _time_us(other)
+        if other_us is None:
+            return NotImplemented
+        return self._us <= other_us
+
+    def __gt__(self, other):
+        other_us = _time_us(other)
+        if other_us is None:
+            return NotImplemented
+        return self._us > other_us
+
+    def __ge__(self, other):
+        other_us = _time_us(other)
+        if other_us is None:
+            return NotImplemented
+        return self._us >= other_us
+
+
+def _time_us(other):
+    """Microseconds of something a Time orders against, or None."""
+    if isinstance(other, Time):
+        return other._us
+    elif isinstance(other, datetime.datetime):
+        # Naive datetimes are taken to be UTC
+        return epoch.datetime_to_us(other)
+    return None
+
+
+def sort_times(times, reverse=False):
+    """Sort Times (or TimeIntervals) by their underlying integer, which is
+    much quicker than comparing them to each other."""
+    return sorted(times, key=Time.key, reverse=reverse)
 
 
 class TimeSpan(object):
@@ -225,6 +318,9 @@ class TimeSpan(object):
         else:
             raise KeyError
 
+    def __reduce__(self):
+        return (self.__class__, (self.start, self.end))
+
     def __repr__(self):
         return "<dmc.TimeSpan({}, {})>".format(self.start, self.end)
 
@@ -232,64 +328,94 @@ class TimeSpan(object):
         return "{} to {}".format(self.start, self.end)
 
 
+def _to_us(value, scale):
+    """Scale a number of some unit into integer microseconds.
+
+    Integers stay exact, anything else (floats for convinience) gets rounded
+    to the nearest microsecond.
+    """
+    us = value * scale
+    if isinstance(us, INTEGER_TYPES):
+        return us
+    return int(round(us))
+
+
+def _div_round(us, n):
+    """Integer division of microseconds, rounding half to even like
+    datetime.timedelta does."""
+    q, r = divmod(us, n)
+    r *= 2
+    if r > n or (r == n and q % 2 == 1):
+        q += 1
+    return q
+
+
 class TimeInterval(object):
-    __slots__ = ['seconds', 'microseconds']
+    __slots__ = ['_us']
 
-    def __init__(
-            self,
+    def __new__(
+            cls,
             seconds=None,
             minutes=None,
             hours=None,
-            microseconds=None):
+            microseconds=None,
+            days=None):
 
-        self.microseconds = 0
-        self.seconds = 0
+        us = 0
 
         if seconds:
-            # For convinience, we'll accept a float for seconds and strip out
-            # the microseconds
-            self.microseconds += int(
-                round(
-                    (seconds - math.floor(seconds)) * MICROSECS_PER_SEC))
-
-            self.seconds += int(math.floor(seconds))
+            # For convinience, we'll accept a float for seconds and round to
+            # the nearest microsecond.
+            us += _to_us(seconds, MICROSECS_PER_SEC)
 
         if minutes:
-            self.seconds += minutes * 60
+            us += _to_us(minutes, epoch.MICROSECS_PER_MINUTE)
 
         if hours:
-            self.seconds += hours * 60 * 60
+            us += _to_us(hours, epoch.MICROSECS_PER_HOUR)
+
+        if days:
+            us += _to_us(days, epoch.MICROSECS_PER_DAY)
 
         if microseconds:
-            self.microseconds += microseconds
+            us += _to_us(microseconds, 1)
+
+        return cls._from_us(us)
+
+    @classmethod
+    def _from_us(cls, us):
+        if cls is TimeInterval:
+            ti = _INTERNED_INTERVALS.get(us)
+            if ti is not None:
+                return ti
 
-            if self.microseconds >= MICROSECS_PER_SEC:
-                self.seconds += self.microseconds // MICROSECS_PER_SEC
-                self.microseconds = self.microseconds % MICROSECS_PER_SEC
+        ti = object.__new__(cls)
+        ti._us = us
+        return ti
+
+    def __reduce__(self):
+        return (_unpickle_interval, _reduce_args(self, TimeInterval, self._us))
 
     @classmethod
-    def from_timedelta(self, td):
-        # Timedelta's store as (days, seconds, microseconds).  TimeInterval
-        # deals in just seconds and microseconds. Do we lose anything here?
-        # Obviously we have the same resolution, so the only question is if
-        # sys.maxint seconds isn't big enough for us. Unlikely on 64bit.
-        if sys.maxint / (60*60*24) < td.days:
-            raise ValueError("Platform maxint isn't large enough")
+    def from_timedelta(cls, td):
+        return cls._from_us(epoch.timedelta_to_us(td))
 
-        seconds = (td.days * 60*60*24) + td.seconds
-        microseconds = td.microseconds
+    @property
+    def seconds(self):
+        return self._us // MICROSECS_PER_SEC
 
-        return TimeInterval(seconds=seconds, microseconds=microseconds)
+    @property
+    def microseconds(self):
+        return self._us % MICROSECS_PER_SEC
 
     def __int__(self):
-        if self.microseconds:
+        if self._us % MICROSECS_PER_SEC:
             return int(round(float(self)))
         else:
-            assert type(self.seconds), int
-            return self.seconds
+            return self._us // MICROSECS_PER_SEC
 
     def __float__(self):
-        return self.seconds + (1.0 * self.microseconds / MICROSECS_PER_SEC)
+        return self._us / float(MICROSECS_PER_SEC)
 
     def __str__(self):
         seconds = self.seconds
@@ -304,34 +430,37 @@ class TimeInterval(object):
 
         return "{:=+03d}:{:02d}:{:04.1f}".format(hours, minutes, seconds)
 
+    def __repr__(self):
+        return "<dmc.TimeInterval({}, microseconds={})>".format(
+            self.seconds, self.microseconds)
+
     def __add__(self, other):
-        if isinstance(other, type(self)):
-            seconds = other.seconds + self.seconds
-            microseconds = other.microseconds + self.microseconds
-            return TimeInterval(seconds=seconds, microseconds=microseconds)
-        elif isinstance(other, (int, float)):
-            seconds = float(self) + other
-            return TimeInterval(seconds=seconds)
+        if isinstance(other, TimeInterval):
+            return TimeInterval._from_us(self._us + other._us)
+        elif isinstance(other, INTEGER_TYPES):
+            return TimeInterval._from_us(
+                self._us + other * MICROSECS_PER_SEC)
+        elif isinstance(other, float):
+            return TimeInterval._from_us(
+                self._us + _to_us(other, MICROSECS_PER_SEC))
         elif isinstance(other, Time):
-            return Time.from_datetime(
-                other.to_datetime() +
-                datetime.timedelta(
-                    seconds=self.seconds, microseconds=self.microseconds))
+            return Time._from_us(other._us + self._us)
         else:
-            raise NotImplemented
+            return NotImplemented
 
     __radd__ = __add__
 
     def __sub__(self, other):
-        if isinstance(other, type(self)):
-            seconds = self.seconds - other.seconds
-            microseconds = self.microseconds - other.microseconds
-            return TimeInterval(seconds=seconds, microseconds=microseconds)
-        elif isinstance(other, (int, float)):
-            seconds = float(self) - other
-            return TimeInterval(seconds=seconds)
+        if isinstance(other, TimeInterval):
+            return TimeInterval._from_us(self._us - other._us)
+        elif isinstance(other, INTEGER_TYPES):
+            return TimeInterval._from_us(
+                self._us - other * MICROSECS_PER_SEC)
+        elif isinstance(other, float):
+            return TimeInterval._from_us(
+                self._us - _to_us(other, MICROSECS_PER_SEC))
         else:
-            raise NotImplemented
+            return NotImplemented
 
     def __rsub__(self, other):
         if isinstance(other, type(self)):
@@ -342,32 +471,108 @@ class TimeInterval(object):
             raise NotImplemented
 
     def __mul__(self, other):
-        if isinstance(other, (int, float)):
-            return TimeInterval(
-                seconds=self.seconds * other,
-                microseconds=self.microseconds * other)
+        if isinstance(other, INTEGER_TYPES):
+            return TimeInterval._from_us(self._us * other)
+        elif isinstance(other, float):
+            return TimeInterval._from_us(int(round(self._us * other)))
         else:
             raise NotImplementedError
 
+    __rmul__ = __mul__
+
     def __div__(self, other):
-        if isinstance(other, (int, float)):
-            return TimeInterval(
-                seconds=self.seconds / float(other),
-                microseconds=self.microseconds / float(other))
+        if isinstance(other, TimeInterval):
+            return self._us / float(other._us)
+        elif isinstance(other, INTEGER_TYPES):
+            return TimeInterval._from_us(_div_round(self._us, other))
+        elif isinstance(other, float):
+            return TimeInterval._from_us(int(round(self._us / other)))
+        else:
+            raise NotImplementedError
+
+    __truediv__ = __div__
+
+    def __floordiv__(self, other):
+        if isinstance(other, TimeInterval):
+            return self._us // other._us
+        elif isinstance(other, INTEGER_TYPES):
+            return TimeInterval._from_us(self._us // other)
         else:
             raise NotImplementedError
 
+    def __mod__(self, other):
+        if isinstance(other, TimeInterval):
+            return TimeInterval._from_us(self._us % other._us)
+        elif isinstance(other, INTEGER_TYPES):
+            return TimeInterval._from_us(self._us % other)
+        else:
+            raise NotImplementedError
+
+    def __divmod__(self, other):
+        if isinstance(other, TimeInterval):
+            q, r = divmod(self._us, other._us)
+            return q, TimeInterval._from_us(r)
+        elif isinstance(other, INTEGER_TYPES):
+            q, r = divmod(self._us, other)
+            return TimeInterval._from_us(q), TimeInterval._from_us(r)
+        else:
+            raise NotImplementedError
+
+    def __neg__(self):
+        return TimeInterval._from_us(-self._us)
+
+    def __pos__(self):
+        return self
+
     def __abs__(self):
-        return TimeInterval(
-            seconds=abs(self.seconds), microseconds=abs(self.microseconds))
+        return TimeInterval._from_us(abs(self._us))
+
+    key = operator.attrgetter('_us')
 
-    def __cmp__(self, other):
+    def __hash__(self):
+        return hash(self._us)
+
+    def __eq__(self, other):
+        if isinstance(other, TimeInterval):
+            return self._us == other._us
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, TimeInterval):
+            return self._us != other._us
+        return NotImplemented
+
+    def __lt__(self, other):
         if isinstance(other, TimeInterval):
-            return cmp(
-                (self.seconds, self.microseconds),
-                (other.seconds, other.microseconds))
+            return self._us < other._us
+        return NotImplemented
 
-        raise NotImplemented
+    def __le__(self, other):
+        if isinstance(other, TimeInterval):
+            return self._us <= other._us
+        return NotImplemented
+
+    def __gt__(self, other):
+        if isinstance(other, TimeInterval):
+            return self._us > other._us
+        return NotImplemented
+
+    def __ge__(self, other):
+        if isinstance(other, TimeInterval):
+            return self._us >= other._us
+        return NotImplemented
+
+
+# Common intervals are shared rather than allocated over and over again.
+_INTERNED_INTERVALS = {}
+for _us in (
+        0,
+        MICROSECS_PER_SEC,
+        epoch.MICROSECS_PER_MINUTE,
+        epoch.MICROSECS_PER_HOUR,
+        epoch.MICROSECS_PER_DAY):
+    _INTERNED_INTERVALS[_us] = TimeInterval._from_us(_us)
+del _us
 
 
 class TimeIterator(object):
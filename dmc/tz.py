@@ -0,0 +1,396 @@
+# -*- coding: utf-8 -*-
+
+"""
+Timezone resolution.
+
+Zones are resolved by name once per process and flattened into integer
+tables of transition instants and UTC offsets, so converting an instant to
+or from a zone is a bisect (or, for runs of nearby instants, a couple of
+integer comparisons) rather than a round trip through pytz.
+
+The tables normally come from pytz. If a compiled transition database (see
+`dmc.tzdb`) has been loaded, zones it contains are read straight out of the
+memory mapped file instead, and pytz is only imported if a caller asks for a
+datetime.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import bisect
+import datetime
+import os
+import time
+
+from . import epoch
+from .epoch import MICROSECS_PER_HOUR, MICROSECS_PER_DAY
+
+
+_ZONE_CACHE = {}
+_ZONE_CACHE_MAX = 256
+
+# Set with use_database(), or from the DMC_TZDB environment variable on first
+# use.
+_DATABASE = None
+_DATABASE_ENV = 'DMC_TZDB'
+
+# The local zone is detected once, see get_local_zone()
+_LOCAL_ZONE = None
+_LOCALTIME_PATH = '/etc/localtime'
+_TIMEZONE_PATH = '/etc/timezone'
+
+# Zone.localize() follows pytz, which looks for offsets a day either side of
+# the wall time. UTC offsets are under a day, so with no transition within
+# this distance there's only one answer.
+_LOCALIZE_MARGIN = 2 * MICROSECS_PER_DAY
+
+# How far pytz steps to get out of a gap in local time
+_GAP_STEP = 6 * MICROSECS_PER_HOUR
+
+START_OF_TIME = epoch.datetime_to_us(datetime.datetime.min)
+END_OF_TIME = epoch.datetime_to_us(datetime.datetime.max) + 1
+
+
+def use_database(path):
+    """Resolve zones out of the compiled transition database at `path`.
+
+    Calling this before forking workers lets them all share one read-only
+    mapping of the file. Pass None to go back to pytz.
+    """
+    global _DATABASE
+    from . import tzdb
+
+    _DATABASE = tzdb.TransitionDatabase(path) if path else False
+    _ZONE_CACHE.clear()
+
+
+def _database():
+    if _DATABASE is None:
+        use_database(os.environ.get(_DATABASE_ENV))
+    return _DATABASE
+
+
+def get_zone(name):
+    """Resolve a timezone name into a (shared) Zone."""
+    try:
+        return _ZONE_CACHE[name]
+    except KeyError:
+        pass
+
+    database = _database()
+    if database and name in database:
+        zone = database.zone(name)
+    else:
+        import pytz
+        zone = Zone.from_tzinfo(name, pytz.timezone(name))
+
+    if len(_ZONE_CACHE) >= _ZONE_CACHE_MAX:
+        _ZONE_CACHE.clear()
+    _ZONE_CACHE[name] = zone
+
+    return zone
+
+
+def get_local_zone():
+    """The zone this process considers local time.
+
+    Detected once, from $TZ or the system configuration, and then shared.
+    Call refresh_local_zone() if the system timezone changes underneath a
+    running process.
+    """
+    global _LOCAL_ZONE
+    if _LOCAL_ZONE is None:
+        _LOCAL_ZONE = _detect_local_zone()
+    return _LOCAL_ZONE
+
+
+def refresh_local_zone():
+    """Forget the detected local zone, it will be detected again on next
+    use."""
+    global _LOCAL_ZONE
+    if hasattr(time, 'tzset'):
+        time.tzset()
+    _LOCAL_ZONE = None
+
+
+def _detect_local_zone():
+    name = os.environ.get('TZ')
+    if name is not None:
+        name = name.lstrip(':')
+        if not name:
+            zone = get_zone('UTC')
+        elif os.path.isabs(name):
+            zone = _zone_from_file(name)
+        else:
+            zone = _named_zone(name)
+
+        if zone is not None:
+            return zone
+    else:
+        # Most systems symlink /etc/localtime into the zoneinfo tree, which
+        # conveniently tells us the name too.
+        path = os.path.realpath(_LOCALTIME_PATH)
+        _, sep, name = path.partition('/zoneinfo/')
+        zone = _named_zone(name) if sep else None
+
+        if zone is None and os.path.exists(_TIMEZONE_PATH):
+            with open(_TIMEZONE_PATH) as f:
+                zone = _named_zone(f.read().strip())
+
+        if zone is None:
+            zone = _zone_from_file(_LOCALTIME_PATH)
+
+        if zone is not None:
+            return zone
+
+    # Nothing we can flatten, (e.g. a POSIX rule in $TZ) so leave it to the C
+    # library.
+    import dateutil.tz
+    return TzinfoZone('localtime', dateutil.tz.tzlocal())
+
+
+def _named_zone(name):
+    if not name:
+        return None
+
+    try:
+        return get_zone(name)
+    except KeyError:
+        # pytz.UnknownTimeZoneError
+        return None
+
+
+def _zone_from_file(path):
+    import pytz.tzfile
+
+    try:
+        with open(path, 'rb') as f:
+            tzinfo = pytz.tzfile.build_tzinfo('localtime', f)
+    except (IOError, OSError, ValueError):
+        return None
+
+    return Zone.from_tzinfo('localtime', tzinfo)
+
+
+class Zone(object):
+    """A timezone flattened into integer transition tables.
+
+    Index `i` of the tables describes local time from `transitions[i]`
+    (microseconds since the epoch, UTC) up until the next transition. The
+    tables can be lists, or anything else that supports len() and indexing.
+    """
+    __slots__ = [
+        'name', '_transitions', '_offsets', '_dsts', '_names', '_tzinfos',
+        '_last']
+
+    def __init__(self, name, transitions, offsets, dsts, names, tzinfos=None):
+        self.name = name
+        self._transitions = transitions
+        self._offsets = offsets
+        self._dsts = dsts
+        self._names = names
+        self._tzinfos = tzinfos
+        self._last = (0, 0, 0)
+
+    @classmethod
+    def from_tzinfo(cls, name, tzinfo):
+        """Flatten a pytz timezone."""
+        if not hasattr(tzinfo, '_utc_transition_times'):
+            # Fixed offset, including UTC itself.
+            return cls(
+                name,
+                [START_OF_TIME],
+                [epoch.timedelta_to_us(tzinfo.utcoffset(None))],
+                [False],
+                [tzinfo.tzname(None)],
+                [tzinfo])
+
+        transitions = [
+            epoch.datetime_to_us(dt) for dt in tzinfo._utc_transition_times]
+        offsets = []
+        dsts = []
+        names = []
+        tzinfos = []
+        for info in tzinfo._transition_info:
+            offset, dst, tzname = info
+            offsets.append(epoch.timedelta_to_us(offset))
+            dsts.append(bool(dst))
+            names.append(tzname)
+            tzinfos.append(tzinfo._tzinfos[info])
+
+        return cls(name, transitions, offsets, dsts, names, tzinfos)
+
+    def __repr__(self):
+        return "<dmc.tz.Zone({!r})>".format(self.name)
+
+    def __len__(self):
+        return len(self._transitions)
+
+    def _index(self, us):
+        # Nearby instants almost always fall in the interval we looked up
+        # last time.
+        start, end, i = self._last
+        if start <= us < end:
+            return i
+
+        transitions = self._transitions
+        i = bisect.bisect_right(transitions, us) - 1
+        if i < 0:
+            i = 0
+
+        start = transitions[i]
+        if i + 1 < len(transitions):
+            end = transitions[i + 1]
+        else:
+            end = END_OF_TIME
+        self._last = (start, end, i)
+
+        return i
+
+    def _tzinfo(self, i):
+        if self._tzinfos is None:
+            self._tzinfos = _match_pytz_tzinfos(self)
+        return self._tzinfos[i]
+
+    def utcoffset(self, us):
+        """UTC offset, in microseconds, at the UTC instant `us`."""
+        return self._offsets[self._index(us)]
+
+    def tzname(self, us):
+        return self._names[self._index(us)]
+
+    def tzinfo(self, us):
+        """The pytz tzinfo in effect at the UTC instant `us`."""
+        return self._tzinfo(self._index(us))
+
+    def to_datetime(self, us):
+        """Build an aware, local, datetime for the UTC instant `us`."""
+        i = self._index(us)
+        return epoch.us_to_datetime(us + self._offsets[i]).replace(
+            tzinfo=self._tzinfo(i))
+
+    def localize(self, wall_us, is_dst=False):
+        """Convert wall clock microseconds in this zone to UTC.
+
+        Matches pytz's localize(): when the wall time is ambiguous or doesn't
+        exist `is_dst` picks a side, or if it is None an exception is raised.
+        """
+        offsets = self._offsets
+        if len(offsets) == 1:
+            return wall_us - offsets[0]
+
+        # Well inside the interval we looked at last, or the one the wall
+        # time lands in, there can't be a gap or a fold to worry about.
+        start, end, i = self._last
+        us = wall_us - offsets[i]
+        if start + _LOCALIZE_MARGIN <= us < end - _LOCALIZE_MARGIN:
+            return us
+
+        us = wall_us - offsets[self._index(us)]
+        start, end, i = self._last
+        if start + _LOCALIZE_MARGIN <= us < end - _LOCALIZE_MARGIN:
+            return us
+
+        return self._localize_near_transition(wall_us, is_dst)
+
+    def _localize_near_transition(self, wall_us, is_dst):
+        """localize() step by step, exactly as pytz does it."""
+        offsets = self._offsets
+        index = self._index
+
+        # pytz takes its candidate offsets from a day either side of the wall
+        # time (looked up as though it were UTC), and keeps those that map
+        # back to the same wall time.
+        possible = set()
+        for probe in (-MICROSECS_PER_DAY, MICROSECS_PER_DAY):
+            us = wall_us - offsets[index(wall_us + probe)]
+            if us + offsets[index(us)] == wall_us:
+                possible.add(us)
+
+        if len(possible) == 1:
+            return possible.pop()
+
+        if not possible:
+            # Wall time falls in a gap
+            if is_dst is None:
+                import pytz
+                raise pytz.NonExistentTimeError(
+                    epoch.us_to_datetime(wall_us))
+            elif is_dst:
+                return self._localize_near_transition(
+                    wall_us + _GAP_STEP, True) - _GAP_STEP
+            else:
+                return self._localize_near_transition(
+                    wall_us - _GAP_STEP, False) + _GAP_STEP
+
+        # Wall time is ambiguous
+        if is_dst is None:
+            import pytz
+            raise pytz.AmbiguousTimeError(epoch.us_to_datetime(wall_us))
+
+        filtered = [us for us in possible if self._dsts[index(us)] == is_dst]
+        if len(filtered) == 1:
+            return filtered[0]
+
+        # Neither or both sides match is_dst, like a change of standard time.
+        # Take the earliest instant for is_dst, the latest otherwise.
+        if is_dst:
+            return min(filtered or possible)
+        return max(filtered or possible)
+
+
+def _match_pytz_tzinfos(zone):
+    """Find the pytz tzinfo matching each entry of a zone's tables.
+
+    Only needed for zones that didn't come from pytz in the first place, and
+    only once somebody wants a datetime out of them.
+    """
+    import pytz
+
+    tzinfo = pytz.timezone(zone.name)
+    if not hasattr(tzinfo, '_tzinfos'):
+        return [tzinfo] * len(zone)
+
+    by_info = {}
+    for (offset, dst, tzname), info_tzinfo in tzinfo._tzinfos.items():
+        by_info[(epoch.timedelta_to_us(offset), bool(dst), tzname)] = (
+            info_tzinfo)
+
+    return [
+        by_info[(zone._offsets[i], zone._dsts[i], zone._names[i])]
+        for i in range(len(zone))]
+
+
+class TzinfoZone(object):
+    """Adapts an arbitrary tzinfo to the Zone interface.
+
+    Every call goes through datetime, so this is only a fallback for zones we
+    can't get transition tables for.
+    """
+    __slots__ = ['name', '_tzinfo']
+
+    def __init__(self, name, tzinfo):
+        self.name = name
+        self._tzinfo = tzinfo
+
+    def __repr__(self):
+        return "<dmc.tz.TzinfoZone({!r})>".format(self.name)
+
+    def utcoffset(self, us):
+        return epoch.timedelta_to_us(self.to_datetime(us).utcoffset())
+
+    def tzname(self, us):
+        return self.to_datetime(us).tzname()
+
+    def tzinfo(self, us):
+        return self._tzinfo
+
+    def to_datetime(self, us):
+        return self._tzinfo.fromutc(
+            epoch.us_to_datetime(us).replace(tzinfo=self._tzinfo))
+
+    def localize(self, wall_us, is_dst=False):
+        return epoch.datetime_to_us(
+            epoch.us_to_datetime(wall_us).replace(tzinfo=self._tzinfo))
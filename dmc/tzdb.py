@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+"""
+A compiled, memory mapped, timezone transition database.
+
+Every process that touches a zone through pytz loads and unpickles its own
+copy of the zone data. Instead, the zones an application needs can be
+compiled once into a compact binary file:
+
+    >> dmc.tzdb.compile_database(
+    ..     '/var/lib/app/zones.tzdb', ['US/Pacific', 'UTC'])
+
+or
+
+    $ python -m dmc.tzdb /var/lib/app/zones.tzdb US/Pacific UTC
+
+Processes then map that file read-only, either by calling
+`dmc.tz.use_database(path)` (before forking, so workers share the mapping) or
+by setting the DMC_TZDB environment variable, and look up offsets by binary
+search directly on the mapped buffer.
+
+File layout, all little endian:
+
+    header     magic (8 bytes), zone count (uint32), reserved (uint32)
+    directory  per zone: name length (uint16), name (utf-8),
+               data offset (uint32)
+    zone data  per zone, 8 byte aligned:
+               transition count n (uint32), abbreviation block length
+               (uint32), transitions (int64[n], microseconds since the epoch),
+               offsets (int64[n], microseconds), dst flags (uint8[n]),
+               abbreviation indexes (uint8[n]), abbreviations (NUL
+               separated)
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from . import errors
+from .tz import Zone
+
+
+MAGIC = b'DMCTZDB1'
+
+_HEADER = struct.Struct('<8sII')
+_NAME_LENGTH = struct.Struct('<H')
+_DATA_OFFSET = struct.Struct('<I')
+_ZONE_HEADER = struct.Struct('<II')
+
+
+class Error(errors.Error):
+    """A database couldn't be read or written."""
+    pass
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def compile_database(path, names=None):
+    """Write the transition tables for the zones `names` (default: all of
+    pytz.common_timezones) to `path`.
+
+    The file is written next to `path` and renamed into place, so processes
+    mapping an older version are unaffected.
+    """
+    import pytz
+
+    if names is None:
+        names = pytz.common_timezones
+
+    zones = [Zone.from_tzinfo(name, pytz.timezone(name)) for name in names]
+
+    directory_size = sum(
+        _NAME_LENGTH.size + len(zone.name.encode('utf-8')) + _DATA_OFFSET.size
+        for zone in zones)
+    position = _align(_HEADER.size + directory_size)
+
+    directory = []
+    blocks = []
+    for zone in zones:
+        block = _pack_zone(zone)
+        encoded_name = zone.name.encode('utf-8')
+        directory.append(_NAME_LENGTH.pack(len(encoded_name)))
+        directory.append(encoded_name)
+        directory.append(_DATA_OFFSET.pack(position))
+        blocks.append(block)
+        position += len(block)
+
+    header = _HEADER.pack(MAGIC, len(zones), 0) + b''.join(directory)
+    header += b'\0' * (_align(len(header)) - len(header))
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            for block in blocks:
+                f.write(block)
+        os.chmod(tmp_path, 0o644)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def _pack_zone(zone):
+    count = len(zone)
+
+    abbreviations = []
+    abbreviation_indexes = []
+    for name in zone._names:
+        if name not in abbreviations:
+            abbreviations.append(name)
+        abbreviation_indexes.append(abbreviations.index(name))
+
+    if len(abbreviations) > 255:
+        raise Error("Too many abbreviations in {}".format(zone.name))
+
+    abbreviation_block = b'\0'.join(
+        name.encode('utf-8') for name in abbreviations)
+
+    block = b''.join([
+        _ZONE_HEADER.pack(count, len(abbreviation_block)),
+        struct.pack('<{}q'.format(count), *zone._transitions),
+        struct.pack('<{}q'.format(count), *zone._offsets),
+        struct.pack('<{}B'.format(count), *[int(d) for d in zone._dsts]),
+        struct.pack('<{}B'.format(count), *abbreviation_indexes),
+        abbreviation_block,
+    ])
+
+    return block + b'\0' * (_align(len(block)) - len(block))
+
+
+class _MappedArray(object):
+    """Read-only sequence view of fixed width values in a buffer.
+
+    Supports just enough (len() and integer indexing) for bisect and Zone.
+    """
+    __slots__ = ['_buffer', '_offset', '_count', '_size', '_unpack']
+
+    def __init__(self, buffer, offset, count, format):
+        s = struct.Struct(format)
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+        self._size = s.size
+        self._unpack = s.unpack_from
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._unpack(self._buffer, self._offset + i * self._size)[0]
+
+
+class _MappedNames(_MappedArray):
+    __slots__ = ['_names']
+
+    def __init__(self, buffer, offset, count, names):
+        super(_MappedNames, self).__init__(buffer, offset, count, '<B')
+        self._names = names
+
+    def __getitem__(self, i):
+        return self._names[super(_MappedNames, self).__getitem__(i)]
+
+
+class _MappedFlags(_MappedArray):
+    __slots__ = []
+
+    def __init__(self, buffer, offset, count):
+        super(_MappedFlags, self).__init__(buffer, offset, count, '<B')
+
+    def __getitem__(self, i):
+        return bool(super(_MappedFlags, self).__getitem__(i))
+
+
+class TransitionDatabase(object):
+    """A compiled transition database, mapped read-only."""
+
+    def __init__(self, path):
+        self.path = path
+
+        try:
+            with open(path, 'rb') as f:
+                # Raises ValueError for an empty file
+                self._map = mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError) as e:
+            raise Error("Can't map {}: {}".format(path, e))
+
+        try:
+            self._read_directory()
+        except (struct.error, UnicodeDecodeError):
+            self._map.close()
+            raise Error("{} is truncated or corrupt".format(path))
+
+    def _read_directory(self):
+        magic, count, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise Error("{} is not a dmc timezone database".format(self.path))
+
+        # The directory is small, the tables stay in the mapping.
+        self._directory = {}
+        position = _HEADER.size
+        for _ in range(count):
+            length, = _NAME_LENGTH.unpack_from(self._map, position)
+            position += _NAME_LENGTH.size
+            name = self._map[position:position + length].decode('utf-8')
+            position += length
+            data_offset, = _DATA_OFFSET.unpack_from(self._map, position)
+            position += _DATA_OFFSET.size
+            self._directory[name] = data_offset
+
+    def __repr__(self):
+        return "<dmc.tzdb.TransitionDatabase({!r})>".format(self.path)
+
+    def __contains__(self, name):
+        return name in self._directory
+
+    def __len__(self):
+        return len(self._directory)
+
+    def names(self):
+        return sorted(self._directory)
+
+    def zone(self, name):
+        """Build a Zone whose tables are views into the mapped file."""
+        position = self._directory[name]
+        count, abbreviation_length = _ZONE_HEADER.unpack_from(
+            self._map, position)
+        position += _ZONE_HEADER.size
+
+        transitions = _MappedArray(self._map, position, count, '<q')
+        position += 8 * count
+        offsets = _MappedArray(self._map, position, count, '<q')
+        position += 8 * count
+        dsts = _MappedFlags(self._map, position, count)
+        position += count
+        abbreviation_position = position + count
+        abbreviations = [
+            abbreviation.decode('utf-8')
+            for abbreviation in self._map[
+                abbreviation_position:
+                abbreviation_position + abbreviation_length].split(b'\0')]
+        names = _MappedNames(self._map, position, count, abbreviations)
+
+        return Zone(name, transitions, offsets, dsts, names)
+
+    def close(self):
+        self._map.close()
+
+
+def main(argv):
+    if len(argv) < 2:
+        sys.stderr.write(
+            "usage: python -m dmc.tzdb <path> [zone name ...]\n")
+        return 1
+
+    compile_database(argv[1], argv[2:] or None)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
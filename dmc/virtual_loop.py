@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""
+An asyncio event loop running on a dmc.testing.VirtualClock.
+
+The loop's time() reads the virtual clock. When the loop has nothing ready
+to run and would block in select() until its next timer, it instead polls
+for I/O without waiting and, if there was none, advances the clock by the
+timeout. Sleeps, call_later() and wait_for() timeouts all fire as soon as
+nothing else is runnable, in the same order they would in real time.
+
+Only waits on timers are skipped. With no timers pending the loop blocks on
+real I/O as usual, so sockets and executors still work, but any timers
+started while they are in flight will fire early.
+
+:copyright: (c) 2014 by Rhett Garber.
+:license: ISC, see LICENSE for more details.
+
+"""
+from __future__ import absolute_import
+
+import asyncio
+import math
+import selectors
+
+from .epoch import MICROSECS_PER_SEC
+from .time import TimeInterval
+
+
+class _VirtualSelector(object):
+    def __init__(self, clock, selector):
+        self._clock = clock
+        self._selector = selector
+
+    def select(self, timeout=None):
+        if timeout is None:
+            return self._selector.select(None)
+
+        events = self._selector.select(0)
+        if not events and timeout > 0:
+            # Round up, so the clock always reaches the timer we were
+            # waiting for.
+            self._clock.advance(TimeInterval(
+                microseconds=int(math.ceil(timeout * MICROSECS_PER_SEC))))
+        return events
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock):
+        selector = _VirtualSelector(clock, selectors.DefaultSelector())
+        super(VirtualEventLoop, self).__init__(selector=selector)
+        self.clock = clock
+
+    def time(self):
+        return self.clock.monotonic()
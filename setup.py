@@ -5,7 +5,7 @@ import os
 import sys
 from distutils.core import setup
 
-PACKAGES = ['dmc']
+PACKAGES = ['dmc', 'dmc.bench']
 REQUIRES = ['iso8601', 'pytz', 'humanize', 'python-dateutil']
 
 
@@ -0,0 +1,367 @@
+from testify import *
+import datetime
+import numpy
+
+from dmc import (
+    Time,
+    TimeInterval,
+    Date,
+    DateInterval,
+    TimeArray,
+    TimeIntervalArray,
+    DateArray)
+
+
+class InitTimeArrayTestCase(TestCase):
+    def test_from_times(self):
+        times = [Time(2014, 4, 18, 17, 50, 21), Time(2014, 4, 19)]
+        a = TimeArray(times)
+
+        assert_equal(len(a), 2)
+        assert_equal(a._us.dtype, numpy.int64)
+        assert_equal([t._us for t in a], [t._us for t in times])
+
+    def test_from_timestamps(self):
+        ts = [1398125982.036391, 1398125982, 0]
+        a = TimeArray.from_timestamps(ts)
+
+        assert_equal(
+            [t._us for t in a],
+            [Time.from_timestamp(t)._us for t in ts])
+
+    def test_from_int_timestamps(self):
+        a = TimeArray.from_timestamps(
+            numpy.array([1398125982], dtype=numpy.int32))
+
+        assert_equal(a[0]._us, 1398125982 * 1000000)
+
+    def test_to_timestamps(self):
+        a = TimeArray.from_timestamps([1398125982.036391])
+
+        assert_equal(a.to_timestamps().tolist(), [1398125982.036391])
+
+
+class IndexTimeArrayTestCase(TestCase):
+    @setup
+    def build_array(self):
+        self.a = TimeArray.from_timestamps([30, 10, 20])
+
+    def test_scalar(self):
+        t = self.a[1]
+
+        assert isinstance(t, Time)
+        assert_equal(t.to_timestamp(), 10.0)
+        assert_equal(self.a[-1].to_timestamp(), 20.0)
+
+    def test_slice(self):
+        a = self.a[1:]
+
+        assert isinstance(a, TimeArray)
+        assert_equal(a.to_timestamps().tolist(), [10.0, 20.0])
+
+    def test_mask(self):
+        a = self.a[self.a > Time.from_timestamp(15)]
+
+        assert_equal(a.to_timestamps().tolist(), [30.0, 20.0])
+
+
+class ArithmeticTimeArrayTestCase(TestCase):
+    @setup
+    def build_array(self):
+        self.a = TimeArray.from_timestamps([0, 60])
+
+    def test_add_interval(self):
+        a = self.a + TimeInterval(minutes=1)
+
+        assert_equal(a.to_timestamps().tolist(), [60.0, 120.0])
+
+    def test_radd_interval(self):
+        a = TimeInterval(minutes=1) + self.a
+
+        assert isinstance(a, TimeArray)
+        assert_equal(a.to_timestamps().tolist(), [60.0, 120.0])
+
+    def test_add_interval_array(self):
+        intervals = TimeIntervalArray([TimeInterval(1), TimeInterval(2)])
+        a = self.a + intervals
+
+        assert_equal(a.to_timestamps().tolist(), [1.0, 62.0])
+
+    def test_sub_interval(self):
+        a = self.a - TimeInterval(30)
+
+        assert_equal(a.to_timestamps().tolist(), [-30.0, 30.0])
+
+    def test_sub_time(self):
+        intervals = self.a - Time.from_timestamp(30)
+
+        assert isinstance(intervals, TimeIntervalArray)
+        assert_equal(intervals.to_seconds().tolist(), [-30.0, 30.0])
+        assert_equal(intervals[1]._us, TimeInterval(30)._us)
+
+    def test_sub_array(self):
+        intervals = self.a[1:] - self.a[:1]
+
+        assert_equal(intervals.to_seconds().tolist(), [60.0])
+
+    def test_interval_mul(self):
+        intervals = TimeIntervalArray.from_seconds([1, 2]) * 3
+
+        assert_equal(intervals.to_seconds().tolist(), [3.0, 6.0])
+
+
+class CompareTimeArrayTestCase(TestCase):
+    @setup
+    def build_array(self):
+        self.a = TimeArray.from_timestamps([30, 10, 20])
+
+    def test_compare_time(self):
+        t = Time.from_timestamp(20)
+
+        assert_equal((self.a == t).tolist(), [False, False, True])
+        assert_equal((self.a < t).tolist(), [False, True, False])
+        assert_equal((self.a >= t).tolist(), [True, False, True])
+
+    def test_compare_array(self):
+        other = TimeArray.from_timestamps([30, 30, 30])
+
+        assert_equal((self.a != other).tolist(), [False, True, True])
+
+    def test_min_max(self):
+        assert_equal(self.a.min().to_timestamp(), 10.0)
+        assert_equal(self.a.max().to_timestamp(), 30.0)
+
+    def test_argsort(self):
+        assert_equal(self.a.argsort().tolist(), [1, 2, 0])
+        assert_equal(
+            self.a.sort().to_timestamps().tolist(), [10.0, 20.0, 30.0])
+
+    def test_searchsorted(self):
+        a = self.a.sort()
+
+        assert_equal(a.searchsorted(Time.from_timestamp(20)), 1)
+        assert_equal(a.searchsorted(Time.from_timestamp(20), side='right'), 2)
+        assert_equal(
+            a.searchsorted(TimeArray.from_timestamps([0, 25])).tolist(),
+            [0, 2])
+
+
+class NumpyTimeArrayTestCase(TestCase):
+    def test_to_numpy(self):
+        a = TimeArray([Time(2014, 4, 18, 17, 50, 21, 36391)])
+        values = a.to_numpy()
+
+        assert_equal(values.dtype, numpy.dtype('datetime64[us]'))
+        assert_equal(str(values[0]), '2014-04-18T17:50:21.036391')
+
+        # A view, not a copy
+        assert numpy.shares_memory(values, a._us)
+
+    def test_from_numpy(self):
+        values = numpy.array(
+            ['2014-04-18T17:50:21.036391'], dtype='datetime64[us]')
+        a = TimeArray.from_numpy(values)
+
+        assert_equal(a[0]._us, Time(2014, 4, 18, 17, 50, 21, 36391)._us)
+        assert numpy.shares_memory(values, a._us)
+
+    def test_from_numpy_units(self):
+        values = numpy.array(['2014-04-18T17:50:21'], dtype='datetime64[s]')
+        a = TimeArray.from_numpy(values)
+
+        assert_equal(a[0]._us, Time(2014, 4, 18, 17, 50, 21)._us)
+
+    def test_from_numpy_invalid(self):
+        assert_raises(TypeError, TimeArray.from_numpy, numpy.array([1, 2]))
+        assert_raises(
+            ValueError,
+            TimeArray.from_numpy,
+            numpy.array(['NaT'], dtype='datetime64[us]'))
+
+    def test_intervals(self):
+        values = numpy.array([90], dtype='timedelta64[s]')
+        intervals = TimeIntervalArray.from_numpy(values)
+
+        assert_equal(intervals[0]._us, TimeInterval(minutes=1.5)._us)
+        assert_equal(
+            intervals.to_numpy().dtype, numpy.dtype('timedelta64[us]'))
+
+
+class DateArrayTestCase(TestCase):
+    @setup
+    def build_array(self):
+        self.dates = [
+            datetime.date(2014, 4, 18),
+            datetime.date(2008, 12, 29),
+            datetime.date(2010, 1, 3),
+            datetime.date(1969, 12, 31),
+            datetime.date(1, 1, 1),
+        ]
+        self.a = DateArray([Date.from_datetime_date(d) for d in self.dates])
+
+    def test_init(self):
+        assert_equal(self.a._ord.dtype, numpy.int32)
+        assert_equal(
+            self.a.to_ordinals().tolist(),
+            [d.toordinal() for d in self.dates])
+
+    def test_scalar(self):
+        d = self.a[0]
+
+        assert isinstance(d, Date)
+        assert_equal(d.to_str(), '2014-04-18')
+
+    def test_fields(self):
+        assert_equal(self.a.year.tolist(), [d.year for d in self.dates])
+        assert_equal(self.a.month.tolist(), [d.month for d in self.dates])
+        assert_equal(self.a.day.tolist(), [d.day for d in self.dates])
+        assert_equal(
+            self.a.weekday.tolist(), [d.weekday() for d in self.dates])
+        assert_equal(
+            self.a.yday.tolist(), [d.timetuple().tm_yday for d in self.dates])
+
+    def test_isocalendar(self):
+        years, weeks, weekdays = self.a.isocalendar()
+
+        assert_equal(
+            list(zip(years.tolist(), weeks.tolist(), weekdays.tolist())),
+            [tuple(d.isocalendar()) for d in self.dates])
+        assert_equal(self.a.iso_week.tolist(), weeks.tolist())
+
+    def test_arithmetic(self):
+        a = self.a[:2] + 1
+
+        assert_equal(a.to_str(), ['2014-04-19', '2008-12-30'])
+        assert_equal((a - 1).to_str(), ['2014-04-18', '2008-12-29'])
+        assert_equal((a - self.a[:2]).tolist(), [1, 1])
+        assert_equal(
+            (self.a[:2] + numpy.array([1, 7])).to_str(),
+            ['2014-04-19', '2009-01-05'])
+
+    def test_interval(self):
+        a = DateArray(
+            [Date(2014, 1, 31), Date(2016, 1, 31), Date(2014, 4, 18)])
+
+        for interval in (
+                DateInterval(months=1),
+                DateInterval(years=-1, days=3),
+                DateInterval(weekday=0),
+                -DateInterval(weekday=0)):
+            assert_equal(
+                (a + interval).to_str(), [(d + interval).to_str() for d in a])
+
+    def test_compare(self):
+        d = Date(2010, 1, 3)
+
+        assert_equal(
+            (self.a == d).tolist(), [False, False, True, False, False])
+        assert_equal((self.a > d).tolist(), [True, False, False, False, False])
+        assert_equal(self.a.min().to_str(), '0001-01-01')
+        assert_equal(self.a.sort().searchsorted(d), 3)
+
+    def test_to_str(self):
+        # Leaving out 0001-01-01, which older strftime()s refuse
+        assert_equal(
+            self.a[:-1].to_str('%m/%d/%y (%j)'),
+            [d.strftime('%m/%d/%y (%j)') for d in self.dates[:-1]])
+        assert_equal(self.a[:1].to_str('%A'), ['Friday'])
+
+    def test_numpy(self):
+        values = self.a.to_numpy()
+
+        assert_equal(values.dtype, numpy.dtype('datetime64[D]'))
+        assert_equal(str(values[0]), '2014-04-18')
+        assert_equal(
+            DateArray.from_numpy(values).to_ordinals().tolist(),
+            self.a.to_ordinals().tolist())
+
+
+class TimesDateArrayTestCase(TestCase):
+    @setup
+    def build_times(self):
+        self.times = [
+            Time(2014, 4, 18, 6, 0, 0),
+            Time(2014, 3, 9, 9, 30, 0),
+            Time(2014, 11, 2, 8, 30, 0),
+            Time(2014, 11, 2, 9, 30, 0),
+            Time(1960, 1, 1, 0, 0, 0),
+        ]
+
+    def test_from_times(self):
+        a = DateArray.from_times(TimeArray(self.times))
+
+        assert_equal(
+            a.to_str(), [Date.from_time(t).to_str() for t in self.times])
+
+    def test_from_times_tz(self):
+        a = DateArray.from_times(TimeArray(self.times), tz='US/Pacific')
+
+        assert_equal(
+            a.to_str(),
+            [Date.from_time(t, tz='US/Pacific').to_str() for t in self.times])
+
+    def test_from_us(self):
+        us = numpy.array([t._us for t in self.times])
+        a = DateArray.from_times(us, tz='US/Pacific')
+
+        assert_equal(
+            a.to_str(),
+            DateArray.from_times(
+                TimeArray(self.times), tz='US/Pacific').to_str())
+
+    def test_to_times(self):
+        a = DateArray.from_ordinals([
+            datetime.date(2014, 4, 18).toordinal(),
+            datetime.date(1960, 1, 1).toordinal()])
+
+        assert_equal(
+            a.to_times()._us.tolist(),
+            [Time(2014, 4, 18)._us, Time(1960, 1, 1)._us])
+
+    def test_to_times_tz(self):
+        ordinals = numpy.arange(
+            datetime.date(2013, 1, 1).toordinal(),
+            datetime.date(2015, 1, 1).toordinal())
+        a = DateArray.from_ordinals(ordinals)
+
+        for name in ('US/Pacific', 'America/Sao_Paulo', 'Pacific/Apia'):
+            expected = [
+                Time(d.year, d.month, d.day, tz=name)._us for d in a]
+            assert_equal(a.to_times(tz=name)._us.tolist(), expected)
+
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+if pandas is not None:
+    class PandasTimeArrayTestCase(TestCase):
+        def test_to_pandas(self):
+            a = TimeArray([Time(2014, 4, 18, 17, 50, 21, 36391)])
+            index = a.to_pandas()
+
+            assert isinstance(index, pandas.DatetimeIndex)
+            assert_equal(str(index.tz), 'UTC')
+            assert_equal(
+                index[0].isoformat(), '2014-04-18T17:50:21.036391+00:00')
+
+        def test_to_pandas_series(self):
+            a = TimeArray([Time(2014, 4, 18)])
+            series = a.to_pandas_series(name='t')
+
+            assert_equal(series.name, 't')
+            assert_equal(series[0].isoformat(), '2014-04-18T00:00:00+00:00')
+
+        def test_from_pandas(self):
+            index = pandas.DatetimeIndex(
+                ['2014-04-18T10:50:21.036391'], tz='US/Pacific')
+            a = TimeArray.from_pandas(index)
+
+            assert_equal(a[0]._us, Time(2014, 4, 18, 17, 50, 21, 36391)._us)
+
+        def test_roundtrip_series(self):
+            a = TimeArray.from_timestamps([0, 1398125982.036391])
+            b = TimeArray.from_pandas(a.to_pandas_series())
+
+            assert_equal(b._us.tolist(), a._us.tolist())
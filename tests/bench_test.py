@@ -0,0 +1,92 @@
+from testify import *
+import json
+import os
+import sys
+import tempfile
+
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from dmc import bench
+from dmc.bench.__main__ import main
+
+
+class RunTestCase(TestCase):
+    def test_run(self):
+        results = bench.run('time_to_timestamp', min_time=0.001, repeat=1)
+
+        assert_equal(list(results['results']), ['time_to_timestamp'])
+        result = results['results']['time_to_timestamp']
+        assert_gt(result['ops_per_sec'], 0)
+        assert_in('retained_bytes_per_op', result)
+        # Serializable as is
+        json.dumps(results)
+
+    def test_registered(self):
+        bench.run('nothing matches this')
+        names = [name for name, _ in bench.BENCHMARKS]
+        assert_equal(len(names), len(set(names)))
+        for name in ('time_init', 'time_from_str', 'time_to_str_tz',
+                     'time_iterator_day_by_minute', 'time_to_human'):
+            assert_in(name, names)
+
+    def test_every_benchmark_runs(self):
+        bench.run('nothing matches this')
+        for _, setup in bench.BENCHMARKS:
+            setup()()
+
+
+class CompareTestCase(TestCase):
+    def results(self, **rates):
+        return {'results': dict(
+            (name, {'ops_per_sec': rate}) for name, rate in rates.items())}
+
+    def test_compare(self):
+        baseline = self.results(a=100.0, b=100.0, c=100.0)
+        results = self.results(a=150.0, b=95.0, c=80.0, d=10.0)
+
+        rows, regressions = bench.compare(results, baseline, threshold=0.1)
+        assert_equal(
+            [(name, round(change, 6)) for name, _, _, change in rows],
+            [('a', 0.5), ('b', -0.05), ('c', -0.2)])
+        assert_equal(regressions, ['c'])
+
+
+class MainTestCase(TestCase):
+    @setup_teardown
+    def make_dir(self):
+        self.dir = tempfile.mkdtemp()
+        yield
+        for name in os.listdir(self.dir):
+            os.unlink(os.path.join(self.dir, name))
+        os.rmdir(self.dir)
+
+    @setup_teardown
+    def capture_stdout(self):
+        stdout = sys.stdout
+        sys.stdout = self.stdout = StringIO()
+        yield
+        sys.stdout = stdout
+
+    def test_save_and_compare(self):
+        path = os.path.join(self.dir, 'baseline.json')
+        args = ['-k', 'interval_mul', '--min-time', '0.001']
+        assert_equal(main(args + ['--save', path]), 0)
+        assert self.stdout.getvalue().startswith('interval_mul ')
+        assert_not_in('REGRESSION', self.stdout.getvalue())
+
+        baseline = bench.load(path)
+        assert_in('interval_mul', baseline['results'])
+
+        # Pretend we used to be much faster
+        baseline['results']['interval_mul']['ops_per_sec'] *= 1000
+        bench.save(baseline, path)
+        assert_equal(main(args + ['--baseline', path]), 1)
+
+        lines = self.stdout.getvalue().splitlines()
+        regressed = [line for line in lines if line.endswith('REGRESSION')]
+        assert_equal(len(regressed), 1)
+        assert regressed[0].startswith('interval_mul ')
+        assert_equal(lines[-1], '1 benchmark(s) regressed more than 10%')
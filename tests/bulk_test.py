@@ -0,0 +1,80 @@
+from testify import *
+
+from dmc import (
+    Time,
+    TimeInterval,
+    bulk,
+    codec)
+
+
+START = Time(2014, 4, 18, 17, 50, 21, 36391)
+TIMES = [START + TimeInterval(i * 3607.25) for i in range(25)]
+
+
+def _us(data):
+    return [t._us for t in codec.unpack_many(Time, data)]
+
+
+class ParseTestCase(TestCase):
+    def test_iso(self):
+        strings = [t.to_str() for t in TIMES]
+        assert_equal(_us(bulk.parse(strings)), [t._us for t in TIMES])
+
+    def test_format_tz(self):
+        strings = ['04/18/2014 17:50', '11/02/2014 03:30']
+        data = bulk.parse(
+            strings, format='%m/%d/%Y %H:%M', tz='US/Pacific', chunksize=1)
+        assert_equal(
+            _us(data),
+            [Time.from_str(s, format='%m/%d/%Y %H:%M', tz='US/Pacific')._us
+             for s in strings])
+
+    def test_workers(self):
+        strings = (t.to_str() for t in TIMES)
+        data = bulk.parse(strings, workers=3, chunksize=4)
+        assert_equal(_us(data), [t._us for t in TIMES])
+
+    def test_invalid(self):
+        with assert_raises(ValueError):
+            bulk.parse(
+                ['2014-04-18T17:50:21Z', 'nope'], workers=2, chunksize=1)
+
+    def test_tz_and_local(self):
+        with assert_raises(ValueError):
+            bulk.parse([], tz='US/Pacific', local=True)
+
+    def test_empty(self):
+        assert_equal(bulk.parse([], workers=2), b'')
+
+
+class FromTimestampsTestCase(TestCase):
+    def test(self):
+        timestamps = [t.to_timestamp() for t in TIMES] + [0, -1.5]
+        data = bulk.from_timestamps(timestamps, workers=2, chunksize=5)
+        assert_equal(len(data), len(timestamps) * codec.TIME_SIZE)
+        assert_equal(
+            _us(data), [Time.from_timestamp(ts)._us for ts in timestamps])
+
+
+class FormatTestCase(TestCase):
+    def test_times(self):
+        assert_equal(bulk.format(TIMES), [t.to_str() for t in TIMES])
+
+    def test_packed(self):
+        data = codec.pack_many(TIMES)
+        strings = bulk.format(
+            data, format='%Y-%m-%d %H:%M', tz='US/Pacific', workers=2,
+            chunksize=7)
+        assert_equal(
+            strings,
+            [t.to_str(format='%Y-%m-%d %H:%M', tz='US/Pacific')
+             for t in TIMES])
+
+    def test_round_trip(self):
+        strings = [t.to_str() for t in TIMES]
+        data = bulk.parse(strings, workers=2, chunksize=10)
+        assert_equal(bulk.format(data, workers=2, chunksize=10), strings)
+
+    def test_bad_buffer(self):
+        with assert_raises(ValueError):
+            bulk.format(b'\x00' * 12)
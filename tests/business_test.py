@@ -0,0 +1,138 @@
+from testify import *
+import os
+import shutil
+import tempfile
+
+from dmc import (
+    Date,
+    DateInterval,
+    BusinessCalendar)
+
+
+def brute_add(calendar, d, n):
+    step = DateInterval(days=1 if n > 0 else -1)
+    while n:
+        d += step
+        if calendar.is_business_day(d):
+            n += -1 if n > 0 else 1
+    return d
+
+
+class BusinessCalendarTestCase(TestCase):
+    @setup
+    def build_calendar(self):
+        self.calendar = BusinessCalendar([
+            Date(2014, 1, 1),
+            Date(2014, 12, 25),
+            Date(2014, 12, 26),
+            Date(2015, 1, 1),
+        ])
+
+    def test_is_business_day(self):
+        assert self.calendar.is_business_day(Date(2014, 4, 18))
+        assert not self.calendar.is_business_day(Date(2014, 4, 19))
+        assert not self.calendar.is_business_day(Date(2014, 4, 20))
+        assert not self.calendar.is_business_day(Date(2014, 12, 25))
+
+    def test_add(self):
+        # Friday
+        d = Date(2014, 4, 18)
+
+        assert_equal(self.calendar.add(d, 1).to_str(), '2014-04-21')
+        assert_equal(self.calendar.add(d, 0).to_str(), '2014-04-18')
+        assert_equal(self.calendar.add(d, -5).to_str(), '2014-04-11')
+        assert_equal(
+            self.calendar.add(Date(2014, 4, 19), 1).to_str(), '2014-04-21')
+        assert_equal(
+            self.calendar.add(Date(2014, 4, 19), -1).to_str(), '2014-04-18')
+        assert_equal(
+            self.calendar.add(Date(2014, 12, 24), 1).to_str(), '2014-12-29')
+        assert_equal(
+            self.calendar.add(Date(2014, 12, 31), 1).to_str(), '2015-01-02')
+
+    def test_add_matches_stepping(self):
+        starts = (Date(2014, 12, 20), Date(2014, 12, 22), Date(2015, 1, 1))
+        for start in starts:
+            for n in (1, 2, 5, 9, 30, -1, -7, -30):
+                assert_equal(
+                    self.calendar.add(start, n).to_str(),
+                    brute_add(self.calendar, start, n).to_str())
+
+    def test_add_far(self):
+        d = Date(2014, 4, 18)
+
+        assert_equal(
+            self.calendar.add(d, 2600).to_str(),
+            brute_add(self.calendar, d, 2600).to_str())
+        assert_equal(
+            self.calendar.add(d, -2600).to_str(),
+            brute_add(self.calendar, d, -2600).to_str())
+
+    def test_diff(self):
+        assert_equal(
+            self.calendar.diff(Date(2014, 4, 18), Date(2014, 4, 21)), 1)
+        assert_equal(
+            self.calendar.diff(Date(2014, 4, 21), Date(2014, 4, 18)), -1)
+        assert_equal(
+            self.calendar.diff(Date(2014, 12, 22), Date(2015, 1, 5)), 7)
+        assert_equal(
+            self.calendar.diff(Date(2014, 4, 18), Date(2014, 4, 18)), 0)
+
+    def test_diff_add(self):
+        start = Date(2013, 6, 3)
+        end = self.calendar.add(start, 500)
+
+        assert_equal(self.calendar.diff(start, end), 500)
+
+    def test_roll(self):
+        assert_equal(
+            self.calendar.next_business_day(Date(2014, 12, 25)).to_str(),
+            '2014-12-29')
+        assert_equal(
+            self.calendar.previous_business_day(Date(2014, 12, 25)).to_str(),
+            '2014-12-24')
+        assert_equal(
+            self.calendar.next_business_day(Date(2014, 12, 24)).to_str(),
+            '2014-12-24')
+
+    def test_weekend(self):
+        calendar = BusinessCalendar(weekend=(4, 5))
+
+        assert not calendar.is_business_day(Date(2014, 4, 18))
+        assert calendar.is_business_day(Date(2014, 4, 20))
+        assert_raises(ValueError, BusinessCalendar, weekend=range(7))
+
+
+class LoadBusinessCalendarTestCase(TestCase):
+    @setup
+    def create_dir(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'holidays')
+
+    @teardown
+    def remove_dir(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_from_file(self):
+        with open(self.path, 'w') as f:
+            f.write(
+                "# Some holidays\n\n"
+                "weekend fri sat\n"
+                "2014-04-20 Easter\n"
+                "2014-04-21\n")
+
+        calendar = BusinessCalendar.from_file(self.path)
+
+        assert_equal(calendar.weekend, frozenset([4, 5]))
+        assert_equal(
+            [d.to_str() for d in calendar.holidays],
+            ['2014-04-20', '2014-04-21'])
+        assert_equal(calendar.holiday_name(Date(2014, 4, 20)), 'Easter')
+        assert_equal(calendar.holiday_name(Date(2014, 4, 21)), None)
+        assert_equal(calendar.add(Date(2014, 4, 17), 1).to_str(), '2014-04-22')
+
+    def test_invalid(self):
+        with open(self.path, 'w') as f:
+            f.write("2014-02-30 Nope\n")
+
+        assert_raises(ValueError, BusinessCalendar.from_file, self.path)
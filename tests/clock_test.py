@@ -0,0 +1,78 @@
+from testify import *
+import time
+
+from dmc import (
+    Time,
+    TimeInterval,
+    Clock,
+    set_clock,
+    get_clock,
+    MockNow,
+    clock)
+
+
+class ClockTestCase(TestCase):
+    @setup_teardown
+    def fake_monotonic(self):
+        self.mono = 1000.0
+        real_monotonic = clock._monotonic
+        clock._monotonic = lambda: self.mono
+        yield
+        clock._monotonic = real_monotonic
+
+    def test_cached(self):
+        c = Clock(resolution=0.01)
+        t = c.now()
+        self.mono += 0.005
+        assert c.now() is t
+
+        self.mono += 0.005
+        t2 = c.now()
+        assert_is_not(t2, t)
+        assert_equal(t2._us - t._us, 10000)
+
+    def test_interval_resolution(self):
+        c = Clock(resolution=TimeInterval(microseconds=5000))
+        assert_equal(c.resolution, 0.005)
+
+    def test_close_to_system_clock(self):
+        c = Clock()
+        assert_lt(abs(c.now().to_timestamp() - time.time()), 1.0)
+
+    def test_never_backwards(self):
+        c = Clock(resolution=0.001, anchor=0)
+        t = c.now()
+        # Wall clock anchor reread every call, step it back an hour
+        c._last_us += 3600 * 1000000
+        self.mono += 1
+        assert_equal(c.now()._us, c._last_us)
+        assert_gt(c.now()._us, t._us)
+
+    def test_mock(self):
+        c = Clock()
+        mock_t = Time(2014, 4, 18, 17, 50, 21)
+        with MockNow(mock_t):
+            assert c.now() is mock_t
+
+
+class SetClockTestCase(TestCase):
+    @teardown
+    def clear_clock(self):
+        set_clock(None)
+
+    def test_default(self):
+        assert_equal(get_clock(), None)
+        assert_lt(abs(Time.now().to_timestamp() - time.time()), 1.0)
+
+    def test_set_clock(self):
+        c = Clock(resolution=60)
+        set_clock(c)
+        assert get_clock() is c
+        t = Time.now()
+        assert Time.now() is t
+
+    def test_mock_wins(self):
+        set_clock(Clock(resolution=60))
+        mock_t = Time(2014, 4, 18, 17, 50, 21)
+        with MockNow(mock_t):
+            assert Time.now() is mock_t
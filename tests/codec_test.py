@@ -0,0 +1,100 @@
+from testify import *
+
+from dmc import (
+    Time,
+    TimeInterval,
+    TimeSpan,
+    codec)
+
+
+class PackTestCase(TestCase):
+    def test_time(self):
+        t = Time(2014, 4, 18, 17, 50, 21, 36)
+        data = codec.pack(t)
+        assert_equal(len(data), codec.TIME_SIZE)
+        assert_equal(codec.unpack(Time, data)._us, t._us)
+
+    def test_before_epoch(self):
+        t = Time(1900, 1, 1)
+        assert_equal(codec.unpack(Time, codec.pack(t))._us, t._us)
+
+    def test_interval(self):
+        ti = TimeInterval(-90)
+        assert_equal(codec.unpack(TimeInterval, codec.pack(ti))._us, ti._us)
+
+    def test_span(self):
+        span = TimeSpan(Time(2014, 4, 18), Time(2014, 4, 19))
+        data = codec.pack(span)
+        assert_equal(len(data), codec.SPAN_SIZE)
+        out = codec.unpack(TimeSpan, data)
+        assert_equal(out.start._us, span.start._us)
+        assert_equal(out.end._us, span.end._us)
+
+    def test_layout(self):
+        assert_equal(codec.pack(Time.from_timestamp(0.000001)),
+                     b'\x01\x00\x00\x00\x00\x00\x00\x00')
+
+    def test_offset(self):
+        t = Time(2014, 4, 18)
+        data = b'xx' + codec.pack(t)
+        assert_equal(codec.unpack(Time, data, offset=2)._us, t._us)
+
+    def test_bad_type(self):
+        with assert_raises(TypeError):
+            codec.pack(1)
+        with assert_raises(TypeError):
+            codec.unpack(int, b'\x00' * 8)
+
+
+class PackManyTestCase(TestCase):
+    @setup
+    def build_times(self):
+        start = Time(2014, 4, 18)
+        self.times = [start + TimeInterval(n * 3601.5) for n in range(-5, 50)]
+
+    def test_times(self):
+        data = codec.pack_many(self.times)
+        assert_equal(len(data), codec.TIME_SIZE * len(self.times))
+        out = codec.unpack_many(Time, data)
+        assert_equal([t._us for t in out], [t._us for t in self.times])
+
+    def test_generator(self):
+        data = codec.pack_many(t for t in self.times)
+        assert_equal(data, codec.pack_many(self.times))
+
+    def test_matches_pack(self):
+        assert_equal(
+            codec.pack_many(self.times),
+            b''.join(codec.pack(t) for t in self.times))
+
+    def test_empty(self):
+        assert_equal(codec.pack_many([]), b'')
+        assert_equal(codec.unpack_many(Time, b''), [])
+
+    def test_spans(self):
+        spans = [TimeSpan(t, t + TimeInterval(60)) for t in self.times]
+        data = codec.pack_many(spans)
+        assert_equal(len(data), codec.SPAN_SIZE * len(spans))
+        out = codec.unpack_many(TimeSpan, data)
+        assert_equal(
+            [(s.start._us, s.end._us) for s in out],
+            [(s.start._us, s.end._us) for s in spans])
+
+    def test_into_buffer(self):
+        buf = bytearray(8 + codec.TIME_SIZE * len(self.times))
+        written = codec.pack_many(self.times, out=memoryview(buf), offset=8)
+        assert_equal(written, len(buf) - 8)
+        assert_equal(buf[:8], bytearray(8))
+
+        out = codec.unpack_many(Time, memoryview(buf), offset=8, count=3)
+        assert_equal([t._us for t in out], [t._us for t in self.times[:3]])
+
+    def test_buffer_too_small(self):
+        with assert_raises(ValueError):
+            codec.pack_many(self.times, out=bytearray(8))
+
+        data = codec.pack_many(self.times)
+        with assert_raises(ValueError):
+            codec.unpack_many(Time, data[:-1])
+        with assert_raises(ValueError):
+            codec.unpack_many(Time, data, count=len(self.times) + 1)
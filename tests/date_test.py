@@ -1,11 +1,15 @@
 from testify import *
 import datetime
+import pickle
 import pytz
 
 from dmc import (
     Time,
     Date,
     DateInterval,
+    DateSpan,
+    DateIterator,
+    DateSpanIterator,
     MockNow)
 
 
@@ -17,6 +21,51 @@ class InitDateTestCase(TestCase):
         assert_equal(d.month, 4)
         assert_equal(d.day, 18)
 
+    def test_invalid(self):
+        assert_raises(ValueError, Date, 2014, 2, 30)
+
+    def test_ordinal(self):
+        d = Date.fromordinal(datetime.date(2014, 4, 18).toordinal())
+
+        assert_equal(d.toordinal(), datetime.date(2014, 4, 18).toordinal())
+        assert_equal((d.year, d.month, d.day), (2014, 4, 18))
+        assert_equal(d.weekday, 4)
+
+    def test_compare(self):
+        d = Date(2014, 4, 18)
+
+        assert d == Date(2014, 4, 18)
+        assert d != Date(2014, 4, 19)
+        assert d < Date(2014, 4, 19)
+        assert d >= Date(2014, 4, 18)
+        assert d <= datetime.date(2014, 4, 18)
+        assert d >= datetime.date(2014, 4, 18)
+        assert d > datetime.date(2014, 4, 17)
+        assert d != '2014-04-18'
+
+    def test_hash(self):
+        dates = [Date(2014, 4, 18), Date.fromordinal(Date(2014, 4, 18)._ord)]
+        assert_equal(len(set(dates)), 1)
+
+        d = Date(2014, 4, 18)
+        assert d != datetime.date(2014, 4, 18)
+        assert_equal(len(set([d, datetime.date(2014, 4, 18)])), 2)
+
+    def test_datetime(self):
+        d = Date(2014, 4, 18)
+        dt = datetime.datetime(2014, 4, 18, 15)
+        assert d != dt
+        assert_raises(TypeError, lambda: d < dt)
+        assert_equal(
+            sorted([Date(2014, 5, 1), Date(2014, 4, 18)], key=Date.key),
+            [Date(2014, 4, 18), Date(2014, 5, 1)])
+
+    def test_from_time(self):
+        t = Time(2014, 4, 18, 3, 0, 0)
+
+        assert_equal(Date.from_time(t).to_str(), '2014-04-18')
+        assert_equal(Date.from_time(t, tz='US/Pacific').to_str(), '2014-04-17')
+
 
 class ConvertDateTestCase(TestCase):
     def test_human(self):
@@ -32,3 +81,138 @@ class ConvertDateTestCase(TestCase):
         with MockNow(t):
             assert_equal(d.to_human(), 'today')
             assert_equal(d.to_human(tz='US/Pacific'), 'tomorrow')
+
+
+class DateIntervalTestCase(TestCase):
+    def test_days(self):
+        d = Date(2014, 4, 18) + DateInterval(days=20)
+
+        assert_equal(d.to_str(), '2014-05-08')
+
+    def test_weeks(self):
+        d = Date(2014, 4, 18)
+        d += DateInterval(weeks=3)
+
+        assert_equal(d.to_str(), '2014-05-09')
+
+    def test_sub(self):
+        d = Date(2014, 4, 18) - DateInterval(days=18)
+
+        assert_equal(d.to_str(), '2014-03-31')
+
+    def test_sub_dates(self):
+        interval = Date(2014, 4, 18) - Date(2014, 3, 31)
+
+        assert_equal(interval, DateInterval(days=18))
+
+    def test_months(self):
+        assert_equal(
+            (Date(2014, 1, 31) + DateInterval(months=1)).to_str(),
+            '2014-02-28')
+        assert_equal(
+            (Date(2016, 1, 31) + DateInterval(months=1)).to_str(),
+            '2016-02-29')
+        assert_equal(
+            (Date(2014, 1, 31) + DateInterval(months=-2)).to_str(),
+            '2013-11-30')
+        assert_equal(
+            (Date(2014, 12, 15) + DateInterval(months=1)).to_str(),
+            '2015-01-15')
+
+    def test_years(self):
+        assert_equal(
+            (Date(2016, 2, 29) + DateInterval(years=1)).to_str(), '2017-02-28')
+        assert_equal(
+            (Date(2016, 2, 29) - DateInterval(years=4)).to_str(), '2012-02-29')
+
+    def test_weekday(self):
+        # 2014-04-18 is a Friday
+        d = Date(2014, 4, 18)
+
+        assert_equal((d + DateInterval(weekday=6)).to_str(), '2014-04-20')
+        assert_equal((d + DateInterval(weekday=4)).to_str(), '2014-04-25')
+        assert_equal((d - DateInterval(weekday=0)).to_str(), '2014-04-14')
+        assert_equal(
+            (d + DateInterval(months=1, weekday=0)).to_str(), '2014-05-19')
+
+    def test_overflow(self):
+        assert_raises(
+            OverflowError, lambda: Date(9999, 12, 31) + DateInterval(days=1))
+        assert_raises(
+            OverflowError, lambda: Date(9999, 12, 31) + DateInterval(months=1))
+
+    def test_combine(self):
+        interval = DateInterval(days=1) + DateInterval(months=1)
+
+        assert_equal(interval, DateInterval(days=1, months=1))
+        assert_equal(DateInterval(years=1), DateInterval(months=12))
+        assert_equal(DateInterval(weeks=1) * 2, DateInterval(days=14))
+        assert_raises(ValueError, lambda: DateInterval(weekday=1) * 2)
+
+
+class PickleDateTestCase(TestCase):
+    def roundtrip(self, value):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            yield pickle.loads(pickle.dumps(value, protocol))
+
+    def test_date(self):
+        d = Date(2014, 4, 18)
+        for out in self.roundtrip(d):
+            assert_equal(type(out), Date)
+            assert_equal(out.toordinal(), d.toordinal())
+            assert_equal(out.day, 18)
+
+    def test_interval(self):
+        interval = -DateInterval(months=1, days=2, weekday=3)
+        for out in self.roundtrip(interval):
+            assert_equal(out, interval)
+
+    def test_span(self):
+        span = DateSpan(Date(2014, 4, 18), Date(2014, 5, 18))
+        for out in self.roundtrip(span):
+            assert_equal(out.start.toordinal(), span.start.toordinal())
+            assert_equal(out.end.toordinal(), span.end.toordinal())
+
+
+class DateIteratorTestCase(TestCase):
+    def test_days(self):
+        span = DateSpan(Date(2014, 4, 18), Date(2014, 4, 21))
+        dates = [d.to_str() for d in DateIterator(span, DateInterval(days=1))]
+
+        assert_equal(
+            dates, ['2014-04-18', '2014-04-19', '2014-04-20', '2014-04-21'])
+
+    def test_months(self):
+        span = DateSpan(Date(2014, 1, 31), Date(2014, 5, 1))
+        dates = [
+            d.to_str() for d in DateIterator(span, DateInterval(months=1))]
+
+        assert_equal(
+            dates, ['2014-01-31', '2014-02-28', '2014-03-31', '2014-04-30'])
+
+    def test_weekday(self):
+        span = DateSpan(Date(2014, 4, 18), Date(2014, 5, 5))
+        dates = [
+            d.to_str() for d in DateIterator(span, DateInterval(weekday=0))]
+
+        assert_equal(
+            dates, ['2014-04-18', '2014-04-21', '2014-04-28', '2014-05-05'])
+
+    def test_backwards(self):
+        span = DateSpan(Date(2014, 4, 18), Date(2014, 5, 5))
+
+        assert_raises(
+            ValueError, list, DateIterator(span, DateInterval(days=-1)))
+        assert_raises(
+            ValueError, list, DateIterator(span, DateInterval(months=0)))
+
+    def test_spans(self):
+        span = DateSpan(Date(2014, 4, 1), Date(2014, 4, 20))
+        spans = [
+            (s.start.to_str(), s.end.to_str())
+            for s in DateSpanIterator(span, DateInterval(weeks=1))]
+
+        assert_equal(spans, [
+            ('2014-04-01', '2014-04-08'),
+            ('2014-04-08', '2014-04-15'),
+            ('2014-04-15', '2014-04-20')])
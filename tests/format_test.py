@@ -0,0 +1,42 @@
+from testify import *
+
+from dmc import Time, Formatter
+
+
+class FormatterTestCase(TestCase):
+    @setup
+    def create_times(self):
+        self.times = [
+            Time(2014, 4, 18, 17, 50, 21, 36391),
+            Time(2014, 11, 2, 9, 0, 0),
+            Time(1969, 12, 31, 23, 59, 59, 999999),
+            Time(2000, 2, 29, 0, 0, 0, 1)]
+
+    def test_cached(self):
+        formatter = Formatter("%Y", tz='US/Pacific')
+        assert Formatter("%Y", tz='US/Pacific') is formatter
+
+    def test_iso_matches_isoformat(self):
+        for tz in [None, 'US/Pacific', 'Asia/Kolkata']:
+            f = Formatter(tz=tz)
+            for t in self.times:
+                assert_equal(f(t), t.to_datetime(tz=tz).isoformat())
+
+    def test_format_matches_strftime(self):
+        for format in [
+                "%m/%d/%Y %H:%M",
+                "%Y-%m-%d %H:%M:%S.%f %z %Z",
+                "%y %j {literal} %%"]:
+            for tz in [None, 'US/Pacific']:
+                f = Formatter(format, tz=tz)
+                for t in self.times:
+                    assert_equal(f(t), t.to_datetime(tz=tz).strftime(format))
+
+    def test_fallback(self):
+        f = Formatter("%a %b", tz='US/Pacific')
+        assert_equal(f(self.times[0]), "Fri Apr")
+
+    def test_format_many(self):
+        assert_equal(
+            Time.format_many(self.times[:2], tz='US/Pacific'),
+            ["2014-04-18T10:50:21.036391-07:00", "2014-11-02T01:00:00-08:00"])
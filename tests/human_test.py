@@ -0,0 +1,66 @@
+from testify import *
+
+from dmc import (
+    Time,
+    TimeInterval,
+    Date,
+    MockNow,
+    human)
+
+
+class HumanFormatterTestCase(TestCase):
+    @setup
+    def build_formatter(self):
+        self.now = Time(2014, 4, 18, 17, 50, 21)
+        self.humane = human.HumanFormatter(now=self.now)
+
+    def test_matches_naturaltime(self):
+        offsets = [
+            0, 1, 30, 61, 600, 3700, 4 * 3600, 86400, 3 * 86400, 45 * 86400,
+            200 * 86400, 365 * 86400, 400 * 86400, 500 * 86400, 800 * 86400]
+
+        with MockNow(self.now):
+            for offset in offsets:
+                for sign in (1, -1):
+                    t = self.now + TimeInterval(sign * offset)
+                    dt = t.to_datetime().replace(tzinfo=None)
+                    assert_equal(
+                        self.humane.naturaltime(t), human.naturaltime(dt))
+
+    def test_naturaltime(self):
+        assert_equal(self.humane.naturaltime(self.now), 'now')
+        assert_equal(
+            self.humane.naturaltime(self.now - TimeInterval(minutes=5)),
+            '5 minutes ago')
+        assert_equal(
+            self.humane.naturaltime(self.now + TimeInterval(hours=1)),
+            'an hour from now')
+
+    def test_naturaldate(self):
+        assert_equal(self.humane.naturaldate(Date(2014, 4, 18)), 'today')
+        assert_equal(self.humane.naturaldate(Date(2014, 4, 17)), 'yesterday')
+        assert_equal(self.humane.naturaldate(Date(2014, 4, 19)), 'tomorrow')
+        assert_equal(self.humane.naturaldate(Date(2014, 3, 1)), 'Mar 01')
+        assert_equal(self.humane.naturaldate(Date(2012, 3, 1)), 'Mar 01 2012')
+
+    def test_tz(self):
+        humane = human.HumanFormatter(
+            now=Time(2014, 4, 18, 3, 0, 0), tz='US/Pacific')
+
+        assert_equal(humane.naturaldate(Date(2014, 4, 17)), 'today')
+
+    def test_lists(self):
+        times = [
+            self.now - TimeInterval(minutes=5),
+            self.now - TimeInterval(days=2)]
+
+        assert_equal(self.humane.times(times), ['5 minutes ago', '2 days ago'])
+        assert_equal(
+            self.humane.dates([Date(2014, 4, 18), Date(2014, 4, 17)]),
+            ['today', 'yesterday'])
+
+    def test_mock_now(self):
+        with MockNow(self.now):
+            humane = human.HumanFormatter()
+
+        assert_equal(humane.now._us, self.now._us)
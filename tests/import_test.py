@@ -0,0 +1,55 @@
+from testify import *
+import subprocess
+import sys
+
+
+# Run the suite with `-x disabled` (as `make test` does) on older pythons.
+OLD_PYTHON = sys.version_info < (3, 7)
+
+# Modules plain UTC Times shouldn't need to load.
+HEAVY_MODULES = ('pytz', 'dateutil', 'iso8601', 'humanize', 'numpy')
+
+
+def run_python(code, *options):
+    process = subprocess.Popen(
+        (sys.executable,) + options + ('-c', code),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate()
+    assert_equal(process.returncode, 0, err)
+    return out.decode('utf-8'), err.decode('utf-8')
+
+
+class ImportTimeTestCase(TestCase):
+    @suite(
+        'disabled', conditions=OLD_PYTHON,
+        reason='-X importtime is new in python 3.7')
+    def test_importtime(self):
+        _, err = run_python('import dmc', '-X', 'importtime')
+
+        imported = set()
+        for line in err.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            name = line.rsplit('|', 1)[1].strip()
+            imported.add(name.split('.')[0])
+
+        assert_in('dmc', imported)
+        for name in HEAVY_MODULES:
+            assert_not_in(name, imported)
+
+    @suite(
+        'disabled', conditions=OLD_PYTHON,
+        reason="the arrays aren't lazy before python 3.7, so numpy comes "
+               "along")
+    def test_basic_use(self):
+        out, _ = run_python(
+            'import sys, dmc\n'
+            't = dmc.Time(2014, 4, 18) + dmc.TimeInterval(5)\n'
+            't.to_str(); t.to_timestamp(); sorted([t, dmc.Time.now()])\n'
+            'dmc.Time.from_str("2014-04-18T17:50:21Z")\n'
+            'dmc.Date(2014, 4, 18) + dmc.DateInterval(months=1)\n'
+            'print(" ".join(sorted(sys.modules)))\n')
+
+        loaded = set(name.split('.')[0] for name in out.split())
+        for name in HEAVY_MODULES:
+            assert_not_in(name, loaded)
@@ -0,0 +1,121 @@
+from testify import *
+import datetime
+import importlib
+import sys
+
+import dmc
+from dmc import (
+    Time,
+    TimeInterval,
+    Formatter,
+    human,
+    instrument)
+
+
+class InstrumentTestCase(TestCase):
+    @setup_teardown
+    def clean_stats(self):
+        dmc.disable_stats()
+        dmc.reset_stats()
+        yield
+        dmc.disable_stats()
+        dmc.reset_stats()
+
+    def test_disabled(self):
+        original_init = Time.__dict__['__init__']
+        Time(2014, 4, 18).to_str()
+
+        assert not instrument.enabled()
+        assert Time.__dict__['__init__'] is original_init
+        for counts in dmc.stats()['timers'].values():
+            assert_equal(counts['calls'], 0)
+
+    def test_timers(self):
+        dmc.enable_stats()
+        t = Time(2014, 4, 18, 17, 50, 21)
+        t.to_str()
+        t.to_str(tz='US/Pacific')
+        Time.from_str('2014-04-18T17:50:21Z')
+        t.to_datetime(tz='US/Pacific')
+        t.to_human()
+        human.naturaltime(datetime.datetime(2014, 4, 18))
+
+        timers = dmc.stats()['timers']
+        assert_equal(timers['Time.__init__']['calls'], 1)
+        assert_equal(timers['Time.to_str']['calls'], 2)
+        assert_equal(timers['Time.from_str']['calls'], 1)
+        assert_gte(timers['Time._localized_dt']['calls'], 1)
+        assert_equal(timers['HumanFormatter.naturaltime']['calls'], 1)
+        assert_equal(timers['human.naturaltime']['calls'], 1)
+        assert_gt(timers['Time.to_str']['seconds'], 0)
+
+    def test_caches(self):
+        dmc.enable_stats()
+        Formatter('%Y %d instrument', tz='US/Pacific')
+        Formatter('%Y %d instrument', tz='US/Pacific')
+        TimeInterval(60)
+        TimeInterval(61)
+
+        caches = dmc.stats()['caches']
+        assert_equal(caches['formatter'], {'hits': 1, 'misses': 1})
+        assert_equal(caches['interned_interval'], {'hits': 1, 'misses': 1})
+        zone = caches['zone']
+        assert_equal(zone['hits'] + zone['misses'], 1)
+
+    def test_disable_restores(self):
+        original_init = Time.__dict__['__init__']
+        original_from_str = Time.__dict__['from_str']
+        from dmc import tz, format
+        original_get_zone = tz.get_zone
+
+        dmc.enable_stats()
+        assert Time.__dict__['__init__'] is not original_init
+        assert format.get_zone is not original_get_zone
+        dmc.disable_stats()
+
+        assert Time.__dict__['__init__'] is original_init
+        assert Time.__dict__['from_str'] is original_from_str
+        assert tz.get_zone is original_get_zone
+        assert format.get_zone is original_get_zone
+
+    def test_disable_restores_later_imports(self):
+        from dmc import io, tz
+        original_get_zone = tz.get_zone
+
+        # Import a fresh copy of dmc.io while stats are on
+        del sys.modules['dmc.io']
+        try:
+            dmc.enable_stats()
+            fresh = importlib.import_module('dmc.io')
+            assert fresh.get_zone is not original_get_zone
+            dmc.disable_stats()
+        finally:
+            sys.modules['dmc.io'] = dmc.io = io
+
+        assert fresh.get_zone is original_get_zone
+
+    def test_reset(self):
+        dmc.enable_stats()
+        Time(2014, 4, 18)
+        dmc.reset_stats()
+        assert_equal(dmc.stats()['timers']['Time.__init__']['calls'], 0)
+
+    def test_collect(self):
+        dmc.enable_stats()
+        Time(2014, 4, 18)
+
+        with dmc.collect_stats() as collected:
+            Time(2014, 4, 18)
+            Time(2014, 4, 19)
+
+        assert_equal(collected['timers']['Time.__init__']['calls'], 2)
+        assert_equal(dmc.stats()['timers']['Time.__init__']['calls'], 3)
+        # Still enabled, as it was before
+        assert instrument.enabled()
+
+    def test_collect_disables(self):
+        with dmc.collect_stats() as collected:
+            Time(2014, 4, 18)
+
+        assert_equal(collected['timers']['Time.__init__']['calls'], 1)
+        assert not instrument.enabled()
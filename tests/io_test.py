@@ -0,0 +1,137 @@
+from testify import *
+import os
+import random
+import tempfile
+
+from dmc import (
+    Time,
+    TimeInterval,
+    io)
+
+
+START = Time(2014, 4, 18, 17, 50, 21)
+
+
+class LogFileTestCase(TestCase):
+    @setup_teardown
+    def make_dir(self):
+        self.dir = tempfile.mkdtemp()
+        yield
+        for name in os.listdir(self.dir):
+            os.unlink(os.path.join(self.dir, name))
+        os.rmdir(self.dir)
+
+    def write(self, lines, name='app.log'):
+        path = os.path.join(self.dir, name)
+        with open(path, 'wb') as f:
+            f.write(b'\n'.join(lines))
+        return path
+
+    def test_column(self):
+        path = self.write([
+            b'2014-04-18T17:50:21Z INFO started',
+            b'2014-04-18T17:50:22.5Z WARN slow',
+            b'    Traceback, not a log line',
+            b'2014-04-18t17:50:21z not iso8601',
+            b'2014-04-18T17:51:00Z INFO done',
+        ])
+        with io.LogFile(path, column=0) as log:
+            entries = [(offset, t._us) for offset, t in log.times()]
+            assert_equal([log.line(offset)[-4:] for offset, _ in entries],
+                         [b'rted', b'slow', b'done'])
+
+        assert_equal(
+            [us for _, us in entries],
+            [START._us, START._us + 1500000, START._us + 39000000])
+        assert_equal(entries[1][0], 34)
+
+    def test_field_delimiter(self):
+        path = self.write([
+            b'web1|04/18/2014 17:50:21|GET /',
+            b'web2|04/18/2014 17:50:22|GET /about',
+        ])
+        log = io.LogFile(
+            path, column=1, delimiter='|', format='%m/%d/%Y %H:%M:%S',
+            tz='US/Pacific')
+        try:
+            us = [us for _, us in log.microseconds()]
+        finally:
+            log.close()
+
+        local = Time(2014, 4, 18, 17, 50, 21, tz='US/Pacific')
+        assert_equal(us, [local._us, local._us + 1000000])
+
+    def test_offset_with_tz(self):
+        path = self.write([
+            b'20140418T175021Z basic',
+            b'20140418T175021.5Z basic fraction',
+            b'2014-04-18T17:50Z minutes',
+            b'2014-04-18T10:50:21-07:00 extended',
+            b'2014-04-18T10:50:21 local',
+        ])
+        with io.LogFile(path, column=0, tz='US/Pacific') as log:
+            us = [us for _, us in log.microseconds()]
+
+        assert_equal(us, [
+            START._us,
+            START._us + 500000,
+            START._us - 21000000,
+            START._us,
+            START._us])
+
+    def test_byte_range(self):
+        path = self.write([
+            b'[2014-04-18 17:50:21] started',
+            b'[2014-04-18 17:50:21] again',
+            b'[]',
+        ])
+        with io.LogFile(
+                path, column=(1, 20), format='%Y-%m-%d %H:%M:%S') as log:
+            assert_equal([t._us for _, t in log], [START._us, START._us])
+
+    def test_pattern(self):
+        path = self.write([
+            b'GET / ts=2014-04-18T17:50:21Z user=1',
+            b'GET / user=2',
+            b'GET /about ts=2014-04-18T17:50:22Z',
+        ])
+        with io.LogFile(path, pattern=br'ts=(\S+)') as log:
+            assert_equal(
+                [(offset, t._us) for offset, t in log],
+                [(0, START._us), (50, START._us + 1000000)])
+
+    def test_empty(self):
+        path = self.write([])
+        with io.LogFile(path, column=0) as log:
+            assert_equal(list(log), [])
+            assert_equal(log.seek(START), 0)
+
+    def test_locator(self):
+        path = self.write([])
+        assert_raises(ValueError, io.LogFile, path)
+        assert_raises(ValueError, io.LogFile, path, column=0, pattern='x')
+
+    def test_seek(self):
+        rng = random.Random(7)
+        lines = []
+        t = START
+        for i in range(500):
+            t = t + TimeInterval(rng.choice((0, 0, 1, 2, 30)))
+            lines.append((t.to_str() + ' line %d' % i).encode('ascii'))
+            if rng.random() < 0.2:
+                lines.append(b'  continued')
+        path = self.write(lines)
+
+        with io.LogFile(path, column=0) as log:
+            entries = list(log.microseconds())
+            for target in (
+                    START - TimeInterval(1), START, START + TimeInterval(1),
+                    START + TimeInterval(600), START + TimeInterval(100000)):
+                expected = [
+                    offset for offset, us in entries if us >= target._us]
+                expected = expected[0] if expected else len(log)
+                assert_equal(log.seek(target), expected)
+
+            for offset, us in entries[::37]:
+                assert_equal(log.seek(Time._from_us(us)), min(
+                    o for o, u in entries if u == us))
@@ -0,0 +1,126 @@
+from testify import *
+import datetime
+
+from dmc import Time, TimeFormat
+from dmc import parse
+
+
+class ParseISOTestCase(TestCase):
+    def test_naive(self):
+        wall_us, offset = parse.parse_iso("2014-04-18T17:50:21.036391")
+
+        assert_equal(wall_us, 1397843421036391)
+        assert_equal(offset, None)
+
+    def test_zulu(self):
+        assert_equal(
+            parse.parse_iso("2014-04-18T17:50:21Z"), (1397843421000000, 0))
+
+    def test_offset(self):
+        wall_us, offset = parse.parse_iso("2014-04-18T17:50:21-07:00")
+        assert_equal(offset, -7 * 60 * 60 * 1000000)
+
+        assert_equal(
+            parse.parse_iso("2014-04-18T17:50:21+0530"),
+            (1397843421000000, (5 * 60 + 30) * 60 * 1000000))
+
+    def test_short_fraction(self):
+        wall_us, _ = parse.parse_iso("2014-04-18 17:50:21.5")
+        assert_equal(wall_us % 1000000, 500000)
+
+    def test_long_fraction(self):
+        wall_us, _ = parse.parse_iso("2014-04-18T17:50:21.1234567Z")
+        assert_equal(wall_us % 1000000, 123456)
+
+    def test_fallback(self):
+        assert_equal(parse.parse_iso("2014-04-18"), (1397779200000000, None))
+
+    def test_fast_matches_fallback(self):
+        for s in [
+                "2014-04-18T17:50:21.036391",
+                "2014-04-18T17:50:21.036391-07:00",
+                "2014-04-18T17:50:21Z",
+                "2014-04-18T17:50:21.1+01:30"]:
+            assert_equal(parse._parse_iso_fast(s), parse._parse_iso_generic(s))
+
+    def test_invalid(self):
+        assert_raises(ValueError, parse.parse_iso, "2014-02-30T17:50:21")
+        assert_raises(ValueError, parse.parse_iso, "2014-04-18T+7:50:21")
+
+    def test_strict_as_fallback(self):
+        # Shapes the iso8601 module rejects mustn't sneak through the fast
+        # path.
+        for s in [
+                "2014-04-18T17:50:21.Z",
+                "2014-04-18t17:50:21z",
+                "2014-04-18T17:50:21z",
+                "2014-04-18T17:50:21+05:30:00"]:
+            assert_equal(parse._parse_iso_fast(s), None)
+            assert_raises(ValueError, parse.parse_iso, s)
+
+
+class ParseManyTestCase(TestCase):
+    def test(self):
+        times = Time.parse_many([
+            "2014-04-18T17:50:21.036391",
+            "2014-04-18T17:50:21.036391-07:00"])
+
+        assert_equal(times, [
+            Time(2014, 4, 18, 17, 50, 21, 36391),
+            Time(2014, 4, 19, 0, 50, 21, 36391)])
+
+    def test_tz(self):
+        times = Time.parse_many(["2014-04-18T17:50:21"], tz='US/Pacific')
+
+        assert_equal(times, [Time(2014, 4, 19, 0, 50, 21)])
+
+    def test_tz_in_string(self):
+        assert_raises(
+            ValueError, Time.parse_many, ["2014-04-18T17:50:21Z"],
+            tz='US/Pacific')
+
+
+class TimeFormatTestCase(TestCase):
+    def test_cached(self):
+        assert TimeFormat("%Y/%m/%d") is TimeFormat("%Y/%m/%d")
+        assert TimeFormat(TimeFormat("%Y")) is TimeFormat("%Y")
+
+    def test_apache(self):
+        tf = TimeFormat("%d/%b/%Y:%H:%M:%S %z")
+
+        assert_equal(
+            tf.parse("18/Apr/2014:10:50:21 -0700"),
+            (1397818221000000, -7 * 60 * 60 * 1000000))
+
+    def test_matches_strptime(self):
+        for s, format in [
+                ("04/18/2014 17:50", "%m/%d/%Y %H:%M"),
+                ("Friday, April 18 14 5:50:21.5 PM",
+                 "%A, %B %d %y %I:%M:%S.%f %p"),
+                ("2014 108", "%Y %j"),
+                ("12:01 am", "%I:%M %p")]:
+            assert_equal(
+                TimeFormat(format).parse(s),
+                parse.split_datetime(datetime.datetime.strptime(s, format)))
+
+    def test_fallback(self):
+        tf = TimeFormat("%c")
+        assert_equal(tf._match, None)
+
+        assert_equal(
+            tf.parse("Fri Apr 18 17:50:21 2014"), (1397843421000000, None))
+
+    def test_mismatch(self):
+        assert_raises(ValueError, TimeFormat("%Y-%m-%d").parse, "2014/04/18")
+        assert_raises(ValueError, TimeFormat("%Y-%m-%d").parse, "2014-02-30")
+
+    def test_from_str(self):
+        t = Time.from_str(
+            "18/Apr/2014:10:50:21 -0700", format="%d/%b/%Y:%H:%M:%S %z")
+        assert_equal(
+            t.to_timestamp(), Time(2014, 4, 18, 17, 50, 21).to_timestamp())
+
+        t = Time.from_str(
+            "04/18/2014 10:50", format="%m/%d/%Y %H:%M", tz='US/Pacific')
+        assert_equal(
+            t.to_timestamp(), Time(2014, 4, 18, 17, 50).to_timestamp())
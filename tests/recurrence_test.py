@@ -0,0 +1,235 @@
+from testify import *
+import datetime
+
+from dateutil import rrule
+
+from dmc import (
+    Time,
+    Date,
+    BusinessCalendar,
+    Recurrence,
+    DAILY,
+    WEEKLY,
+    MONTHLY,
+    YEARLY)
+
+
+def take(iterable, n):
+    result = []
+    for value in iterable:
+        if len(result) == n:
+            break
+        result.append(value)
+    return result
+
+
+def rrule_dates(*args, **kwargs):
+    return [dt.date().isoformat() for dt in rrule.rrule(*args, **kwargs)]
+
+
+class RecurrenceDatesTestCase(TestCase):
+    start = Date(2014, 1, 31)
+    dtstart = datetime.datetime(2014, 1, 31)
+
+    def check(self, rule, expected_rrule):
+        expected = take(expected_rrule, 40)
+        dates = [d.to_str() for d in take(rule.dates(), len(expected))]
+        assert_equal(dates, expected)
+
+    def test_daily(self):
+        self.check(
+            Recurrence(DAILY, self.start, interval=3),
+            rrule_dates(
+                rrule.DAILY, dtstart=self.dtstart, interval=3, count=40))
+
+    def test_daily_weekdays(self):
+        self.check(
+            Recurrence(DAILY, self.start, weekdays=[0, 2, 4], months=[2, 3]),
+            rrule_dates(
+                rrule.DAILY, dtstart=self.dtstart, byweekday=[0, 2, 4],
+                bymonth=[2, 3], count=40))
+
+    def test_weekly(self):
+        self.check(
+            Recurrence(WEEKLY, self.start, interval=2, weekdays=[1, 3]),
+            rrule_dates(
+                rrule.WEEKLY, dtstart=self.dtstart, interval=2,
+                byweekday=[1, 3], count=40))
+
+    def test_weekly_default(self):
+        self.check(
+            Recurrence(WEEKLY, self.start),
+            rrule_dates(rrule.WEEKLY, dtstart=self.dtstart, count=40))
+
+    def test_monthly_default(self):
+        # Months without a 31st are skipped
+        self.check(
+            Recurrence(MONTHLY, self.start),
+            rrule_dates(rrule.MONTHLY, dtstart=self.dtstart, count=40))
+
+    def test_monthly_nth_weekday(self):
+        self.check(
+            Recurrence(MONTHLY, self.start, weekdays=[(1, 2), (4, -1)]),
+            rrule_dates(
+                rrule.MONTHLY, dtstart=self.dtstart,
+                byweekday=[rrule.TU(2), rrule.FR(-1)], count=40))
+
+    def test_monthly_month_days(self):
+        self.check(
+            Recurrence(
+                MONTHLY, self.start, interval=2, month_days=[1, 15, -1]),
+            rrule_dates(
+                rrule.MONTHLY, dtstart=self.dtstart, interval=2,
+                bymonthday=[1, 15, -1], count=40))
+
+    def test_monthly_friday_13th(self):
+        self.check(
+            Recurrence(MONTHLY, self.start, weekdays=[4], month_days=[13]),
+            rrule_dates(
+                rrule.MONTHLY, dtstart=self.dtstart, byweekday=[4],
+                bymonthday=[13], count=20))
+
+    def test_yearly_default(self):
+        start = Date(2012, 2, 29)
+        self.check(
+            Recurrence(YEARLY, start),
+            rrule_dates(
+                rrule.YEARLY, dtstart=datetime.datetime(2012, 2, 29),
+                count=10))
+
+    def test_yearly_months(self):
+        self.check(
+            Recurrence(YEARLY, self.start, months=[3, 11], weekdays=[(3, 4)]),
+            rrule_dates(
+                rrule.YEARLY, dtstart=self.dtstart, bymonth=[3, 11],
+                byweekday=[rrule.TH(4)], count=20))
+
+    def test_yearly_nth_weekday(self):
+        self.check(
+            Recurrence(YEARLY, self.start, weekdays=[(0, 20), (6, -1)]),
+            rrule_dates(
+                rrule.YEARLY, dtstart=self.dtstart,
+                byweekday=[rrule.MO(20), rrule.SU(-1)], count=20))
+
+    def test_until(self):
+        rule = Recurrence(DAILY, self.start, until=Date(2014, 2, 2))
+
+        assert_equal(
+            [d.to_str() for d in rule.dates()],
+            ['2014-01-31', '2014-02-01', '2014-02-02'])
+
+    def test_count(self):
+        rule = Recurrence(MONTHLY, self.start, month_days=[1, 15], count=5)
+
+        assert_equal(
+            [d.to_str() for d in rule.dates()],
+            ['2014-02-01', '2014-02-15', '2014-03-01', '2014-03-15',
+             '2014-04-01'])
+
+    def test_dates_after(self):
+        rule = Recurrence(MONTHLY, self.start, month_days=[1])
+
+        assert_equal(
+            [d.to_str() for d in take(rule.dates(after=Date(2016, 12, 1)), 2)],
+            ['2017-01-01', '2017-02-01'])
+
+    def test_never(self):
+        rule = Recurrence(YEARLY, self.start, months=[2], month_days=[30])
+
+        assert_equal(list(rule.dates()), [])
+
+
+class RecurrenceBusinessTestCase(TestCase):
+    @setup
+    def build_calendar(self):
+        self.calendar = BusinessCalendar(
+            [Date(2014, 5, 30), Date(2014, 12, 25)])
+
+    def test_last_business_day(self):
+        rule = Recurrence(
+            MONTHLY, Date(2014, 1, 1), business_day=-1, calendar=self.calendar)
+
+        assert_equal(
+            [d.to_str() for d in take(rule.dates(), 6)],
+            ['2014-01-31', '2014-02-28', '2014-03-31', '2014-04-30',
+             '2014-05-29', '2014-06-30'])
+
+    def test_first_business_day_of_week(self):
+        rule = Recurrence(
+            WEEKLY, Date(2014, 12, 22), business_day=1,
+            calendar=BusinessCalendar([Date(2014, 12, 29)]))
+
+        assert_equal(
+            [d.to_str() for d in take(rule.dates(), 3)],
+            ['2014-12-22', '2014-12-30', '2015-01-05'])
+
+    def test_roll(self):
+        rule = Recurrence(
+            MONTHLY, Date(2014, 1, 1), month_days=[25], calendar=self.calendar,
+            roll='next')
+
+        assert_equal(
+            [d.to_str() for d in take(rule.dates(after=Date(2014, 4, 1)), 3)],
+            ['2014-04-25', '2014-05-26', '2014-06-25'])
+        assert_equal(
+            [d.to_str() for d in take(rule.dates(after=Date(2014, 12, 1)), 1)],
+            ['2014-12-26'])
+
+    def test_needs_calendar(self):
+        assert_raises(
+            ValueError, Recurrence, MONTHLY, Date(2014, 1, 1), business_day=1)
+
+
+class RecurrenceTimesTestCase(TestCase):
+    def test_times_tz(self):
+        rule = Recurrence(
+            MONTHLY, Date(2014, 1, 1), weekdays=[(1, 2)], at=(9, 0),
+            tz='America/New_York')
+
+        times = take(rule.times(), 4)
+        assert_equal(
+            [t.to_str(tz='America/New_York') for t in times],
+            ['2014-01-14T09:00:00-05:00', '2014-02-11T09:00:00-05:00',
+             '2014-03-11T09:00:00-04:00', '2014-04-08T09:00:00-04:00'])
+
+    def test_next_after(self):
+        rule = Recurrence(
+            MONTHLY, Date(2014, 1, 1), weekdays=[(1, 2)], at=(9, 0),
+            tz='America/New_York')
+
+        t = rule.next_after(Time(2014, 3, 11, 12, 59, tz='America/New_York'))
+        assert_equal(
+            t.to_str(tz='America/New_York'), '2014-04-08T09:00:00-04:00')
+
+        t = rule.next_after(Time(2014, 3, 11, 8, 59, tz='America/New_York'))
+        assert_equal(
+            t.to_str(tz='America/New_York'), '2014-03-11T09:00:00-04:00')
+
+        # Straight to the right year
+        t = rule.next_after(Time(2093, 12, 31, tz='America/New_York'))
+        assert_equal(
+            t.to_str(tz='America/New_York'), '2094-01-12T09:00:00-05:00')
+
+    def test_next_after_matches_iteration(self):
+        rule = Recurrence(
+            WEEKLY, Date(2014, 1, 1), weekdays=[0, 3], at=[(9, 0), (17, 30)])
+        times = take(rule.times(), 30)
+
+        for before, after in zip(times, times[1:]):
+            assert_equal(rule.next_after(before)._us, after._us)
+
+    def test_next_after_end(self):
+        rule = Recurrence(DAILY, Date(2014, 1, 1), count=3)
+
+        assert_equal(rule.next_after(Time(2014, 1, 3)), None)
+        assert_equal(
+            rule.next_after(Time(2013, 1, 3))._us, Time(2014, 1, 1)._us)
+
+    def test_count_times(self):
+        rule = Recurrence(
+            DAILY, Date(2014, 1, 1), count=3, at=[(9, 0), (17, 0)])
+
+        assert_equal(
+            [t.to_str() for t in rule.times()],
+            ['2014-01-01T09:00:00+00:00', '2014-01-01T17:00:00+00:00',
+             '2014-01-02T09:00:00+00:00'])
@@ -0,0 +1,141 @@
+from testify import *
+import threading
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+from dmc import (
+    Time,
+    TimeInterval,
+    Clock,
+    MockNow,
+    VirtualClock,
+    get_mock_now,
+    set_mock_now)
+
+
+class MockNowTestCase(TestCase):
+    def test_nested(self):
+        outer = Time(2014, 4, 18)
+        inner = Time(2014, 4, 19)
+        with MockNow(outer):
+            with MockNow(inner):
+                assert_equal(Time.now()._us, inner._us)
+            assert_equal(Time.now()._us, outer._us)
+        assert_equal(get_mock_now(), None)
+
+    def test_nested_set_mock_now(self):
+        outer = Time(2014, 4, 18)
+        with MockNow(outer):
+            with MockNow(Time(2014, 4, 19)):
+                set_mock_now(Time(2014, 4, 20))
+                assert_equal(Time.now()._us, Time(2014, 4, 20)._us)
+            assert_equal(Time.now()._us, outer._us)
+            set_mock_now(Time(2014, 4, 21))
+        assert_equal(get_mock_now(), None)
+
+
+class VirtualClockTestCase(TestCase):
+    @setup
+    def build_clock(self):
+        self.start = Time(2014, 4, 18, 17, 50, 21)
+        self.clock = VirtualClock(self.start)
+
+    def test_advance(self):
+        with self.clock as clock:
+            assert_equal(Time.now()._us, self.start._us)
+            clock.advance(TimeInterval(hours=6))
+            assert_equal(Time.now()._us - self.start._us, 6 * 3600 * 10**6)
+            clock.advance(1.5)
+            assert_equal(clock.monotonic(), 6 * 3600 + 1.5)
+
+        assert_equal(get_mock_now(), None)
+
+    def test_backwards(self):
+        with assert_raises(ValueError):
+            self.clock.advance(-1)
+        with assert_raises(ValueError):
+            self.clock.advance_to(self.start - TimeInterval(1))
+
+    def test_advance_to(self):
+        t = self.start + TimeInterval(days=1)
+        self.clock.advance_to(t)
+        assert_equal(self.clock.now()._us, t._us)
+
+    def test_nested(self):
+        other = VirtualClock(Time(2000, 1, 1))
+        with self.clock:
+            with other:
+                assert_equal(Time.now()._us, other.now()._us)
+            assert_equal(Time.now()._us, self.start._us)
+
+    def test_coarse_clock(self):
+        with self.clock:
+            assert_equal(Clock().now()._us, self.start._us)
+
+    def test_other_threads(self):
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(Time.now()))
+        with self.clock:
+            thread.start()
+            thread.join()
+        assert_not_equal(seen[0]._us, self.start._us)
+
+
+class VirtualEventLoopTestCase(TestCase):
+    @setup
+    def build_clock(self):
+        if asyncio is None:
+            return
+        self.start = Time(2014, 4, 18, 17, 50, 21)
+        self.clock = VirtualClock(self.start)
+
+    def test_sleep(self):
+        if asyncio is None:
+            return
+
+        # A day of sleeping shouldn't take a day.
+        self.clock.run(asyncio.sleep(86400))
+        assert_equal(self.clock.now()._us - self.start._us, 86400 * 10**6)
+
+    def test_timers(self):
+        if asyncio is None:
+            return
+
+        fired = []
+        loop = self.clock.new_event_loop()
+        try:
+            for delay in (30, 10, 20):
+                loop.call_later(
+                    delay, lambda: fired.append(self.clock.monotonic()))
+            loop.run_until_complete(asyncio.sleep(60))
+        finally:
+            loop.close()
+
+        assert_equal(fired, [10, 20, 30])
+
+    def test_wait_for(self):
+        if asyncio is None:
+            return
+
+        with assert_raises(asyncio.TimeoutError):
+            self.clock.run(asyncio.wait_for(asyncio.sleep(3600), 5))
+        assert_equal(self.clock.monotonic(), 5)
+
+    def test_time_now_in_task(self):
+        if asyncio is None:
+            return
+
+        seen = []
+        loop = self.clock.new_event_loop()
+        try:
+            with self.clock:
+                task = loop.create_task(asyncio.sleep(90))
+                task.add_done_callback(lambda _: seen.append(Time.now()))
+                loop.run_until_complete(task)
+        finally:
+            loop.close()
+
+        assert_equal(seen[0]._us - self.start._us, 90 * 10**6)
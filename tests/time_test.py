@@ -1,5 +1,6 @@
 from testify import *
 import datetime
+import pickle
 import pytz
 
 from dmc import (
@@ -7,7 +8,8 @@ from dmc import (
     TimeInterval,
     TimeSpan,
     TimeIterator,
-    TimeSpanIterator)
+    TimeSpanIterator,
+    sort_times)
 
 
 class InitTimeTestCase(TestCase):
@@ -27,7 +29,7 @@ class InitTimeTestCase(TestCase):
         assert_equal(d.year, 2014)
         assert_equal(d.month, 4)
         assert_equal(d.day, 19)
-        assert_equal(d.hour, 1)
+        assert_equal(d.hour, 0)
         assert_equal(d.minute, 50)
         assert_equal(d.second, 21)
 
@@ -56,6 +58,12 @@ class InitTimeTestCase(TestCase):
         assert_equal(t.second, 42)
         assert_equal(t.microsecond, 36391)
 
+    def test_timestamp_int(self):
+        t = Time.from_timestamp(1398125982)
+
+        assert_equal(t.second, 42)
+        assert_equal(t.microsecond, 0)
+
     def test_datetime_naive(self):
         dt = datetime.datetime(2014, 4, 18, 17, 50, 21)
 
@@ -129,7 +137,10 @@ class ConvertTimeTestCase(TestCase):
         assert_equal(self.t.to_str(format="%m/%d/%Y %H:%M"), "04/18/2014 17:50")
 
     def test_timestamp(self):
-        assert_equal(self.t.to_timestamp(), 1397872221.036391)
+        assert_equal(self.t.to_timestamp(), 1397843421.036391)
+
+    def test_timestamp_roundtrip(self):
+        assert_equal(Time.from_timestamp(self.t.to_timestamp()), self.t)
 
     def test_datetime(self):
         dt = self.t.to_datetime()
@@ -187,6 +198,57 @@ class ArithmeticTimeTest(TestCase):
         assert_equal(t2.microsecond, 780000)
 
 
+class CompareTimeTest(TestCase):
+    def test_compare(self):
+        t1 = Time(2014, 4, 18, 17, 50, 21)
+        t2 = Time(2014, 4, 18, 17, 50, 22)
+
+        assert t1 < t2
+        assert t1 <= t2
+        assert t2 > t1
+        assert t2 >= t1
+        assert t1 != t2
+        assert t1 == Time(2014, 4, 18, 17, 50, 21)
+
+    def test_datetime(self):
+        t = Time(2014, 4, 18, 17, 50, 21)
+        dt = datetime.datetime(2014, 4, 18, 17, 50, 21)
+
+        assert t <= dt and t >= dt
+        assert t <= pytz.utc.localize(dt) and t >= pytz.utc.localize(dt)
+        assert t < dt + datetime.timedelta(microseconds=1)
+        assert t < pytz.timezone('US/Pacific').localize(dt)
+
+    def test_other_types(self):
+        t = Time(2014, 4, 18)
+        assert t != 1
+        assert not t == TimeInterval(1)
+
+    def test_hash(self):
+        t1 = Time(2014, 4, 18, 17, 50, 21)
+        t2 = Time(2014, 4, 18, 17, 50, 21)
+        assert_equal(hash(t1), hash(t2))
+        assert_equal(len(set([t1, t2, t1 + 1])), 2)
+        assert_equal({t1: 'a'}[t2], 'a')
+
+    def test_hash_datetime(self):
+        t = Time(2014, 4, 18, 17, 50, 21)
+        dt = datetime.datetime(2014, 4, 18, 17, 50, 21)
+        assert t != dt
+        assert_equal(len(set([t, dt])), 2)
+        assert_equal(len(set([t, dt, Time.from_datetime(dt)])), 2)
+
+    def test_sort(self):
+        start = Time(2014, 4, 18)
+        times = [start + TimeInterval(n) for n in (5, -3, 0, 12, -7)]
+
+        expected = sorted(times, key=lambda t: t.to_timestamp())
+        assert_equal(sort_times(times), expected)
+        assert_equal(sorted(times), expected)
+        assert_equal(sort_times(times, reverse=True), expected[::-1])
+        assert_equal(sorted(times, key=Time.key), expected)
+
+
 class InitTimeIntervalTest(TestCase):
     def test_seconds(self):
         i = TimeInterval(21)
@@ -220,6 +282,21 @@ class InitTimeIntervalTest(TestCase):
         assert_equal(i.seconds, 2)
         assert_equal(i.microseconds, 100000)
 
+    def test_days(self):
+        i = TimeInterval(days=2)
+        assert_equal(i.seconds, 2 * 24 * 60 * 60)
+        assert_equal(i.microseconds, 0)
+
+    def test_negative(self):
+        i = TimeInterval(-2.22)
+        assert_equal(i.seconds, -3)
+        assert_equal(i.microseconds, 780000)
+
+    def test_interned(self):
+        assert TimeInterval(1) is TimeInterval(microseconds=1000000)
+        assert TimeInterval(hours=1) is TimeInterval(minutes=60)
+        assert TimeInterval(days=1) is TimeInterval(hours=24)
+
     def test_timedelta(self):
         td = datetime.timedelta(days=1, seconds=10, microseconds=1000)
 
@@ -312,6 +389,45 @@ class ArithmeticTimeIntervalTest(TestCase):
         assert_equal(i2.seconds, 1)
         assert_equal(i2.microseconds, 11)
 
+    def test_mul_float(self):
+        i1 = TimeInterval(microseconds=3)
+
+        assert_equal((i1 * 0.5).microseconds, 2)
+        assert_equal(int(3 * TimeInterval(2)), 6)
+
+    def test_div_interval(self):
+        assert_equal(TimeInterval(5) / TimeInterval(2), 2.5)
+
+    def test_floordiv(self):
+        i1 = TimeInterval(5, microseconds=1)
+
+        assert_equal(i1 // TimeInterval(2), 2)
+        assert_equal(i1 // 2, TimeInterval(2.5))
+
+    def test_mod(self):
+        i1 = TimeInterval(minutes=5, seconds=10)
+
+        assert_equal(i1 % TimeInterval(minutes=1), TimeInterval(10))
+        assert_equal(
+            TimeInterval(microseconds=7) % 4, TimeInterval(microseconds=3))
+
+    def test_divmod(self):
+        q, r = divmod(
+            TimeInterval(hours=1, seconds=30), TimeInterval(minutes=7))
+
+        assert_equal(q, 8)
+        assert_equal(r, TimeInterval(minutes=4, seconds=30))
+
+    def test_no_drift(self):
+        total = TimeInterval(0)
+        for _ in range(10):
+            total += TimeInterval(0.1)
+
+        assert_equal(total, TimeInterval(1))
+
+    def test_neg(self):
+        assert_equal(-TimeInterval(2), TimeInterval(-2))
+
     def test_abs(self):
         i1 = TimeInterval(-2.22)
 
@@ -335,6 +451,14 @@ class ArithmeticTimeIntervalTest(TestCase):
         assert_lt(TimeInterval(0), TimeInterval(microseconds=1))
         assert_lt(TimeInterval(-3), TimeInterval(2.5))
 
+    def test_hash(self):
+        assert_equal(
+            len(set([TimeInterval(60), TimeInterval(minutes=1),
+                     TimeInterval(61)])),
+            2)
+        intervals = [TimeInterval(n) for n in (3, -1, 2)]
+        assert_equal(sort_times(intervals), sorted(intervals))
+
 
 class TimeSpanTest(TestCase):
     def test_iter(self):
@@ -358,6 +482,41 @@ class TimeSpanTest(TestCase):
         assert_equal(ts[1], t2)
 
 
+class PickleTest(TestCase):
+    def roundtrip(self, value):
+        for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+            yield pickle.loads(pickle.dumps(value, protocol))
+
+    def test_time(self):
+        t = Time(2014, 4, 18, 17, 50, 21, 36)
+        for out in self.roundtrip(t):
+            assert_equal(type(out), Time)
+            assert_equal(out._us, t._us)
+
+    def test_interval(self):
+        for out in self.roundtrip(TimeInterval(60)):
+            assert_equal(out._us, 60 * 1000000)
+            # Small intervals come back interned
+            assert out is TimeInterval(60)
+
+    def test_span(self):
+        span = TimeSpan(Time(2014, 4, 18), Time(2014, 4, 19))
+        for out in self.roundtrip(span):
+            assert_equal(type(out), TimeSpan)
+            assert_equal(out.start._us, span.start._us)
+            assert_equal(out.end._us, span.end._us)
+
+    def test_subclass(self):
+        t = SubTime(2014, 4, 18)
+        for out in self.roundtrip(t):
+            assert_equal(type(out), SubTime)
+            assert_equal(out._us, t._us)
+
+
+class SubTime(Time):
+    __slots__ = []
+
+
 class TimeIteratorTest(TestCase):
     def test(self):
         start_t = Time.now()
@@ -0,0 +1,173 @@
+from testify import *
+import datetime
+import os
+import pytz
+
+from dmc import Time
+from dmc import epoch
+from dmc import tz
+
+
+class GetZoneTestCase(TestCase):
+    def test_cached(self):
+        assert tz.get_zone('US/Pacific') is tz.get_zone('US/Pacific')
+
+    def test_unknown(self):
+        assert_raises(
+            pytz.UnknownTimeZoneError, tz.get_zone, 'Nowhere/Special')
+
+
+class ZoneTestCase(TestCase):
+    zones = [
+        'US/Pacific', 'Europe/London', 'Australia/Lord_Howe', 'UTC', 'EST']
+
+    def test_utcoffset_matches_pytz(self):
+        start = Time(2013, 1, 1)._us
+        for name in self.zones:
+            zone = tz.get_zone(name)
+            tzinfo = pytz.timezone(name)
+            for step in range(0, 800):
+                us = start + step * 13 * epoch.MICROSECS_PER_HOUR
+                dt = pytz.UTC.localize(
+                    epoch.us_to_datetime(us)).astimezone(tzinfo)
+
+                assert_equal(
+                    zone.utcoffset(us), epoch.timedelta_to_us(dt.utcoffset()))
+                assert_equal(zone.tzname(us), dt.tzname())
+
+    def test_localize_matches_pytz(self):
+        start = datetime.datetime(2014, 3, 8)
+        for name in self.zones:
+            zone = tz.get_zone(name)
+            tzinfo = pytz.timezone(name)
+            for step in range(0, 24 * 4):
+                dt = start + datetime.timedelta(minutes=step * 15)
+                wall_us = epoch.datetime_to_us(dt)
+                for is_dst in (True, False):
+                    assert_equal(
+                        zone.localize(wall_us, is_dst=is_dst),
+                        epoch.datetime_to_us(
+                            tzinfo.localize(dt, is_dst=is_dst)))
+
+    def test_gap(self):
+        zone = tz.get_zone('US/Pacific')
+        wall_us = epoch.datetime_to_us(datetime.datetime(2014, 3, 9, 2, 30))
+
+        assert_raises(
+            pytz.NonExistentTimeError, zone.localize, wall_us, is_dst=None)
+        assert_equal(
+            zone.localize(wall_us, is_dst=True),
+            Time(2014, 3, 9, 9, 30)._us)
+        assert_equal(
+            zone.localize(wall_us, is_dst=False),
+            Time(2014, 3, 9, 10, 30)._us)
+
+    def test_fold(self):
+        zone = tz.get_zone('US/Pacific')
+        wall_us = epoch.datetime_to_us(datetime.datetime(2014, 11, 2, 1, 30))
+
+        assert_raises(
+            pytz.AmbiguousTimeError, zone.localize, wall_us, is_dst=None)
+        assert_equal(
+            zone.localize(wall_us, is_dst=True),
+            Time(2014, 11, 2, 8, 30)._us)
+        assert_equal(
+            zone.localize(wall_us, is_dst=False),
+            Time(2014, 11, 2, 9, 30)._us)
+
+    def test_irregular_transitions(self):
+        # Samoa skipped a whole day crossing the date line
+        zone = tz.get_zone('Pacific/Apia')
+        wall_us = epoch.datetime_to_us(datetime.datetime(2011, 12, 30, 6))
+        assert_equal(zone.localize(wall_us), 1325260800000000)
+
+        # and in 1901 went the other way, repeating most of a day
+        wall_us = epoch.datetime_to_us(datetime.datetime(1901, 12, 13, 12))
+        assert_raises(
+            pytz.AmbiguousTimeError, zone.localize, wall_us, is_dst=None)
+
+    def test_localize_transitions_match_pytz(self):
+        def localize(localize, wall, is_dst):
+            try:
+                return localize(wall, is_dst=is_dst)
+            except (pytz.AmbiguousTimeError, pytz.NonExistentTimeError) as e:
+                return type(e)
+
+        start = Time(1970, 1, 1)._us
+        end = Time(2038, 1, 1)._us
+        for name in pytz.common_timezones:
+            zone = tz.get_zone(name)
+            tzinfo = pytz.timezone(name)
+            transitions = zone._transitions
+            offsets = zone._offsets
+            for i in range(1, len(transitions)):
+                if not start <= transitions[i] < end:
+                    continue
+
+                # Either side of the transition, and in its gap or fold
+                before = transitions[i] + offsets[i - 1]
+                after = transitions[i] + offsets[i]
+                middle = (before + after) // 2
+                checks = [(before, False), (after, False)] + [
+                    (middle, is_dst) for is_dst in (False, True, None)]
+
+                for wall_us, is_dst in checks:
+                    expected = localize(
+                        tzinfo.localize, epoch.us_to_datetime(wall_us), is_dst)
+                    if not isinstance(expected, type):
+                        expected = epoch.datetime_to_us(expected)
+                    assert_equal(
+                        localize(zone.localize, wall_us, is_dst), expected,
+                        '{} {}'.format(name, epoch.us_to_datetime(wall_us)))
+
+    def test_to_datetime(self):
+        dt = tz.get_zone('US/Pacific').to_datetime(
+            Time(2014, 4, 18, 17, 50)._us)
+
+        assert_equal(dt.hour, 10)
+        assert_equal(dt.tzname(), 'PDT')
+        assert_equal(str(dt.tzinfo), 'US/Pacific')
+
+
+class LocalZoneTestCase(TestCase):
+    @setup
+    def set_tz(self):
+        self.orig_tz = os.environ.get('TZ')
+        os.environ['TZ'] = 'US/Pacific'
+        tz.refresh_local_zone()
+
+    @teardown
+    def restore_tz(self):
+        if self.orig_tz is None:
+            del os.environ['TZ']
+        else:
+            os.environ['TZ'] = self.orig_tz
+        tz.refresh_local_zone()
+
+    def test_detected(self):
+        zone = tz.get_local_zone()
+
+        assert zone is tz.get_zone('US/Pacific')
+        assert zone is tz.get_local_zone()
+
+    def test_refresh(self):
+        tz.get_local_zone()
+        os.environ['TZ'] = 'Europe/London'
+        assert_equal(tz.get_local_zone().name, 'US/Pacific')
+
+        tz.refresh_local_zone()
+        assert_equal(tz.get_local_zone().name, 'Europe/London')
+
+    def test_empty(self):
+        os.environ['TZ'] = ''
+        tz.refresh_local_zone()
+
+        assert_equal(tz.get_local_zone().name, 'UTC')
+
+    def test_time(self):
+        t = Time(2014, 4, 18, 10, 50, local=True)
+
+        assert_equal(t._us, Time(2014, 4, 18, 10, 50, tz='US/Pacific')._us)
+        assert_equal(t.to_str(local=True), t.to_str(tz='US/Pacific'))
+        assert_equal(
+            t.to_str(format='%H:%M %Z', local=True), '10:50 PDT')
@@ -0,0 +1,85 @@
+from testify import *
+import os
+import shutil
+import tempfile
+
+import dmc
+from dmc import Time
+from dmc import epoch
+from dmc import tz
+from dmc import tzdb
+
+
+class TransitionDatabaseTestCase(TestCase):
+    zones = ['US/Pacific', 'Australia/Lord_Howe', 'UTC', 'EST']
+
+    @setup
+    def compile_database(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'zones.tzdb')
+        tzdb.compile_database(self.path, self.zones)
+        self.db = tzdb.TransitionDatabase(self.path)
+
+    @teardown
+    def remove_database(self):
+        tz.use_database(None)
+        self.db.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_names(self):
+        assert_equal(self.db.names(), sorted(self.zones))
+        assert 'US/Pacific' in self.db
+        assert 'Europe/London' not in self.db
+
+    def test_matches_pytz(self):
+        start = Time(2013, 1, 1)._us
+        for name in self.zones:
+            mapped = self.db.zone(name)
+            zone = tz.get_zone(name)
+            assert_equal(len(mapped), len(zone))
+
+            for step in range(0, 800):
+                us = start + step * 13 * epoch.MICROSECS_PER_HOUR
+                assert_equal(mapped.utcoffset(us), zone.utcoffset(us))
+                assert_equal(mapped.tzname(us), zone.tzname(us))
+                for is_dst in (True, False):
+                    assert_equal(
+                        mapped.localize(us, is_dst=is_dst),
+                        zone.localize(us, is_dst=is_dst))
+
+    def test_to_datetime(self):
+        us = Time(2014, 4, 18, 17, 50)._us
+        dt = self.db.zone('US/Pacific').to_datetime(us)
+
+        assert_equal(dt, tz.get_zone('US/Pacific').to_datetime(us))
+        assert_equal(dt.tzinfo, tz.get_zone('US/Pacific').tzinfo(us))
+
+    def test_use_database(self):
+        tz.use_database(self.path)
+
+        assert isinstance(
+            tz.get_zone('US/Pacific')._offsets, tzdb._MappedArray)
+        assert isinstance(tz.get_zone('Europe/London')._offsets, list)
+
+        t = Time(2014, 4, 18, 10, 50, 21, tz='US/Pacific')
+        assert_equal(t.hour, 17)
+        assert_equal(t.to_str(tz='US/Pacific'), "2014-04-18T10:50:21-07:00")
+
+    def test_bad_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'\0' * 64)
+
+        assert_raises(tzdb.Error, tzdb.TransitionDatabase, self.path)
+        assert_raises(dmc.Error, tzdb.TransitionDatabase, self.path)
+
+    def test_truncated_file(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        with open(self.path, 'wb') as f:
+            f.write(data[:20])
+
+        assert_raises(tzdb.Error, tzdb.TransitionDatabase, self.path)
+
+    def test_missing_file(self):
+        assert_raises(
+            dmc.Error, tzdb.TransitionDatabase, self.path + '.missing')